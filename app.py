@@ -1,26 +1,46 @@
 # user_interface.py
-from flask import Flask, request, jsonify, render_template_string, send_file
+from flask import Flask, request, jsonify, render_template_string, send_file, send_from_directory, make_response
 from flask_cors import CORS
+from werkzeug.utils import secure_filename
 import pandas as pd
 import re
-import seaborn as sns
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
 import statsmodels.api as sm
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error, accuracy_score, precision_score, recall_score, explained_variance_score
 import numpy as np
+import openpyxl
+import pyarrow as pa
+import pyarrow.ipc
 import os
 import io
+import json
 import base64
+import multiprocessing
+import contextlib
+import functools
+import hashlib
+import shutil
+import tempfile
+import time
+import threading
 import traceback
+import warnings
 from collections import Counter
+from collections import OrderedDict
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+try:
+    import fcntl
+except ImportError:  # Windows: locks only hold between threads of one process
+    fcntl = None
 import google.generativeai as genai
 from dotenv import load_dotenv
 
+import charts
+
 
 load_dotenv()
 
@@ -38,18 +58,7 @@ UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 
-# Global storage
-group = None
-category = None
-item = None
-ship = None
-temp_df_preds = None        # dataframe containing actual & predicted values after building model
-train_df = None
-test_df = None
-split_before_date = None
-split_after_date = None
-last_isolate_by = None
-last_isolate_value = None
+# Constants
 LB_TO_GRAM = 453.592
 TARGETS_INGREDIENTS = [
     "braisedbeefusedg", "braisedchickeng", "braisedporkg", "eggcount", 
@@ -77,12 +86,83 @@ INGREDIENT_DISPLAY_MAP = {
     "tapiocastarch": "Tapioca Starch",
     "picklecabbage": "Pickled Cabbage"
 }
+# Normalized item ingredient column -> normalized shipment ingredient
+SHIP_INGREDIENT_MAP = {
+    "braisedbeefusedg": "beef", 
+    "braisedchickeng": "chicken", 
+    "eggcount": "egg", 
+    "riceg": "rice", 
+    "ramencount": "ramen", 
+    "ricenoodlesg": "ricenoodles", 
+    "chickenthighpcs": "chicken", 
+    "chickenwingspcs": "chickenwings", 
+    "flourg": "flour", 
+    "greenonion": "greenonion", 
+    "cilantro": "cilantro", 
+    "whiteonion": "whiteonion", 
+    "peasg": "peascarrot", 
+    "bokchoyg": "bokchoy", 
+    "tapiocastarch": "tapiocastarch"
+}
+# Ingredients recorded in grams but shipped in pounds
+UNIT_CONVERSION_REQUIRED = {
+    "braisedbeefusedg": 1, "braisedchickeng": 1, "riceg": 1, 
+    "ricenoodlesg": 1, "flourg": 1, "peasg": 1, "carrotg": 1, 
+    "bokchoyg": 1, "greenonion":1, "cilantro":1,
+}
+
+
+def normalize_text(s):
+    """Normalizes text by removing non-alphanumeric chars and converting to lowercase."""
+    if isinstance(s, str):
+        s = s.strip().lower()
+        s = re.sub(r"[^a-z]+$", "", s)
+        s = re.sub(r"[^a-z]+", "", s) 
+        return s
+    return s
+
+
+
+
+
 
 
+# Frontend
+#
+# The page is a small HTML shell around the React app in frontend/src/app.jsx.
+# frontend/build.py transpiles and minifies it behind the vendored production React
+# builds into one content-hashed file under static/dist/, named by
+# static/dist/manifest.json; the shell loads that file, which is served with a one-year
+# immutable Cache-Control since a new build gets a new name, and needs nothing from a
+# CDN. While app.jsx has been edited since the last build (or there is no build) the
+# shell instead loads React from frontend/vendor/ and transpiles app.jsx in the browser
+# with Babel from unpkg, so changes show up without rebuilding.
 
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend")
+FRONTEND_SOURCE = os.path.join(FRONTEND_DIR, "src", "app.jsx")
+FRONTEND_DIST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "dist")
+FRONTEND_ASSET_MAX_AGE = 365 * 24 * 3600
 
+_frontend_manifest = (None, None)  # (mtime_ns, manifest) of static/dist/manifest.json
+_frontend_source = (None, None)    # (mtime_ns, sha1) of app.jsx
 
 
+def frontend_bundle():
+    """File name of the built bundle in FRONTEND_DIST_DIR, or None if there is none for the current app.jsx."""
+    global _frontend_manifest, _frontend_source
+    path = os.path.join(FRONTEND_DIST_DIR, "manifest.json")
+    try:
+        manifest_mtime, source_mtime = os.stat(path).st_mtime_ns, os.stat(FRONTEND_SOURCE).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _frontend_manifest[0] != manifest_mtime:
+        with open(path) as f:
+            _frontend_manifest = (manifest_mtime, json.load(f))
+    if _frontend_source[0] != source_mtime:
+        _frontend_source = (source_mtime, _file_sha1(FRONTEND_SOURCE))
+    manifest = _frontend_manifest[1]
+    return manifest.get("app.js") if manifest.get("source_sha1") == _frontend_source[1] else None
+
 
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -91,9 +171,14 @@ HTML_TEMPLATE = """
   <meta charset="UTF-8" />
   <meta name="viewport" content="width=device-width, initial-scale=1.0" />
   <title>Mai KitShan</title>
-  <script src="https://unpkg.com/react@17/umd/react.development.js"></script>
-  <script src="https://unpkg.com/react-dom@17/umd/react-dom.development.js"></script>
+  {% if bundle %}
+  <script src="{{ url_for('frontend_asset', filename=bundle) }}" defer></script>
+  {% else %}
+  <script src="{{ url_for('frontend_source', filename='vendor/react-18.3.1.production.min.js') }}"></script>
+  <script src="{{ url_for('frontend_source', filename='vendor/react-dom-18.3.1.production.min.js') }}"></script>
   <script src="https://unpkg.com/@babel/standalone/babel.min.js"></script>
+  <script type="text/babel" src="{{ url_for('frontend_source', filename='src/app.jsx') }}"></script>
+  {% endif %}
   <style>
     .top-bar { display:flex; justify-content:space-between; align-items:center; padding:10px; border-bottom:1px solid #ccc; }
     label { margin-right:6px; }
@@ -108,1490 +193,1592 @@ HTML_TEMPLATE = """
 </head>
 <body>
   <div id="root"></div>
-  {% raw %}
-  <script type="text/babel">
-    const { useState, useEffect, useRef } = React;
-    
-    function usePersistentState(key, defaultValue) {
-        const [state, setState] = useState(() => {
-            try {
-            const stored = localStorage.getItem(key);
-            return stored ? JSON.parse(stored) : defaultValue;
-            } catch {
-            return defaultValue;
-            }
-        });
+</body>
+</html>
+"""
 
-        useEffect(() => {
-            try {
-            localStorage.setItem(key, JSON.stringify(state));
-            } catch (e) {
-            console.error("Failed to save state:", e);
-            }
-        }, [key, state]);
 
-        return [state, setState];
+# Worker processes
+#
+# Process pools are started lazily, often from a request or warm-up thread of an already
+# multi-threaded server, so workers come from a forkserver (spawn where that is not
+# available) rather than a plain fork that could copy a lock some other thread holds.
+# Unless configured, each pool gets this host's CPUs divided among its web workers:
+# WEB_CONCURRENCY, which gunicorn also reads as its worker count (default 1).
+
+
+def worker_context():
+    """multiprocessing context for every process pool the app starts."""
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    # Imported once by the fork server and shared by every worker forked from it
+    context.set_forkserver_preload(["__main__", "charts"])
+    return context
+
+
+def default_pool_size():
+    """Processes per pool when none is configured, so web workers x pools do not oversubscribe the host."""
+    web_workers = max(1, int(os.environ.get("WEB_CONCURRENCY", "1")))
+    return max(1, (os.cpu_count() or 1) // web_workers)
+
+
+# Parsed workbook cache
+#
+# Parsing the monthly .xlsx files with openpyxl is by far the slowest part of /upload,
+# so parsed sheets are kept as parquet files under WORKBOOK_CACHE_DIR. Entries are
+# addressed by the SHA-1 of the workbook; index.json remembers (mtime, size, sha1) per
+# path so unchanged files are not even re-hashed. Files are written through unique temp
+# names and index.json is updated under a lock, so concurrent loads (threads or worker
+# processes) never clobber each other.
+WORKBOOK_CACHE_DIR = "data/cache"
+# Number of processes used to parse workbooks that are not cached yet (<= 1 parses serially)
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", "0"))
+_workbook_memo = {}  # sha1 -> parsed sheets already loaded in this process
+
+
+def _file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _replace_file(path, write):
+    """Atomically replace path with what write(tmp_path) writes to a fresh temp file beside it."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_json(path, obj):
+    def write(tmp_path):
+        with open(tmp_path, "w") as f:
+            json.dump(obj, f, indent=1)
+    _replace_file(path, write)
+
+
+_file_locks = {}
+_file_locks_guard = threading.Lock()
+
+
+@contextlib.contextmanager
+def exclusive_lock(lock_path):
+    """Hold lock_path exclusively, against other threads here and (flock) other processes."""
+    with _file_locks_guard:
+        thread_lock = _file_locks.setdefault(os.path.abspath(lock_path), threading.Lock())
+    with thread_lock:
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        with open(lock_path, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+
+def _load_cache_index():
+    try:
+        with open(os.path.join(WORKBOOK_CACHE_DIR, "index.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _update_cache_index(entries):
+    """Merge entries into index.json, re-reading it under the lock so concurrent loads keep each other's."""
+    with exclusive_lock(os.path.join(WORKBOOK_CACHE_DIR, ".lock")):
+        index = _load_cache_index()
+        index.update(entries)
+        _write_json(os.path.join(WORKBOOK_CACHE_DIR, "index.json"), index)
+
+
+SHEET_KINDS = ("Group", "Category", "Item")
+
+
+def _excel_cell(value):
+    # Match pd.read_excel: empty cells become NaN and whole floats become ints
+    if value is None:
+        return np.nan
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def read_data_matrix(fpath):
+    """Read the Group/Category/Item sheets of a monthly data matrix in one pass."""
+    wb = openpyxl.load_workbook(fpath, read_only=True, data_only=True)
+    try:
+        sheets = {}
+        for ws in wb.worksheets[:3]:
+            rows = list(ws.iter_rows(values_only=True))
+            while rows and all(v is None for v in rows[-1]):
+                rows.pop()
+            if not rows:
+                continue
+            header = list(rows[0])
+            df = pd.DataFrame(
+                [[_excel_cell(v) for v in row] for row in rows[1:]], columns=header
+            )
+            # The sheet order is not the same in every month, so tag by header instead
+            if "Group" in header:
+                sheets["Group"] = df
+            elif "Category" in header:
+                sheets["Category"] = df
+            else:
+                sheets["Item"] = df
+        return sheets
+    finally:
+        wb.close()
+
+
+def _sheet_cache_paths(digest):
+    return {
+        kind: os.path.join(WORKBOOK_CACHE_DIR, f"{digest}-{kind.lower()}.parquet")
+        for kind in SHEET_KINDS
     }
- 
-    // File Upload Tab (now auto-loads default data)
-    const FileUpload = ({ setColumnNames, setTargetVariable }) => {
-        const [loading, setLoading] = React.useState(false);
-        const [status, setStatus] = React.useState("Loading default data...");
-
-        React.useEffect(() => {
-            const fetchDefaultData = async () => {
-            setLoading(true);
-            try {
-                const response = await fetch("/upload", { method: "POST" }); // no file, triggers default
-                const data = await response.json();
-
-                if (data.columns) {
-                setColumnNames(data.columns);
-                setTargetVariable(data.columns[0]);
-                setStatus(data.note || "Default data loaded successfully.");
-                } else {
-                setStatus(data.error || "Failed to load default data.");
-                }
-            } catch (error) {
-                console.error("Error loading default data:", error);
-                setStatus("An error occurred while loading default data.");
-            } finally {
-                setLoading(false);
-            }
-            };
-
-            fetchDefaultData();
-        }, [setColumnNames, setTargetVariable]);
-
-        return (
-            <div>
-            <h2>Data Load Status</h2>
-            <p>{loading ? "Loading default data..." : status}</p>
-            </div>
-        );
-    };
-
-
-
-
-
-    // Graphing Tab
-    const Graphing = ({ modelBuilt, modelTargets }) => {
-        const [x, setX] = React.useState("");
-        const [y, setY] = React.useState("");
-        const [groupBy, setGroupBy] = React.useState("");
-        const [plotType, setPlotType] = React.useState("scatterplot");
-        const [note, setNote] = React.useState("");
-        const [columnOptions, setColumnOptions] = React.useState([]);
-        const [imgUrl, setImgUrl] = React.useState("");
-        const [mse, setMse] = React.useState(null);
-        const [varVal, setVar] = React.useState(null);
-        const [loadingPlot, setLoadingPlot] = React.useState(false);
-        const [loadingResults, setLoadingResults] = React.useState(false);
-
-        // Fetch columns when "Group By" changes
-        React.useEffect(() => {
-            // FIX: Clear previous selections when the grouping category changes
-            setX("");
-            setY("");
-
-            if (!groupBy) {
-            setColumnOptions([]);
-            return;
-            }
 
-            fetch("/get_dataframe_columns", {
-            method: "POST",
-            headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ groupBy }),
-            })
-            .then((r) => r.json())
-            .then((data) => {
-                setColumnOptions(data.columns || []);
-            })
-            .catch((e) => console.error(e));
-        }, [groupBy]);
 
-        const handlePlot = async () => {
-            setNote(""); // clear old warnings
+def _load_cached_sheets(digest):
+    if digest in _workbook_memo:
+        return _workbook_memo[digest]
+    sheet_paths = _sheet_cache_paths(digest)
+    if not all(os.path.exists(p) for p in sheet_paths.values()):
+        return None
+    sheets = {kind: pd.read_parquet(p) for kind, p in sheet_paths.items()}
+    _workbook_memo[digest] = sheets
+    return sheets
 
-            if (!x && !y) {
-            alert("Please select at least one variable.");
-            return;
-            }
 
-            // Validation rules
-            if (plotType === "pie chart" && x && y) {
-            setNote("Pie chart can only have one variable (choose either X or Y, not both).");
-            return;
-            }
+def _store_cached_sheets(digest, sheets):
+    _workbook_memo[digest] = sheets
+    sheet_paths = _sheet_cache_paths(digest)
+    os.makedirs(WORKBOOK_CACHE_DIR, exist_ok=True)
+    try:
+        for kind, df in sheets.items():
+            _replace_file(sheet_paths[kind], functools.partial(df.to_parquet, index=False))
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        # A column mixing cell types (e.g. numbers and "$5,045.65" strings) has no parquet
+        # type; such a workbook stays memoised in this process but is re-parsed elsewhere
+        for path in sheet_paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+        print(f"Not caching workbook {digest}: {e}")
+
+
+def workbook_digests(paths):
+    """SHA-1 of each workbook, trusting the cache index while mtime and size are unchanged."""
+    index = _load_cache_index()
+    changed = {}
+    digests = []
+    for fpath in paths:
+        st = os.stat(fpath)
+        key = os.path.abspath(fpath)
+        entry = index.get(key)
+        if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            digests.append(entry["sha1"])
+        else:
+            digest = _file_sha1(fpath)
+            changed[key] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha1": digest}
+            digests.append(digest)
+    if changed:
+        _update_cache_index(changed)
+    return digests
+
+
+def read_workbooks_cached(paths, workers=None):
+    """Return read_data_matrix() for each path, in order, re-parsing only changed files.
+
+    Workbooks missing from the cache are parsed in a process pool when workers > 1.
+    """
+    workers = INGEST_WORKERS if workers is None else workers
+    digests = workbook_digests(paths)
+
+    results = [_load_cached_sheets(digest) for digest in digests]
+    missing = [i for i, sheets in enumerate(results) if sheets is None]
+    if missing:
+        missing_paths = [paths[i] for i in missing]
+        if workers > 1 and len(missing) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(missing)), mp_context=worker_context()) as pool:
+                parsed = list(pool.map(read_data_matrix, missing_paths))
+        else:
+            parsed = [read_data_matrix(fpath) for fpath in missing_paths]
+        for i, sheets in zip(missing, parsed):
+            _store_cached_sheets(digests[i], sheets)
+            results[i] = sheets
 
-            if (plotType !== "pie chart" && !x && !y) {
-            setNote("Please select at least one variable for this plot type.");
-            return;
-            }
+    # The frames are shared with the cache; normalize_month() copies before changing them
+    return results
 
-            setLoadingPlot(true);
-            try {
-            const response = await fetch("/plot", {
-                method: "POST",
-                headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ x, y, groupBy, plotType }),
-            });
-
-            if (!response.ok) {
-                const txt = await response.text();
-                alert("Plot error: " + txt);
-                return;
-            }
 
-            const blob = await response.blob();
-            setImgUrl(URL.createObjectURL(blob));
-            } catch (e) {
-            console.error(e);
-            } finally {
-            setLoadingPlot(false);
-            }
-        };
+def read_workbook_cached(fpath):
+    """Return read_data_matrix(fpath), re-parsing only if the file changed."""
+    return read_workbooks_cached([fpath])[0]
 
-        // Results panel (unchanged)
-        const [showResultsPanel, setShowResultsPanel] = React.useState(false);
-        const [selectedDate, setSelectedDate] = React.useState("");
-        const [selectedModelTarget, setSelectedModelTarget] = React.useState("");
-        const [resultsImgUrl, setResultsImgUrl] = React.useState("");
-        const [explainedVar, setExplainedVar] = React.useState(null);
 
-        const handleDisplayResultsClick = () => setShowResultsPanel(true);
+# Monthly data pipeline
+#
+# Each *_Data_Matrix.xlsx workbook is normalized and merged with the ingredient
+# recipes on its own, so a new month can be appended without touching the others.
+DATA_DIR = "data"
+PROCESSED_DIR = "data/processed"
+MONTH_MAP = {
+    "January": 1, "February": 2, "March": 3, "April": 4, "May": 5, "June": 6,
+    "July": 7, "August": 8, "September": 9, "October": 10, "November": 11, "December": 12,
+}
 
-        const handleShowResults = async () => {
-            if (!selectedDate || !selectedModelTarget) {
-            alert("Please choose a date and target.");
-            return;
-            }
 
-            setLoadingResults(true);
-            try {
-            const response = await fetch("/plot_results", {
-                method: "POST",
-                headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ date: selectedDate, target: selectedModelTarget }),
-            });
-
-            if (!response.ok) {
-                const txt = await response.text();
-                alert("Error: " + txt);
-                return;
-            }
+def month_from_path(fpath):
+    """'data/June_Data_Matrix.xlsx' -> 'June'"""
+    return os.path.basename(fpath).split("_")[0].replace("Data", "").strip()
 
-            const data = await response.json();
-            if (!data.image) {
-                alert("No image returned from server.");
-                return;
-            }
 
-            setResultsImgUrl("data:image/png;base64," + data.image);
-            setMse(typeof data.mse === "number" ? data.mse.toFixed(4) : "N/A");
-            setVar(typeof data.variance === "number" ? data.variance.toFixed(4) : "N/A");
-            setExplainedVar(
-                typeof data.explained_variance === "number"
-                ? data.explained_variance.toFixed(4)
-                : "N/A"
-            );
-            } catch (e) {
-            console.error(e);
-            } finally {
-            setLoadingResults(false);
-            }
-        };
-
-        return (
-            <div>
-            <h2>Graphing</h2>
-
-            {!modelBuilt && (
-                <>
-                <div>
-                    <label>Group By: </label>
-                    <select value={groupBy} onChange={(e) => setGroupBy(e.target.value)}>
-                    <option value="">--Select--</option>
-                    <option value="Group">Group</option>
-                    <option value="Category">Category</option>
-                    <option value="Item">Item</option>
-                    <option value="Shipment">Shipment</option>
-                    </select>
-                </div>
-
-                {groupBy && (
-                    <>
-                    <div style={{ marginTop: 10 }}>
-                        <label>Plot Type: </label>
-                        <select value={plotType} onChange={(e) => setPlotType(e.target.value)}>
-                        <option value="barplot">Barplot</option>
-                        <option value="scatterplot">Scatterplot</option>
-                        <option value="line plot">Line Plot</option>
-                        <option value="pie chart">Pie Chart</option>
-                        </select>
-                    </div>
-
-                    <div style={{ marginTop: 10 }}>
-                        <label>X: </label>
-                        <select value={x} onChange={(e) => setX(e.target.value)}>
-                        <option value="">--Select--</option>
-                        {columnOptions.map((col) => (
-                            <option key={col} value={col}>
-                            {col}
-                            </option>
-                        ))}
-                        </select>
-
-                        <label> Y: </label>
-                        <select value={y} onChange={(e) => setY(e.target.value)}>
-                        <option value="">--Select--</option>
-                        {columnOptions.map((col) => (
-                            <option key={col} value={col}>
-                            {col}
-                            </option>
-                        ))}
-                        </select>
-                    </div>
-                    </>
-                )}
-
-                {note && (
-                    <div style={{ marginTop: "8px", color: "darkorange", fontWeight: "bold" }}>
-                    {note}
-                    </div>
-                )}
-
-                <div style={{ marginTop: "10px" }}>
-                    <button onClick={handlePlot} disabled={loadingPlot || !groupBy}>
-                    {loadingPlot ? "Plotting..." : "Generate Plot"}
-                    </button>
-                </div>
-
-                {imgUrl && (
-                    <div style={{ marginTop: "20px" }}>
-                    <img src={imgUrl} alt="Plot" style={{ maxWidth: "100%" }} />
-                    </div>
-                )}
-                </>
-            )}
-
-            {modelBuilt && (
-                <div style={{ marginTop: 10 }}>
-                <button onClick={handleDisplayResultsClick}>Display Results</button>
-                </div>
-            )}
-
-            {modelBuilt && showResultsPanel && (
-                <div style={{ marginTop: 12 }}>
-                <div>
-                    <label>Date: </label>
-                    <input
-                    type="date"
-                    value={selectedDate}
-                    onChange={(e) => setSelectedDate(e.target.value)}
-                    />
-                    <label> Target: </label>
-                    <select
-                    value={selectedModelTarget}
-                    onChange={(e) => setSelectedModelTarget(e.target.value)}
-                    >
-                    <option value="">--Select--</option>
-                    {modelTargets.map((t, i) => (
-                        <option key={i} value={t}>
-                        {t}
-                        </option>
-                    ))}
-                    </select>
-                    <button
-                    onClick={handleShowResults}
-                    disabled={loadingResults}
-                    style={{ marginLeft: 10 }}
-                    >
-                    {loadingResults ? "Plotting..." : "Show Results"}
-                    </button>
-                </div>
-
-                {resultsImgUrl && (
-                    <div
-                    style={{
-                        display: "flex",
-                        alignItems: "flex-start",
-                        marginTop: 16,
-                        gap: "2rem",
-                    }}
-                    >
-                    <img src={resultsImgUrl} alt="Results" style={{ maxWidth: "65%" }} />
-                    <div style={{ fontSize: "1rem", lineHeight: "1.6" }}>
-                        <strong>MSE:</strong> {mse}
-                        <br />
-                        <strong>Variance:</strong> {varVal}
-                        <br />
-                        <strong>Explained Variance:</strong> {explainedVar}
-                    </div>
-                    </div>
-                )}
-                </div>
-            )}
-            </div>
-        );
-    };
-
-
-    // Next Month Usage Tab
-    const NextMonthUsage = () => {
-        const [monthToPredict, setMonthToPredict] = usePersistentState("nextMonthUsage_monthToPredict", "");
-        const [predictionResults, setPredictionResults] = usePersistentState("nextMonthUsage_results", null);
-        const [loading, setLoading] = React.useState(false); // no need to persist this
-        const [imgUrl, setImgUrl] = usePersistentState("nextMonthUsage_imgUrl", "");
-        const [note, setNote] = usePersistentState("nextMonthUsage_note", "");
-
-        const MONTH_OPTIONS = ["June", "July", "Aug", "Sept", "Oct", "Nov"];
-
-        const handlePredict = async () => {
-            if (!monthToPredict) {
-                alert("Please select a month to predict.");
-                return;
-            }
+def discover_month_files(data_dir=DATA_DIR):
+    """Return the data matrix workbooks in data_dir, in calendar order."""
+    paths = [
+        os.path.join(data_dir, fname)
+        for fname in os.listdir(data_dir)
+        if fname.endswith(".xlsx") and "_Data_Matrix" in fname
+    ]
+    return sorted(paths, key=lambda p: (MONTH_MAP.get(month_from_path(p), 0), p))
 
-            setLoading(true);
-            setPredictionResults(null);
-            setImgUrl("");
-            setNote("");
-
-            try {
-                const response = await fetch("/predict_next_month_usage", {
-                    method: "POST",
-                    headers: { "Content-Type": "application/json" },
-                    body: JSON.stringify({ month: monthToPredict }),
-                });
-
-                if (!response.ok) {
-                    const txt = await response.text();
-                    setNote("Prediction Error: " + txt);
-                    return;
-                }
 
-                const data = await response.json();
-                
-                if (data.error) {
-                    setNote(data.error);
-                    return;
-                }
-                
-                // Handle image data separately if available
-                if (data.image) {
-                    setImgUrl("data:image/png;base64," + data.image);
-                    delete data.image; // Clean up the JSON data for display
-                }
-                
-                setPredictionResults(data);
-                setNote(data.note || "Prediction successful!");
-
-            } catch (e) {
-                console.error("Prediction error:", e);
-                setNote("An unexpected error occurred during prediction.");
-            } finally {
-                setLoading(false);
-            }
-        };
-
-        return (
-            <div>
-                <h2>Next Month Usage Prediction</h2>
-
-                <div style={{ marginBottom: 15 }}>
-                    <label>Month to Predict: </label>
-                    <select 
-                        value={monthToPredict} 
-                        onChange={(e) => setMonthToPredict(e.target.value)}
-                    >
-                        <option value="">--Select--</option>
-                        {MONTH_OPTIONS.map((month) => (
-                            <option key={month} value={month}>
-                                {month}
-                            </option>
-                        ))}
-                    </select>
-
-                    <button 
-                        onClick={handlePredict} 
-                        disabled={loading || !monthToPredict}
-                        style={{ marginLeft: 10 }}
-                    >
-                        {loading ? "Predicting..." : "Run Prediction"}
-                    </button>
-                </div>
-
-                {note && (
-                    <div style={{ color: predictionResults?.error ? "red" : "black", marginBottom: 15 }}>
-                        <strong>{note}</strong>
-                    </div>
-                )}
-
-                {predictionResults && (
-                    <div style={{ marginTop: 20 }}>
-                        <h3>Prediction Results</h3>
-                        <p>
-                            <strong>Mean Squared Error (MSE):</strong> {typeof predictionResults.mse === "number" ? predictionResults.mse.toFixed(4) : predictionResults.mse || 'N/A'}
-                        </p>
-                        <p>
-                            <strong>Variance:</strong> {typeof predictionResults.variance === "number" ? predictionResults.variance.toFixed(4) : predictionResults.variance || 'N/A'}
-                        </p>
-                        <p>
-                            <strong>Explained Variance:</strong> {typeof predictionResults.explained_variance === "number" ? predictionResults.explained_variance.toFixed(4) : predictionResults.explained_variance || 'N/A'}
-                        </p>
-                        
-                        {imgUrl && (
-                            <div style={{ marginTop: 20 }}>
-                                <img src={imgUrl} alt="Actual vs Predicted Usage" style={{ maxWidth: "100%" }} />
-                            </div>
-                        )}
-                    </div>
-                )}
-            </div>
-        );
-    };
-    
+def load_ingredients():
+    ing = pd.read_csv(os.path.join(DATA_DIR, "MSY Data - Ingredient.csv"))
+    ing["Item name"] = ing["Item name"].astype(str)
+    return ing
 
-    // Cost Prediction Tab
-    const CostPrediction = () => {
-        const [predictionResults, setPredictionResults] = usePersistentState("costPrediction_results", null);
-        const [imgUrl, setImgUrl] = usePersistentState("costPrediction_imgUrl", "");
-        const [note, setNote] = usePersistentState("costPrediction_note", "");
-        const [coefficientTable, setCoefficientTable] = usePersistentState("costPrediction_coefficientTable", []);
-        const [loading, setLoading] = React.useState(false);
-
-        const handleRunPrediction = async () => {
-            setLoading(true);
-            setPredictionResults(null);
-            setImgUrl("");
-            setNote("");
-            setCoefficientTable([]); // Reset table data
-
-            try {
-                const response = await fetch("/predict_cost_loocv", {
-                    method: "POST",
-                    headers: { "Content-Type": "application/json" }
-                });
-
-                if (!response.ok) {
-                    const txt = await response.text();
-                    setNote("Prediction Error: " + txt);
-                    return;
-                }
 
-                const data = await response.json();
-                
-                if (data.error) {
-                    setNote("Error: " + data.error);
-                    return;
-                }
-                
-                if (data.image) {
-                    setImgUrl("data:image/png;base64," + data.image);
-                }
-                
-                setPredictionResults(data);
-                setNote(data.note || "Cost prediction completed successfully!");
-                setCoefficientTable(data.coefficient_table || []); // SAVE NEW COEFFICIENT DATA
-
-            } catch (e) {
-                console.error("Cost prediction error:", e);
-                setNote("An unexpected error occurred during prediction.");
-            } finally {
-                setLoading(false);
-            }
-        };
-
-        return (
-            <div>
-                <h2>Cost Prediction</h2>
-                <p>
-                    Predicts cost of food items based on ingredients used. Calculates the effect of ingredients on cost of food item.
-                </p>
-
-                <button 
-                    onClick={handleRunPrediction} 
-                    disabled={loading}
-                    style={{ marginTop: 15, marginBottom: 25 }}
-                >
-                    {loading ? "Training and Predicting..." : "Run Cost Prediction"}
-                </button>
-
-                {note && (
-                    <div style={{ color: predictionResults?.error ? "red" : "black", marginBottom: 15 }}>
-                        <strong>{note}</strong>
-                    </div>
-                )}
-
-                {predictionResults && (
-                    <div style={{ marginTop: 20 }}>
-                        <h3>Aggregate Prediction Metrics</h3>
-                        {/* ... (Metrics Display remains the same) ... */}
-                        <p>
-                            <strong>Total Mean Squared Error (MSE):</strong> {typeof predictionResults.mse === "number" ? predictionResults.mse.toFixed(4) : predictionResults.mse || 'N/A'}
-                        </p>
-                        <p>
-                            <strong>Total Variance of Actual Cost:</strong> {typeof predictionResults.variance === "number" ? predictionResults.variance.toFixed(4) : predictionResults.variance || 'N/A'}
-                        </p>
-                        <p>
-                            <strong>Explained Variance (R²):</strong> {typeof predictionResults.explained_variance === "number" ? predictionResults.explained_variance.toFixed(4) : predictionResults.explained_variance || 'N/A'}
-                        </p>
-                        
-                        {imgUrl && (
-                            <div style={{ marginTop: 20 }}>
-                                <img src={imgUrl} alt="Actual vs Predicted Cost Scatter Plot" style={{ maxWidth: "600px" }} />
-                            </div>
-                        )}
-                    </div>
-                )}
-
-                {/* NEW COEFFICIENT TABLE DISPLAY */}
-                {coefficientTable.length > 0 && (
-                    <div style={{ marginTop: 40 }}>
-                        <h3>Ingredients Ranked by Cost Influence</h3>
-                        <table style={{ borderCollapse: 'collapse', width: '45%', minWidth: '300px', border: '1px solid #ddd' }}>
-                            <thead>
-                                <tr style={{ backgroundColor: '#e6f7ff' }}>
-                                    <th style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'left' }}>Ingredient</th>
-                                    <th style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'right' }}>Coefficient</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                                {coefficientTable.map((row, index) => (
-                                    <tr key={index}>
-                                        <td style={{ border: '1px solid #ddd', padding: '8px' }}>{row.Ingredient}</td>
-                                        <td 
-                                            style={{ 
-                                                border: '1px solid #ddd', 
-                                                padding: '8px', 
-                                                textAlign: 'right',
-                                                // Optional: Color code based on sign
-                                                color: row.Coefficient > 0 ? 'green' : (row.Coefficient < 0 ? 'red' : 'inherit')
-                                            }}
-                                        >
-                                            {row.Coefficient.toFixed(4)}
-                                        </td>
-                                    </tr>
-                                ))}
-                            </tbody>
-                        </table>
-                    </div>
-                )}
-            </div>
-        );
-    };
-    
-    
-    // Revenue Prediction Tab
-    const RevenuePrediction = () => {
-        const [plotType, setPlotType] = usePersistentState("plotType", "bar");
-        const [predictionResults, setPredictionResults] = usePersistentState("predictionResults", null);
-        const [loading, setLoading] = useState(false);
-        const [note, setNote] = useState("");
-
-        const handleRunPrediction = async () => {
-            setLoading(true);
-            setPredictionResults(null);
-            setNote("");
-
-            try {
-                const response = await fetch("/predict_revenue_stepwise", {
-                    method: "POST",
-                    headers: { "Content-Type": "application/json" },
-                    body: JSON.stringify({ plot_type: plotType }),
-                });
-
-                const data = await response.json();
-                if (!response.ok || data.error) {
-                    setNote("Error: " + (data.error || "Unknown error"));
-                    return;
-                }
+def load_shipments():
+    ship = pd.read_csv(os.path.join(DATA_DIR, "MSY Data - Shipment.csv"))
+    ship["total"] = (
+        ship["Quantity per shipment"].astype(int)
+        * ship["Number of shipments"].astype(int)
+    )
 
-                setPredictionResults(data);
-                setNote(data.note || "Revenue prediction completed successfully!");
-            } catch (e) {
-                console.error("Prediction error:", e);
-                setNote("An unexpected error occurred during prediction.");
-            } finally {
-                setLoading(false);
-            }
-        };
-
-        return (
-            <div>
-                <h2>Revenue Prediction</h2>
-                <p>Forecasts expected revenue for the future months.</p>
-
-                <div style={{ marginBottom: 15, display: "flex", gap: "20px", alignItems: "center" }}>
-                    <div>
-                        <label>Plot Type: </label>
-                        <select value={plotType} onChange={(e) => setPlotType(e.target.value)}>
-                            <option value="bar">Bar Plot</option>
-                            <option value="line">Line Plot</option>
-                        </select>
-                    </div>
-
-                    <button onClick={handleRunPrediction} disabled={loading}>
-                        {loading ? "Running..." : "Run Prediction"}
-                    </button>
-                </div>
-
-                {note && (
-                    <div style={{ color: predictionResults?.error ? "red" : "black", marginBottom: 15 }}>
-                        <strong>{note}</strong>
-                    </div>
-                )}
-
-                {predictionResults && (
-                    <div style={{ marginTop: 20 }}>
-                        <h3>Prediction Metrics</h3>
-                        <div style={{ display: "flex", gap: "40px", marginBottom: "20px" }}>
-                            <div>
-                                <strong>MSE:</strong>{" "}
-                                {predictionResults.mse !== "N/A"
-                                    ? predictionResults.mse.toFixed(4)
-                                    : "N/A"}
-                            </div>
-                            <div>
-                                <strong>Variance:</strong>{" "}
-                                {predictionResults.variance !== "N/A"
-                                    ? predictionResults.variance.toFixed(4)
-                                    : "N/A"}
-                            </div>
-                            <div>
-                                <strong>Explained Variance (R²):</strong>{" "}
-                                {predictionResults.explained_variance !== "N/A"
-                                    ? predictionResults.explained_variance.toFixed(4)
-                                    : "N/A"}
-                            </div>
-                        </div>
-
-                        {/* Results Table */}
-                        {predictionResults.table && predictionResults.table.length > 0 && (
-                            <div style={{ marginTop: 20 }}>
-                                <h3>Predicted vs Actual Values</h3>
-                                <table
-                                    style={{
-                                        borderCollapse: "collapse",
-                                        width: "100%",
-                                        textAlign: "center",
-                                        marginBottom: 20,
-                                    }}
-                                >
-                                    <thead>
-                                        <tr>
-                                            <th>Month</th>
-                                            <th>Predicted</th>
-                                            <th>Actual</th>
-                                            <th>MSE</th>
-                                        </tr>
-                                    </thead>
-                                    <tbody>
-                                        {predictionResults.table.map((row, idx) => (
-                                            <tr key={idx}>
-                                                <td>{row.Month}</td>
-                                                <td>{row.Predicted ? row.Predicted.toFixed(2) : ""}</td>
-                                                <td>{row.Actual ? row.Actual.toFixed(2) : ""}</td>
-                                                <td>
-                                                    {row.MSE && !isNaN(row.MSE)
-                                                        ? row.MSE.toFixed(2)
-                                                        : ""}
-                                                </td>
-                                            </tr>
-                                        ))}
-                                    </tbody>
-                                </table>
-                            </div>
-                        )}
-
-                        {predictionResults.image && (
-                            <div style={{ marginTop: 10 }}>
-                                <img
-                                    src={`data:image/png;base64,${predictionResults.image}`}
-                                    alt="Revenue Prediction Plot"
-                                    style={{ maxWidth: "800px" }}
-                                />
-                            </div>
-                        )}
-                    </div>
-                )}
-            </div>
-        );
-    };
-    
-    
-    // Shipment vs. Usage Tab
-    const ShipmentVsUsage = () => {
-        const [selectedMonth, setSelectedMonth] = usePersistentState("shipmentVsUsage_selectedMonth", "");
-        const [imgUrl, setImgUrl] = usePersistentState("shipmentVsUsage_imgUrl", "");
-        const [note, setNote] = usePersistentState("shipmentVsUsage_note", "");
-        const [tableData, setTableData] = usePersistentState("shipmentVsUsage_tableData", []);
-        const [actionTableData, setActionTableData] = usePersistentState("shipmentVsUsage_actionTableData", []);
-        const [monthOptions, setMonthOptions] = React.useState([]);
-        const [loading, setLoading] = React.useState(false);
-
-        // Fetch unique months for the dropdown on component load (unchanged)
-        React.useEffect(() => {
-            fetch("/get_unique_months")
-                .then((r) => r.json())
-                .then((data) => {
-                    setMonthOptions(data.months || []);
-                })
-                .catch((e) => console.error("Error fetching months:", e));
-        }, []);
-
-        const handleGenerateChart = async () => {
-            if (!selectedMonth) {
-                setNote("Please select a month.");
-                return;
+    # Iterate properly
+    for row in ship.itertuples():
+        freq = str(row.frequency).strip().lower()
+        if freq == "weekly":
+            ship.at[row.Index, "total"] *= 4  # Approximate 4 weeks in a month
+        elif freq == "biweekly":
+            ship.at[row.Index, "total"] *= 2  # Approximate 2 biweeks in a month
+    return ship
+
+
+def drop_categorical_nans(df):
+    non_numeric_cols = df.select_dtypes(
+        include=["object", "category", "bool", "datetime"]
+    ).columns
+    df_cleaned = df.dropna(subset=non_numeric_cols)
+    print(f"Dropped {len(df) - len(df_cleaned)} rows due to categorical NaNs.")
+    return df_cleaned
+
+
+def normalize_month(sheets, month, ing):
+    """Turn one workbook's sheets into cleaned (group, category, item) frames for that month."""
+    frames = {}
+    for kind, type_label in (("Group", "Group"), ("Category", "Category"), ("Item", "Specific Item")):
+        df = sheets[kind].copy()
+        df["month"] = month
+        df["type"] = type_label
+
+        # Numeric conversions
+        for col in ["Amount", "Count"]:
+            if col in df.columns:
+                df[col] = pd.to_numeric(
+                    df[col].astype(str).str.replace(r"[^0-9.\-]", "", regex=True),
+                    errors="coerce",
+                )
+        df["cost"] = (df.get("Amount", 0) / df.get("Count", 1)).fillna(0)
+        frames[kind] = df
+
+    # --- Merge item and ingredient datasets ---
+    item_month = frames["Item"]
+    item_month["Item Name"] = item_month["Item Name"].astype(str)
+    item_ing = pd.merge(
+        item_month,
+        ing,
+        left_on=item_month["Item Name"].str.strip().str.lower(),
+        right_on=ing["Item name"].str.strip().str.lower(),
+        how="outer",
+        suffixes=("_item", "_ing"),
+    )
+    item_ing.rename(
+        columns={"Item name": "Items with Ingredient Counts"}, inplace=True
+    )
+    item_ing.columns = item_ing.columns.str.strip()
+
+    result = []
+    for df in (frames["Group"], frames["Category"], item_ing):
+        # --- Drop NaNs from categorical columns, then fill the numeric ones ---
+        df = drop_categorical_nans(df)
+        df = df.fillna(0)
+        df["month numerical"] = df["month"].map(MONTH_MAP).fillna(0).astype(int)
+        result.append(df)
+    return tuple(result)
+
+
+# Processed snapshot store
+#
+# data/processed/ holds immutable Arrow IPC part files plus one JSON manifest per
+# snapshot version (schema, row counts, source hashes). CURRENT names the live
+# manifest and is replaced atomically after everything else is on disk, so a crashed
+# ingest leaves the previous snapshot untouched. Appending a month adds a part file
+# and a manifest that reuses the existing parts. Publishes run one at a time under
+# snapshot_lock() (threads and worker processes), which also covers the manifest they
+# start from, so two writers never claim the same version.
+SNAPSHOT_SCHEMA_VERSION = 2
+SNAPSHOT_KEEP = 3  # manifests (and their parts) kept on disk
+
+
+def _write_arrow_part(df, path):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    def write(tmp_path):
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    _replace_file(path, write)
+    return table.schema
+
+
+def _read_arrow_part(path):
+    # Memory-mapped and kept in Arrow-backed columns, so the table's pages come straight
+    # from the OS page cache and are shared by every worker process mapping the same file
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def source_signature(month_paths):
+    """Hashes of every input file, used to tell whether a snapshot is still current."""
+    signature = {
+        os.path.basename(p): digest
+        for p, digest in zip(month_paths, workbook_digests(month_paths))
+    }
+    for fname in ("MSY Data - Ingredient.csv", "MSY Data - Shipment.csv"):
+        signature[fname] = _file_sha1(os.path.join(DATA_DIR, fname))
+    return signature
+
+
+def read_manifest():
+    """Return the manifest CURRENT points to, or None if there is no usable snapshot."""
+    try:
+        with open(os.path.join(PROCESSED_DIR, "CURRENT")) as f:
+            manifest_name = f.read().strip()
+        with open(os.path.join(PROCESSED_DIR, manifest_name)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("schema_version") != SNAPSHOT_SCHEMA_VERSION:
+        return None
+    return manifest
+
+
+def _prune_snapshots():
+    manifests = sorted(f for f in os.listdir(PROCESSED_DIR) if f.startswith("manifest-v"))
+    keep = manifests[-SNAPSHOT_KEEP:]
+    live_parts = set()
+    for name in keep:
+        with open(os.path.join(PROCESSED_DIR, name)) as f:
+            for meta in json.load(f)["tables"].values():
+                live_parts.update(meta["parts"])
+    for name in manifests[:-SNAPSHOT_KEEP]:
+        os.remove(os.path.join(PROCESSED_DIR, name))
+    parts_dir = os.path.join(PROCESSED_DIR, "parts")
+    for fname in os.listdir(parts_dir):
+        if f"parts/{fname}" not in live_parts and not fname.endswith(".tmp"):
+            os.remove(os.path.join(parts_dir, fname))
+
+
+def snapshot_lock():
+    """Held around every read-manifest -> write -> swap CURRENT -> prune sequence."""
+    return exclusive_lock(os.path.join(PROCESSED_DIR, ".lock"))
+
+
+def publish_snapshot(tables, sources, append=False):
+    """Write tables as a new snapshot version (added to the current one if append) and make it live."""
+    with snapshot_lock():
+        return write_snapshot(read_manifest(), tables, sources, append)
+
+
+def write_snapshot(current, tables, sources, append=False):
+    """publish_snapshot() for a caller already holding snapshot_lock(), with the manifest it read under it."""
+    os.makedirs(os.path.join(PROCESSED_DIR, "parts"), exist_ok=True)
+    version = (current["version"] if current else 0) + 1
+    entries = {}
+    if append and current:
+        entries = {name: dict(meta) for name, meta in current["tables"].items()}
+        sources = {**current["sources"], **sources}
+
+    for name, df in tables.items():
+        part = f"parts/{name}-v{version:06d}.arrow"
+        entry = entries.get(name)
+        if append and entry:
+            _write_arrow_part(df.reindex(columns=list(entry["schema"])), os.path.join(PROCESSED_DIR, part))
+            entry["parts"] = entry["parts"] + [part]
+            entry["rows"] += len(df)
+        else:
+            schema = _write_arrow_part(df, os.path.join(PROCESSED_DIR, part))
+            entries[name] = {
+                "parts": [part],
+                "rows": len(df),
+                "schema": {field.name: str(field.type) for field in schema},
             }
-            setLoading(true);
-            setImgUrl("");
-            setNote("");
-            setTableData([]); // Reset table data
-            setActionTableData([]); // Make sure to reset this as well
-
-            try {
-                const response = await fetch("/shipment_vs_usage_plot", {
-                    method: "POST",
-                    headers: { "Content-Type": "application/json" },
-                    body: JSON.stringify({ month: selectedMonth }),
-                });
-
-                if (!response.ok) {
-                    const txt = await response.text();
-                    setNote("Chart Error: " + txt);
-                    return;
-                }
 
-                const data = await response.json();
+    manifest_name = f"manifest-v{version:06d}.json"
+    _write_json(os.path.join(PROCESSED_DIR, manifest_name), {
+        "version": version,
+        "schema_version": SNAPSHOT_SCHEMA_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sources": sources,
+        "tables": entries,
+    })
 
-                if (data.error) {
-                    setNote("Error: " + data.error);
-                    return;
-                }
+    def write_current(tmp_path):
+        with open(tmp_path, "w") as f:
+            f.write(manifest_name)
+    _replace_file(os.path.join(PROCESSED_DIR, "CURRENT"), write_current)
+    _prune_snapshots()
+    return version
 
-                if (data.image) {
-                    setImgUrl("data:image/png;base64," + data.image);
-                    setNote(data.note || "Chart generated successfully.");
-                    setTableData(data.table_data || []); 
-                    setActionTableData(data.action_table_data || []); // <--- THIS LINE WAS MISSING AND IS THE FIX
-                }
 
-            } catch (e) {
-                console.error("Plotting error:", e);
-                setNote("An unexpected error occurred during plotting.");
-            } finally {
-                setLoading(false);
-            }
-        };
-
-        return (
-            <div>
-                <h2>Shipment vs. Usage Analysis</h2>
-                <p>There is a large difference between the "Used" and "Shipped" values due to lack of ingredient data for most menu items.</p>
-
-                {/* ... (Month selection and button: unchanged) ... */}
-
-                <div style={{ marginBottom: 15 }}>
-                    <label>Month: </label>
-                    <select 
-                        value={selectedMonth} 
-                        onChange={(e) => setSelectedMonth(e.target.value)}
-                    >
-                        <option value="">--Select Month--</option>
-                        {monthOptions.map((month) => (
-                            <option key={month} value={month}>
-                                {month}
-                            </option>
-                        ))}
-                    </select>
-
-                    <button 
-                        onClick={handleGenerateChart} 
-                        disabled={loading || !selectedMonth}
-                        style={{ marginLeft: 10 }}
-                    >
-                        {loading ? "Generating..." : "Generate Chart"}
-                    </button>
-                </div>
-
-                {note && (
-                    <div style={{ color: "darkblue", marginBottom: 15 }}>
-                        <strong>{note}</strong>
-                    </div>
-                )}
-
-                {imgUrl && (
-                    <div style={{ marginTop: 20 }}>
-                        <img src={imgUrl} alt="Shipment vs Usage Plot" style={{ maxWidth: "100%" }} />
-                    </div>
-                )}
-
-                {/* NEW TABLE DISPLAY */}
-                {tableData.length > 0 && (
-                    <div style={{ marginTop: 30 }}>
-                        <h3>Data Table ({selectedMonth})</h3>
-                        <table style={{ borderCollapse: 'collapse', width: '100%', border: '1px solid #ddd' }}>
-                            <thead>
-                                <tr style={{ backgroundColor: '#f2f2f2' }}>
-                                    <th style={{ border: '1px solid #ddd', padding: '8px' }}>Ingredient</th>
-                                    <th style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'center' }}>Units</th>
-                                    <th style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'right' }}>Used</th>
-                                    <th style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'right' }}>Shipped</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                                {tableData.map((row, index) => (
-                                    <tr key={index}>
-                                        <td style={{ border: '1px solid #ddd', padding: '8px' }}>{row.Ingredient}</td>
-                                        <td style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'center' }}>{row.Units}</td>
-                                        <td style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'right' }}>{row.Used}</td>
-                                        <td style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'right' }}>{row.Shipped}</td>
-                                    </tr>
-                                ))}
-                            </tbody>
-                        </table>
-                    </div>
-                )}
-                {actionTableData.length > 0 && (
-                    <div style={{ marginTop: 40, width: '100%' }}>
-                        <h3>Inventory Action Recommendations </h3>
-                        <table style={{ borderCollapse: 'collapse', width: '100%', border: '1px solid #ddd' }}>
-                            <thead>
-                                <tr style={{ backgroundColor: '#fff8e1' }}>
-                                    <th style={{ border: '1px solid #ddd', padding: '8px', width: '50%' }}>Order Less</th>
-                                    <th style={{ border: '1px solid #ddd', padding: '8px', width: '50%' }}>Order More</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                                {actionTableData.map((row, index) => (
-                                    <tr key={index}>
-                                        <td style={{ border: '1px solid #ddd', padding: '8px', color: row['Order Less'] ? 'black' : 'inherit' }}>{row['Order Less']}</td>
-                                        <td style={{ border: '1px solid #ddd', padding: '8px', color: row['Order More'] ? 'black' : 'inherit' }}>{row['Order More']}</td>
-                                    </tr>
-                                ))}
-                            </tbody>
-                        </table>
-                    </div>
-                )}
-            </div>
-        );
-    };
-    
-    
-    
-    // Used/Shipped Timeline Tab
-    const UsedShippedTimeline = () => {
-        const [selectedIngredient, setSelectedIngredient] = usePersistentState("usedShippedTimeline_selectedIngredient", "");
-        const [imgUrl, setImgUrl] = usePersistentState("usedShippedTimeline_imgUrl", "");
-        const [note, setNote] = usePersistentState("usedShippedTimeline_note", "");
-        const [tableData, setTableData] = usePersistentState("usedShippedTimeline_tableData", []);
-        const [ingredientOptions, setIngredientOptions] = React.useState([]);
-        const [loading, setLoading] = React.useState(false);
-
-        // Fetch ingredients on mount
-        React.useEffect(() => {
-            fetch("/get_ingredient_list")
-                .then((r) => r.json())
-                .then((data) => setIngredientOptions(data.ingredients || []))
-                .catch((e) => console.error("Error fetching ingredients:", e));
-        }, []);
-
-        const handleGenerateChart = async () => {
-            if (!selectedIngredient) {
-                setNote("Please select an ingredient.");
-                return;
-            }
+def load_snapshot(manifest):
+    """Read every table of a snapshot manifest back into DataFrames."""
+    return {
+        name: pd.concat(
+            [_read_arrow_part(os.path.join(PROCESSED_DIR, part)) for part in meta["parts"]],
+            ignore_index=True,
+        )
+        for name, meta in manifest["tables"].items()
+    }
 
-            setLoading(true);
-            setImgUrl("");
-            setNote("");
-            setTableData([]);
 
-            try {
-                const response = await fetch("/used_shipped_timeline_plot", {
-                    method: "POST",
-                    headers: { "Content-Type": "application/json" },
-                    body: JSON.stringify({ ingredient: selectedIngredient }),
-                });
+def _check_new_month(manifest, month, keep_as=None):
+    if manifest is None:
+        raise ValueError("Load the default data before adding a month.")
+    if any(month_from_path(name) == month for name in manifest["sources"]):
+        raise ValueError(f"{month} has already been ingested.")
+    if keep_as and os.path.exists(keep_as):
+        raise ValueError(f"{os.path.basename(keep_as)} already exists in {os.path.dirname(keep_as)}/.")
+
+
+def ingest_month(fpath, keep_as=None):
+    """Append one new monthly workbook to the loaded group/category/item data.
+
+    With keep_as, fpath is a staged upload that is moved to keep_as once its month is
+    live; nothing is written there if the month is rejected.
+    """
+    name = os.path.basename(keep_as or fpath)
+    month = month_from_path(name)
+    if month not in MONTH_MAP:
+        raise ValueError(f"Cannot tell the month from file name '{name}'.")
+    # Checked again under the lock; this only saves parsing a workbook that will be refused
+    _check_new_month(read_manifest(), month, keep_as)
+
+    group_m, category_m, item_m = normalize_month(read_workbook_cached(fpath), month, load_ingredients())
+    with snapshot_lock():
+        current = read_manifest()
+        _check_new_month(current, month, keep_as)
+        write_snapshot(
+            current,
+            {"group": group_m, "category": category_m, "item": item_m},
+            {name: workbook_digests([fpath])[0]},
+            append=True,
+        )
+        if keep_as:
+            shutil.move(fpath, keep_as)
+    # The new snapshot shares the existing parts, so this only maps the added month
+    restore_snapshot()
+    return month
+
+
+# Recipe matrix
+#
+# The recipes in MSY Data - Ingredient.csv as one dense item x ingredient array, so
+# ingredient usage for any set of sales is a single matrix product (counts @ quantities).
+def item_key(names):
+    """Key used to match sales rows to recipes (same as the item/ingredient merge)."""
+    return pd.Series(names).astype(str).str.strip().str.lower()
+
+
+@dataclass(frozen=True, eq=False)
+class RecipeMatrix:
+    items: pd.Index         # item_key() of each recipe
+    ingredients: pd.Index   # normalize_text() of each ingredient column
+    quantities: np.ndarray  # float32, shape (len(items), len(ingredients))
+
+    def rows(self, item_names):
+        """Row of each item name in the matrix, -1 for items without a recipe."""
+        return self.items.get_indexer(item_key(item_names))
+
+    def usage(self, counts):
+        """Ingredient usage for a counts vector (or a months x items matrix of counts)."""
+        return np.asarray(counts, dtype=np.float64) @ self.quantities
+
+
+def build_recipe_matrix(ing):
+    ingredient_cols = [col for col in ing.columns if col != "Item name"]
+    quantities = ing[ingredient_cols].apply(pd.to_numeric, errors="coerce").fillna(0)
+    # Duplicate recipe rows would each be merged onto a sale, so they add up
+    quantities = quantities.groupby(item_key(ing["Item name"]).to_numpy(), sort=False).sum()
+
+    return RecipeMatrix(
+        items=pd.Index(quantities.index),
+        ingredients=pd.Index([normalize_text(col) for col in ingredient_cols]),
+        quantities=quantities.to_numpy(dtype=np.float32),
+    )
 
-                const data = await response.json();
 
-                if (!response.ok || data.error) {
-                    setNote("Error: " + (data.error || "Failed to generate chart."));
-                    return;
-                }
+# Dataset registry
+#
+# Routes never see half-loaded data: a load builds a complete Dataset and publishes
+# it in one reference swap. Routes call current_dataset() once per request and keep
+# using that reference; the frames in a published Dataset must not be modified.
+@dataclass(frozen=True)
+class Dataset:
+    version: int
+    group: pd.DataFrame
+    category: pd.DataFrame
+    item: pd.DataFrame
+    ship: pd.DataFrame
+    ingredient: pd.DataFrame
+    item_norm: pd.DataFrame     # item with normalize_text() column names and numeric ingredients
+    item_labels: dict           # normalized column name -> original item column name
+    recipe: RecipeMatrix
+    usage_by_month: pd.DataFrame  # (month, monthnumerical) x ingredient usage in shipment units
+
+
+def build_item_view(item):
+    """Return (item_norm, item_labels) for a Dataset; done once per version instead of per request."""
+    col_name_map_forward = {col: normalize_text(col) for col in item.columns}
+    item_labels = {v: k for k, v in col_name_map_forward.items()}
+    item_norm = item.rename(columns=col_name_map_forward)
+    for col in TARGETS_INGREDIENTS:
+        if col in item_norm.columns:
+            item_norm[col] = pd.to_numeric(item_norm[col], errors="coerce").fillna(0)
+    return item_norm, item_labels
 
-                if (data.image) {
-                    setImgUrl("data:image/png;base64," + data.image);
-                    setNote(data.note || "Timeline generated successfully.");
-                    setTableData(data.table_data || []);
-                }
-            } catch (e) {
-                console.error("Plotting error:", e);
-                setNote("An unexpected error occurred.");
-            } finally {
-                setLoading(false);
-            }
-        };
-
-        return (
-            <div>
-                <h2>Used/Shipped Timeline</h2>
-                <p>View how usage and shipment quantities change over time for each ingredient.</p>
-
-                <div style={{ marginBottom: 15 }}>
-                    <label>Ingredient: </label>
-                    <select
-                        value={selectedIngredient}
-                        onChange={(e) => setSelectedIngredient(e.target.value)}
-                    >
-                        <option value="">--Select Ingredient--</option>
-                        {ingredientOptions.map((ing, i) => (
-                            <option key={i} value={ing}>
-                                {ing}
-                            </option>
-                        ))}
-                    </select>
-
-                    <button
-                        onClick={handleGenerateChart}
-                        disabled={loading || !selectedIngredient}
-                        style={{ marginLeft: 10 }}
-                    >
-                        {loading ? "Generating..." : "Generate Timeline"}
-                    </button>
-                </div>
-
-                {note && (
-                    <div style={{ color: "darkblue", marginBottom: 15 }}>
-                        <strong>{note}</strong>
-                    </div>
-                )}
-
-                {imgUrl && (
-                    <div style={{ marginTop: 20 }}>
-                        <img src={imgUrl} alt="Used vs Shipped Timeline" style={{ maxWidth: "100%" }} />
-                    </div>
-                )}
-
-                {tableData.length > 0 && (
-                    <div style={{ marginTop: 30 }}>
-                        <h3>Data Table ({selectedIngredient})</h3>
-                        <table style={{ borderCollapse: "collapse", width: "100%", border: "1px solid #ddd" }}>
-                            <thead>
-                                <tr style={{ backgroundColor: "#f2f2f2" }}>
-                                    <th style={{ border: "1px solid #ddd", padding: "8px" }}>Month</th>
-                                    <th style={{ border: "1px solid #ddd", padding: "8px", textAlign: "right" }}>Used</th>
-                                    <th style={{ border: "1px solid #ddd", padding: "8px", textAlign: "right" }}>Shipped</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                                {tableData.map((row, index) => (
-                                    <tr key={index}>
-                                        <td style={{ border: "1px solid #ddd", padding: "8px" }}>{row.month}</td>
-                                        <td style={{ border: "1px solid #ddd", padding: "8px", textAlign: "right" }}>{row.Used}</td>
-                                        <td style={{ border: "1px solid #ddd", padding: "8px", textAlign: "right" }}>{row.Shipped}</td>
-                                    </tr>
-                                ))}
-                            </tbody>
-                        </table>
-                    </div>
-                )}
-            </div>
-        );
-    };
-    
-    // Bestsellers Tab
-    const Bestsellers = () => {
-        const [selectedMonth, setSelectedMonth] = usePersistentState("bestsellers_selectedMonth", "");
-        const [imgUrl, setImgUrl] = usePersistentState("bestsellers_imgUrl", "");
-        const [note, setNote] = usePersistentState("bestsellers_note", "");
-        const [ingredientTable, setIngredientTable] = usePersistentState("bestsellers_ingredientTable", []);
-        const [frequencyTable, setFrequencyTable] = usePersistentState("bestsellers_frequencyTable", []);
-        const [monthOptions, setMonthOptions] = React.useState([]);
-        const [loading, setLoading] = React.useState(false);
-
-        // --- Fetch unique months on load (unchanged) ---
-        React.useEffect(() => {
-            fetch("/get_unique_months")
-                .then((r) => r.json())
-                .then((data) => {
-                    setMonthOptions(data.months || []);
-                })
-                .catch((e) => console.error("Error fetching months:", e));
-        }, []);
-
-        const handleGenerateChart = async () => {
-            setLoading(true);
-            setImgUrl("");
-            setNote("");
-            setIngredientTable([]);
-            setFrequencyTable([]); // <-- Reset frequency table
-
-            try {
-                const response = await fetch("/bestsellers_plot", {
-                    method: "POST",
-                    headers: { "Content-Type": "application/json" },
-                    body: JSON.stringify({ month: selectedMonth }), 
-                });
-
-                if (!response.ok) {
-                    const txt = await response.text();
-                    setNote("Chart Error: " + txt);
-                    return;
-                }
 
-                const data = await response.json();
+def build_usage_by_month(item_norm, recipe):
+    """Ingredient usage per (month, monthnumerical), in shipment units (pounds or pieces).
 
-                if (data.error) {
-                    setNote("Error: " + data.error);
-                    return;
-                }
-                
-                if (data.image) {
-                    setImgUrl("data:image/png;base64," + data.image);
-                    setNote(data.note || "Chart generated successfully.");
-                    setIngredientTable(data.ingredient_table || []); 
-                    setFrequencyTable(data.frequency_table || []); // <-- SAVE NEW FREQUENCY DATA
-                }
+    Sales counts are scattered into a months x recipe-items matrix and multiplied by
+    the recipe matrix once, so every month is computed in the same vectorized pass.
+    """
+    keys = pd.MultiIndex.from_frame(item_norm[["month", "monthnumerical"]])
+    months = keys.unique().sort_values()
+    month_rows = months.get_indexer(keys)
+    item_rows = recipe.rows(item_norm["itemname"])
+    known = item_rows >= 0
 
-            } catch (e) {
-                console.error("Plotting error:", e);
-                setNote("An unexpected error occurred during plotting.");
-            } finally {
-                setLoading(false);
-            }
-        };
+    counts = np.zeros((len(months), len(recipe.items)))
+    np.add.at(counts, (month_rows[known], item_rows[known]), item_norm["count"].to_numpy(dtype=np.float64)[known])
 
-        return (
-            <div>
-                <h2>Bestsellers Analysis</h2>
-                
-                {/* ... (Month selection and chart display remain the same) ... */}
-
-                <div style={{ marginBottom: 15 }}>
-                    <label>Month: </label>
-                    <select 
-                        value={selectedMonth} 
-                        onChange={(e) => setSelectedMonth(e.target.value)}
-                    >
-                        <option value="">--All Months--</option> {/* Optional value */}
-                        {monthOptions.map((month) => (
-                            <option key={month} value={month}>
-                                {month}
-                            </option>
-                        ))}
-                    </select>
-
-                    <button 
-                        onClick={handleGenerateChart} 
-                        disabled={loading}
-                        style={{ marginLeft: 10 }}
-                    >
-                        {loading ? "Generating..." : "Generate Chart"}
-                    </button>
-                </div>
-
-                {note && (
-                    <div style={{ color: "darkblue", marginBottom: 15 }}>
-                        <strong>{note}</strong>
-                    </div>
-                )}
-
-                {imgUrl && (
-                    <div style={{ marginTop: 20 }}>
-                        <img src={imgUrl} alt="Top 10 Bestsellers Plot" style={{ maxWidth: "100%" }} />
-                    </div>
-                )}
-
-                {/* Existing Ingredient Breakdown Table */}
-                {ingredientTable.length > 0 && (
-                    <div style={{ marginTop: 40, width: '100%' }}>
-                        <h3>Ingredient Breakdown for Top Sellers</h3>
-                        <table style={{ borderCollapse: 'collapse', width: '100%', border: '1px solid #ddd' }}>
-                            <thead>
-                                <tr style={{ backgroundColor: '#f2f2f2' }}>
-                                    <th style={{ border: '1px solid #ddd', padding: '8px', width: '30%' }}>Food Item</th>
-                                    <th style={{ border: '1px solid #ddd', padding: '8px', width: '70%' }}>Ingredients Used</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                                {ingredientTable.map((row, index) => (
-                                    <tr key={index}>
-                                        <td style={{ border: '1px solid #ddd', padding: '8px' }}>{row['Food Item']}</td>
-                                        <td style={{ border: '1px solid #ddd', padding: '8px' }}>
-                                            {row.Ingredients.join(', ')}
-                                        </td>
-                                    </tr>
-                                ))}
-                            </tbody>
-                        </table>
-                    </div>
-                )}
-                
-                {/* NEW: Ingredient Frequency Table */}
-                {frequencyTable.length > 0 && (
-                    <div style={{ marginTop: 40, width: '100%' }}>
-                        <h3>Ingredient Frequency in Top Sellers</h3>
-                        <table style={{ borderCollapse: 'collapse', width: '35%', border: '1px solid #ddd' }}>
-                            <thead>
-                                <tr style={{ backgroundColor: '#e6e6fa' }}>
-                                    <th style={{ border: '1px solid #ddd', padding: '8px' }}>Ingredient</th>
-                                    <th style={{ border: '1px solid #ddd', padding: '8px' }}>Frequency</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                                {frequencyTable.map((row, index) => (
-                                    <tr key={index}>
-                                        <td style={{ border: '1px solid #ddd', padding: '8px' }}>{row.Ingredient}</td>
-                                        <td style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'center' }}>{row.Frequency}</td>
-                                    </tr>
-                                ))}
-                            </tbody>
-                        </table>
-                    </div>
-                )}
-            </div>
-        );
-    };
-
-
-    const HelpModal = ({ show, onClose }) => {
-        const [conversation, setConversation] = useState([]);
-        const [input, setInput] = useState("");
-        const [loading, setLoading] = useState(false);
-        const chatEndRef = useRef(null);
-
-        useEffect(() => {
-            chatEndRef.current?.scrollIntoView({ behavior: "smooth" });
-        }, [conversation]);
-
-        const handleSend = async () => {
-            if (!input.trim() || loading) return;
-
-            const userMessage = { role: 'user', text: input };
-            // Use the optimistic update state where we add the user message
-            const historyPayload = [...conversation, userMessage]; 
-            
-            setConversation(prev => [...prev, userMessage]);
-            setInput("");
-            setLoading(true);
-
-            try {
-                const pageContent = document.body.innerText;
-                const response = await fetch('/ask_gemini', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({
-                        content: pageContent,
-                        history: historyPayload
-                    }),
-                });
-                
-                // --- FIX IS HERE ---
-                // Always parse the JSON body, regardless of the HTTP status
-                const data = await response.json();
-                
-                if (response.ok) {
-                    // SUCCESS: HTTP Status 200-299. We expect the 'response' key.
-                    const botMessage = { role: 'bot', text: data.response };
-                    setConversation(prev => [...prev, botMessage]);
-                } else {
-                    // ERROR: HTTP Status 4xx or 5xx. We expect the 'error' key from Flask.
-                    console.error("Server Error:", data.error);
-                    const errorMessage = { 
-                        role: 'bot', 
-                        text: data.error || "An unknown server error occurred." // Fallback text
-                    };
-                    setConversation(prev => [...prev, errorMessage]);
-                }
-                // --- END OF FIX ---
-                
-            } catch (error) {
-                console.error("Error contacting Gemini API:", error);
-                // This catch block handles network errors or complete JSON parsing failures
-                const errorMessage = { role: 'bot', text: "Sorry, I'm having trouble connecting. Please try again later." };
-                setConversation(prev => [...prev, errorMessage]);
-            } finally {
-                setLoading(false);
-            }
-        };
-
-        if (!show) return null;
-
-        return (
-            <div className="help-modal-overlay" onClick={onClose}>
-                <div className="help-modal-content" onClick={e => e.stopPropagation()}>
-                    <div className="help-modal-chat">
-                        {conversation.map((msg, index) => (
-                            <div key={index} style={{ textAlign: msg.role === 'user' ? 'right' : 'left', margin: '5px 0' }}>
-                                <p style={{ background: msg.role === 'user' ? '#dcf8c6' : '#f1f0f0', padding: '10px', borderRadius: '10px', display: 'inline-block' }}>
-                                    {msg.text}
-                                </p>
-                            </div>
-                        ))}
-                        {loading && (
-                            <div style={{ textAlign: 'left', margin: '5px 0' }}>
-                                <p style={{ background: '#f1f0f0', padding: '10px', borderRadius: '10px', display: 'inline-block' }}>
-                                    Thinking...
-                                </p>
-                            </div>
-                        )}
-                        <div ref={chatEndRef} />
-                    </div>
-                    <div className="help-modal-input">
-                        <input
-                            type="text"
-                            value={input}
-                            onChange={e => setInput(e.target.value)}
-                            onKeyPress={e => e.key === 'Enter' && handleSend()}
-                            placeholder="Ask about the results on the page..."
-                            disabled={loading}
-                        />
-                        <button onClick={handleSend} disabled={loading || !input.trim()}>
-                            {loading ? '...' : 'Send'}
-                        </button>
-                    </div>
-                </div>
-            </div>
-        );
-    };
-
-    // Application
-    const App = () => {
-      const [activeTab, setActiveTab] = React.useState("File Upload");
-      const [columnNames, setColumnNames] = React.useState([]);
-      const [targetVariable, setTargetVariable] = React.useState("");
-      const [modelBuilt, setModelBuilt] = React.useState(false);
-      const [modelTargets, setModelTargets] = React.useState([]);
-      const [showHelp, setShowHelp] = React.useState(false);
-
-
-      const handleModelBuilt = (targets) => {
-        setModelBuilt(true);
-        setModelTargets(targets || []);
-
-
-        setActiveTab("Graphing");
-      };
-
-
-      return (
-        <div>
-          <div className="top-bar">
-            <div>
-              <button onClick={() => setActiveTab("File Upload")}>File Upload</button>
-              <button onClick={() => setActiveTab("Graphing")}>Graphing</button>
-              <button onClick={() => setActiveTab("NextMonthUsage")}>Next Month Usage</button>
-              <button onClick={() => setActiveTab("CostPrediction")}>Cost Prediction</button>
-              <button onClick={() => setActiveTab("RevenuePrediction")}>Revenue Prediction</button>
-              <button onClick={() => setActiveTab("ShipmentVsUsage")}>Shipment vs. Usage</button>
-              <button onClick={() => setActiveTab("UsedShippedTimeline")}>Used/Shipped Timeline</button>
-              <button onClick={() => setActiveTab("Bestsellers")}>Bestsellers</button>
-            </div>
-            <div>
-              {/* could show modelBuilt indicator */}
-              {modelBuilt ? <strong>Model built</strong> : null}
-            </div>
-          </div>
-          <button className="help-button" onClick={() => setShowHelp(true)}>HELP</button>
-          <HelpModal show={showHelp} onClose={() => setShowHelp(false)} />
-
-
-          <div style={{ padding: 12 }}>
-            {activeTab === "File Upload" && (
-              <FileUpload setColumnNames={setColumnNames} setTargetVariable={setTargetVariable} />
-            )}
-            {activeTab === "Graphing" && (
-              <Graphing columnNames={columnNames} modelBuilt={modelBuilt} modelTargets={modelTargets} />
-            )}
-            {activeTab === "NextMonthUsage" && (
-              <NextMonthUsage columnNames={columnNames} modelBuilt={modelBuilt} modelTargets={modelTargets} />
-            )}
-            {activeTab === "CostPrediction" && (
-              <CostPrediction columnNames={columnNames} modelBuilt={modelBuilt} modelTargets={modelTargets} />
-            )}
-            {activeTab === "RevenuePrediction" && (
-              <RevenuePrediction columnNames={columnNames} modelBuilt={modelBuilt} modelTargets={modelTargets} />
-            )}
-            {activeTab === "ShipmentVsUsage" && (
-                <ShipmentVsUsage columnNames={columnNames} modelBuilt={modelBuilt} modelTargets={modelTargets} />
-            )}
-            {activeTab === "UsedShippedTimeline" && (
-                <UsedShippedTimeline columnNames={columnNames} modelBuilt={modelBuilt} modelTargets={modelTargets} />
-            )}
-            {activeTab === "Bestsellers" && (
-                <Bestsellers columnNames={columnNames} modelBuilt={modelBuilt} modelTargets={modelTargets} />
-            )}
-          </div>
-        </div>
-      );
-    };
-
-
-    ReactDOM.render(<App />, document.getElementById('root'));
-  </script>
-  {% endraw %}
-</body>
-</html>
-"""
+    divisor = np.array([LB_TO_GRAM if UNIT_CONVERSION_REQUIRED.get(ing, 0) == 1 else 1.0 for ing in recipe.ingredients])
+    return pd.DataFrame(recipe.usage(counts) / divisor, index=months, columns=recipe.ingredients)
 
 
-# Flask endpoints
+_dataset = None
+_dataset_lock = threading.Lock()
 
 
-@app.route("/")
-def index():
-    return render_template_string(HTML_TEMPLATE)
+_cold_start_done = False
+_cold_start_lock = threading.Lock()
 
 
-@app.route("/upload", methods=["POST"])
-def upload_file():
-    global group, category, item, ship
+def current_dataset():
+    """The latest published Dataset, or None before any data is loaded.
+
+    The first call restores the last processed snapshot, if there is one. This is not
+    done at import, so worker processes that import this module never map the snapshot.
+    """
+    global _cold_start_done
+    if _dataset is None and not _cold_start_done:
+        with _cold_start_lock:
+            if not _cold_start_done:
+                try:
+                    restore_snapshot()
+                except Exception as e:
+                    print(f"Could not restore processed snapshot: {e}")
+                _cold_start_done = True
+    return _dataset
+
+
+def publish_dataset(dataset):
+    global _dataset
+    with _dataset_lock:
+        if _dataset is None or dataset.version >= _dataset.version:
+            _dataset = dataset
+            # Results computed from older snapshots can no longer be served
+            result_cache.retain_version(dataset.version)
+
+
+def restore_snapshot():
+    """Publish the processed snapshot as the current Dataset, without reading any Excel file."""
+    manifest = read_manifest()
+    if manifest is None:
+        return None
+    tables = load_snapshot(manifest)
+    item_norm, item_labels = build_item_view(tables["item"])
+    recipe = build_recipe_matrix(tables["ingredient"])
+    publish_dataset(Dataset(
+        version=manifest["version"],
+        item_norm=item_norm,
+        item_labels=item_labels,
+        recipe=recipe,
+        usage_by_month=build_usage_by_month(item_norm, recipe),
+        **tables,
+    ))
+    return manifest["version"]
+
+
+def plain_dtypes(df):
+    """Copy of df with Arrow-backed columns turned back into NumPy/str dtypes, for plotting libraries."""
+    return pa.Table.from_pandas(df, preserve_index=False).to_pandas(ignore_metadata=True)
+
+
+# Result cache
+#
+# The prediction and plot routes are pure functions of the dataset version and a few
+# request fields, so their successful responses (rendered charts, metrics, selected
+# features, coefficients) are kept in an in-memory LRU keyed on
+# (dataset version, endpoint, params). publish_dataset() drops entries for older versions.
+# Each entry carries a strong ETag (a hash of the body), and a request whose
+# If-None-Match matches it is answered with 304 Not Modified.
+
+# Upper bound on the total size of cached response bodies
+RESULT_CACHE_MB = float(os.environ.get("RESULT_CACHE_MB", "64"))
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    mimetype: str
+    etag: str
+
+
+class ResultCache:
+    """Thread-safe LRU of CachedResponse entries, bounded by the total size of their bodies."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        if len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            self._entries[key] = entry
+            self._bytes += len(entry.body)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+
+    def retain_version(self, version):
+        """Drop every entry computed from a dataset version other than `version`."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] != version]:
+                self._bytes -= len(self._entries.pop(key).body)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+
+result_cache = ResultCache(int(RESULT_CACHE_MB * 1024 * 1024))
+_key_locks = {}
+_key_locks_guard = threading.Lock()
+
+
+def _key_lock(key):
+    """The lock under which `key` is computed, so concurrent requests for it compute it once."""
+    with _key_locks_guard:
+        lock = _key_locks.get(key)
+        if lock is None:
+            if len(_key_locks) >= 1024:
+                for stale in [k for k, held in _key_locks.items() if not held.locked()]:
+                    del _key_locks[stale]
+            lock = _key_locks[key] = threading.Lock()
+        return lock
+
+
+def result_key(dataset, endpoint, params, req):
+    """Cache key for `endpoint` with the request fields named in params (field -> default)."""
+    values = tuple((name, json.dumps(req.get(name, default), sort_keys=True)) for name, default in params.items())
+    return (dataset.version, endpoint, values)
+
+
+def cached_response(response):
+    """A CachedResponse for a successful JSON or image response, else None."""
+    if response.status_code != 200 or response.mimetype not in ("application/json", "image/png"):
+        return None
+    response.direct_passthrough = False  # send_file() streams; read the body once
+    body = response.get_data()
+    return CachedResponse(body, response.mimetype, hashlib.sha256(body).hexdigest()[:32])
+
+
+def cached_result(**params):
+    """Serve a route from result_cache; params maps each request field it reads to its default."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper():
+            dataset = current_dataset()
+            if dataset is None:
+                return view()
+            key = result_key(dataset, view.__name__, params, request.get_json(silent=True) or {})
+            entry = result_cache.get(key)
+            state = "hit"
+            if entry is None:
+                # Different results compute in parallel (charts render on the render pool);
+                # a request that waited here for the same result, e.g. on the warmup
+                # thread, finds it cached
+                with _key_lock(key):
+                    entry = result_cache.get(key)
+                    if entry is None:
+                        response = make_response(view())
+                        entry = cached_response(response)
+                        if entry is None:
+                            return response
+                        result_cache.put(key, entry)
+                        state = "miss"
+            if request.if_none_match.contains(entry.etag):
+                response = app.response_class(status=304)
+            else:
+                response = app.response_class(entry.body, mimetype=entry.mimetype)
+            response.set_etag(entry.etag)
+            response.headers["X-Result-Cache"] = state
+            return response
+        return wrapper
+    return decorator
+
+
+# Background warmup
+#
+# The prediction tabs only ever ask for a handful of requests (the frontend's month
+# options, the cost model, the two revenue charts), so once a dataset version is live
+# they are computed on a background thread and stored in result_cache. /warmup_status
+# reports progress.
+
+# Set PREDICT_WARMUP=0 to compute prediction results only on demand
+PREDICT_WARMUP = os.environ.get("PREDICT_WARMUP", "1") != "0"
+
+# (endpoint, request JSON) pairs, as the frontend sends them
+WARMUP_REQUESTS = [
+    *[("predict_next_month_usage", {"month": month, "format": "spec"}) for month in ["June", "July", "Aug", "Sept", "Oct", "Nov"]],
+    ("predict_cost_loocv", {"format": "spec"}),
+    ("predict_revenue_stepwise", {"plot_type": "bar", "format": "spec"}),
+    ("predict_revenue_stepwise", {"plot_type": "line", "format": "spec"}),
+]
 
+_warmup_status = {"version": None, "state": "idle", "done": 0, "total": 0, "current": None, "errors": []}
+_warmup_lock = threading.Lock()
+
+
+def warmup_status():
+    with _warmup_lock:
+        return dict(_warmup_status, errors=list(_warmup_status["errors"]))
+
+
+def start_warmup():
+    """Start warming result_cache for the current dataset version, once per version."""
+    dataset = current_dataset()
+    if not PREDICT_WARMUP or dataset is None:
+        return
+    with _warmup_lock:
+        if _warmup_status["version"] == dataset.version:
+            return
+        _warmup_status.update(version=dataset.version, state="running", done=0,
+                              total=len(WARMUP_REQUESTS), current=None, errors=[])
+    threading.Thread(target=_run_warmup, args=(dataset.version,), name="prediction-warmup", daemon=True).start()
+
+
+def _run_warmup(version):
+    if RENDER_EXECUTOR == "process":
+        render_pool()
+    for endpoint, body in WARMUP_REQUESTS:
+        dataset = current_dataset()
+        if dataset is None or dataset.version != version:
+            # A newer version has been published and gets its own warmup
+            with _warmup_lock:
+                if _warmup_status["version"] == version:
+                    _warmup_status.update(state="superseded", current=None)
+            return
+        with _warmup_lock:
+            _warmup_status["current"] = f"{endpoint} {json.dumps(body)}"
+        try:
+            with app.test_request_context(f"/{endpoint}", method="POST", json=body):
+                response = make_response(app.view_functions[endpoint]())
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}")
+        except Exception as e:
+            with _warmup_lock:
+                _warmup_status["errors"].append(f"{endpoint} {json.dumps(body)}: {e}")
+        with _warmup_lock:
+            _warmup_status["done"] += 1
+    with _warmup_lock:
+        if _warmup_status["version"] == version:
+            _warmup_status.update(state="done", current=None)
+
+
+_current_pointer = None  # (inode, mtime) of CURRENT when it was last checked
+
+
+@app.before_request
+def refresh_snapshot():
+    """Swap to a newer snapshot if another worker process has published one."""
+    global _current_pointer
     try:
-        import re
-        import pandas as pd
-        import os
-        from flask import jsonify
-        import numpy as np
+        st = os.stat(os.path.join(PROCESSED_DIR, "CURRENT"))
+    except OSError:
+        return
+    pointer = (st.st_ino, st.st_mtime_ns)
+    if pointer == _current_pointer:
+        return
+    manifest = read_manifest()
+    dataset = current_dataset()
+    if manifest is not None and (dataset is None or manifest["version"] != dataset.version):
+        try:
+            restore_snapshot()
+        except Exception as e:
+            # e.g. a concurrent publish pruned the snapshot mid-read: serve this request from
+            # the dataset already loaded, and the pointer stays stale so the next one retries
+            print(f"Could not restore processed snapshot: {e}")
+            return
+    _current_pointer = pointer
+    start_warmup()
+
+
+# Stepwise AIC selection
+#
+# The prediction routes choose predictors with a bidirectional stepwise search on AIC.
+# Instead of refitting an OLS model per candidate, the search keeps the centered
+# cross-product matrix of [X y] in swept form: sweeping a column in or out updates the
+# current regression in O(p^2), and the RSS after adding or dropping any one column is
+# read straight off the matrix.
+
+# A column whose residual sum of squares (after regressing on the selected columns)
+# is below this fraction of its own centered sum of squares adds no rank to the design
+STEPWISE_RANK_TOL = 1e-10
+# AIC differences below this are rounding noise (e.g. between collinear columns) and count as ties
+STEPWISE_TIE_TOL = 1e-9
+# A fit's RSS is never taken below this fraction of the response's raw sum of squares, the
+# size of the rounding error in a refit OLS. A constant response then scores a finite AIC
+# and keeps the intercept-only model, as it does with statsmodels, instead of every model
+# scoring -inf on an exact zero RSS.
+STEPWISE_RSS_FLOOR = np.finfo(np.float64).eps ** 2
+
+
+def ols_aic(rss, nobs, rank, rss_floor=0.0):
+    """AIC of an OLS fit as statsmodels reports it (rank counts the intercept); works on arrays."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        llf = -nobs / 2.0 * (np.log(2 * np.pi) + np.log(np.maximum(rss, rss_floor) / nobs) + 1)
+    return -2 * llf + 2 * rank
+
+
+def _sweep(A, k, inverse=False):
+    """Sweep (or reverse-sweep) column k of the symmetric matrix A in place."""
+    d = A[k, k]
+    col = A[:, k].copy()
+    A -= np.outer(col, col) / d
+    A[:, k] = A[k, :] = (-col if inverse else col) / d
+    A[k, k] = -1.0 / d
+
+
+def score_moves(A, swept, scale, nobs, response=None, rss_floor=0.0):
+    """AIC after adding each unswept column / dropping each swept column, as one vector.
+
+    For an unswept column, A[j, j] and A[j, y] are its residual sum of squares and its
+    residual cross-product with y after projecting out the current design, so adding it
+    lowers the RSS by A[j, y]^2 / A[j, j]. For a swept column A[j, j] = -(X'X)^-1_jj and
+    A[j, y] is its coefficient, and the same expression gives the RSS increase of dropping it.
+    The response y is column `response` of A (default: the one right after the predictors),
+    and no RSS is scored below rss_floor.
+    """
+    p = len(swept)
+    response = p if response is None else response
+    rss, rank = A[response, response], 1 + np.count_nonzero(swept)
+    diag, xy = np.diag(A)[:p], A[:p, response]
+    # Collinear with the current design: same fit, same rank
+    collinear = ~swept & (diag <= STEPWISE_RANK_TOL * scale[:p])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rss_after = np.where(collinear, rss, rss - xy ** 2 / diag)
+    rank_after = np.where(swept, rank - 1, np.where(collinear, rank, rank + 1))
+    return ols_aic(rss_after, nobs, rank_after, rss_floor)
+
+
+def _first_min(scores):
+    """Index of the first score within STEPWISE_TIE_TOL of the minimum."""
+    return int(np.argmax(scores <= scores.min() + STEPWISE_TIE_TOL))
+
+
+def stepwise_aic(X, y, candidates=None):
+    """Bidirectional stepwise OLS selection on AIC, with the intercept always in the model.
+
+    Makes the same moves as refitting sm.OLS for every candidate: each step scores every
+    single add and drop, the lowest AIC wins (an add beats a drop with the same score, then
+    the column name decides), and the search stops when no move beats the current model.
+    Returns (selected_features, aic) with features in the order they were added.
+
+    Where the design has exactly collinear columns, several feature sets share the same
+    AIC; statsmodels then picks by rounding noise, this picks by column name (scores within
+    STEPWISE_TIE_TOL are ties). Both give the same fitted values.
+    """
+    return stepwise_aic_multi(X, np.asarray(y, dtype=np.float64)[:, None], candidates)[0]
+
+
+def stepwise_aic_multi(X, Y, candidates=None):
+    """stepwise_aic() for every column of Y against the same predictors X, in one pass.
+
+    All responses share one cross-product matrix of [X Y]. Each feature set reached by any
+    search is swept once, with every response as a right-hand side, so targets that walk
+    the same path reuse each other's factorizations. Selection is still per response and
+    per-response AIC. Returns one (selected_features, aic) per column of Y.
+    """
+    # Columns in name order, so argmin breaks exact ties by name
+    names = sorted(X.columns if candidates is None else candidates)
+    Y = np.asarray(Y, dtype=np.float64)
+    Z = np.column_stack([X[names].to_numpy(dtype=np.float64), Y])
+    rss_floors = STEPWISE_RSS_FLOOR * (Y ** 2).sum(axis=0)
+    Z -= Z.mean(axis=0)
+    searches = _stepwise_search(Z.T @ Z, len(Z), names, range(len(names), Z.shape[1]), rss_floors=rss_floors)
+    return [(selected, aic) for selected, aic, _ in searches]
+
+
+def _stepwise_search(A, nobs, names, responses, active=None, rss_floors=None):
+    """Stepwise search on the centered cross-product matrix A of [X Y] (X columns = names).
+
+    Runs one search per response column index; columns where `active` is False are never
+    added, and rss_floors gives each response's score_moves() rss_floor (default 0). Returns (selected_features, aic, swept matrix of the selected model) per response.
+    """
+    p = len(names)
+    if p == 0:
+        return [([], float("inf"), A) for _ in responses]
+    scale = np.diag(A).copy()
+    addable = np.ones(p, dtype=bool) if active is None else np.asarray(active, dtype=bool)
+
+    # Swept matrix per feature set, keyed by the swept mask
+    swept_matrices = {bytes(p): A}
+
+    def swept_matrix(swept, j):
+        """Matrix for `swept` with column j toggled (swept in or out)."""
+        toggled = swept.copy()
+        toggled[j] = not toggled[j]
+        key = toggled.tobytes()
+        if key not in swept_matrices:
+            B = swept_matrices[swept.tobytes()].copy()
+            _sweep(B, j, inverse=swept[j])
+            swept_matrices[key] = B
+        return toggled, swept_matrices[key]
+
+    rss_floors = np.zeros(len(responses)) if rss_floors is None else rss_floors
+    results = []
+    for response, rss_floor in zip(responses, rss_floors):
+        swept, B = np.zeros(p, dtype=bool), A
+        selected = []
+        best_score = float("inf")
+        while True:
+            scores = score_moves(B, swept, scale, nobs, response, rss_floor)
+            adds = np.where(swept | ~addable, np.inf, scores)
+            drops = np.where(swept, scores, np.inf)
+            best_add, best_drop = _first_min(adds), _first_min(drops)
+            current_best_score = min(adds[best_add], drops[best_drop])
+            if not current_best_score < best_score:
+                break
+            if adds[best_add] <= current_best_score + STEPWISE_TIE_TOL:
+                j = best_add
+                selected.append(names[j])
+            else:
+                j = best_drop
+                selected.remove(names[j])
+            swept, B = swept_matrix(swept, j)
+            best_score = current_best_score
+        results.append((selected, float(best_score), B))
+    return results
+
+
+def loocv_stepwise(X, y, candidates):
+    """Leave-one-out stepwise OLS without refitting: one fold per row of X.
+
+    Gives the same folds and models as fitting StandardScaler, stepwise_aic() and a final
+    OLS on every training fold (only columns that vary within the fold are candidates).
+    Every fold's centered cross-products come from the full-data matrix C by the
+    leave-one-out downdate C - n/(n-1) d_i d_i', d_i being row i's deviation from the
+    column means, and the held-out prediction and coefficients are read off the fold's
+    final swept matrix.
+
+    Returns (predictions, coefficients, has_model): the held-out prediction per row (the
+    training mean when no column varies), an n x len(candidates) DataFrame of coefficients
+    on the standardized scale (0 where not selected), and whether any column varied.
+    """
+    names = sorted(candidates)
+    Z = np.column_stack([X[names].to_numpy(dtype=np.float64), np.asarray(y, dtype=np.float64)])
+    n, p = len(Z), len(names)
+    means = Z.mean(axis=0)
+    D = Z - means
+    C = D.T @ D
+
+    predictions = np.empty(n)
+    coefficients = np.zeros((n, p))
+    has_model = np.zeros(n, dtype=bool)
+    for i in range(n):
+        fold = np.delete(Z[:, :p], i, axis=0)
+        varies = (fold != fold[:1]).any(axis=0)
+        fold_means = (n * means - Z[i]) / (n - 1)
+        if not varies.any():
+            predictions[i] = fold_means[p]
+            continue
+        has_model[i] = True
+        C_fold = C - n / (n - 1) * np.outer(D[i], D[i])
+        rss_floor = STEPWISE_RSS_FLOOR * ((Z[:, p] ** 2).sum() - Z[i, p] ** 2)
+        (selected, _, B), = _stepwise_search(C_fold, n - 1, names, [p], active=varies, rss_floors=[rss_floor])
+        cols = [names.index(f) for f in selected]
+        beta = B[cols, p]
+        predictions[i] = fold_means[p] + (Z[i, cols] - fold_means[cols]) @ beta
+        # StandardScaler divides by the population standard deviation of the fold
+        coefficients[i, cols] = beta * np.sqrt(np.diag(C_fold)[cols] / (n - 1))
+
+    coefficients = pd.DataFrame(coefficients, index=X.index, columns=names)[list(candidates)]
+    return predictions, coefficients, has_model
+
+
+# Next-month usage models
+#
+# /predict_next_month_usage selects features for every ingredient target in one shared-
+# design stepwise pass, then fits one model per target. The fits share nothing but the
+# read-only training frames, so they can run on a worker pool with the results merged
+# back in target order. Each fit is a few milliseconds of mostly pandas/statsmodels
+# overhead, so a pool gains little (6 months x 18 targets: serial 746 ms, thread 705 ms,
+# process 1029 ms, see benchmarks/bench_usage_targets.py) and the default is serial.
+
+# "serial" (default), "thread" or "process"
+PREDICT_EXECUTOR = os.environ.get("PREDICT_EXECUTOR", "serial")
+# Workers per pool (0 = one per CPU for threads, default_pool_size() for processes)
+PREDICT_WORKERS = int(os.environ.get("PREDICT_WORKERS", "0"))
+
+_predict_pools = {}
+_predict_pools_lock = threading.Lock()
+
+
+def _predict_pool(mode, workers):
+    """Long-lived pool for (mode, workers), created on first use."""
+    with _predict_pools_lock:
+        pool = _predict_pools.get((mode, workers))
+        if pool is None:
+            if mode == "thread":
+                pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count())
+            else:
+                pool = ProcessPoolExecutor(max_workers=workers or default_pool_size(), mp_context=worker_context())
+            _predict_pools[(mode, workers)] = pool
+        return pool
+
+
+def map_targets(fn, jobs, mode=None, workers=None):
+    """[fn(*job) for job in jobs], run on the PREDICT_EXECUTOR pool; results keep job order."""
+    mode = PREDICT_EXECUTOR if mode is None else mode
+    workers = PREDICT_WORKERS if workers is None else workers
+    if mode not in ("thread", "process", "serial"):
+        raise ValueError(f"Unknown PREDICT_EXECUTOR {mode!r} (expected thread, process or serial)")
+    if mode == "serial" or len(jobs) <= 1:
+        return [fn(*job) for job in jobs]
+    return list(_predict_pool(mode, workers).map(fn, *zip(*jobs)))
+
+
+def predict_usage_target(target, y_train, X_train, selected_features, test_df, train_means, month_label):
+    """Fit one target on its selected features, returning its (clipped) predictions for test_df.
+
+    An empty test_df (a month with no data yet) is predicted from the training means,
+    labelled month_label.
+    """
+    # If test_df is empty (November), create dummy X_test with training means to get a prediction
+    if test_df.empty:
+        X_test_dummy = pd.DataFrame([train_means], index=[month_label])
+        X_test_base = X_test_dummy[selected_features].copy()
+    else:
+        X_test_base = test_df[selected_features].copy()
+    y_train_min, y_train_max = y_train.min(), y_train.max()
+    mean_prediction = pd.Series(y_train.mean(), index=X_test_base.index if not X_test_base.empty else [month_label])
 
-        # --- Initial Data Loading ---
+    if not selected_features:
+        return mean_prediction
+    try:
+        # Final model fitting (using the training data)
+        final_model = sm.OLS(y_train, sm.add_constant(X_train[selected_features], has_constant="add")).fit()
 
-        months = [
-            "data/May_Data_Matrix (1).xlsx",
-            "data/June_Data_Matrix.xlsx",
-            "data/July_Data_Matrix (1).xlsx",
-            "data/August_Data_Matrix (1).xlsx",
-            "data/September_Data_Matrix.xlsx",
-            "data/October_Data_Matrix_20251103_214000.xlsx",
-        ]
-
-        dfs = []
-        for fpath in months:
-            for sheet_idx in range(3):
-                df = pd.read_excel(fpath, sheet_name=sheet_idx)
-                df["month"] = (
-                    os.path.basename(fpath).split("_")[0]
-                    .replace("Data", "")
-                    .strip()
-                )
-                dfs.append(df)
+        # Fill missing test data with training means
+        for col_name, mean_val in train_means.items():
+            if col_name in X_test_base.columns:
+                X_test_base[col_name] = X_test_base[col_name].fillna(mean_val)
 
-        # Split by type
-        group_dfs, category_dfs, item_dfs = [], [], []
-        for df in dfs:
-            cols = df.columns
-            if "Group" in cols:
-                group_dfs.append(df)
-            elif "Category" in cols:
-                category_dfs.append(df)
-            else:
-                item_dfs.append(df)
+        X_test = sm.add_constant(X_test_base, has_constant="add")
+        X_test = X_test.reindex(columns=final_model.model.exog_names, fill_value=0.0).astype(float)
 
-        group = pd.concat(group_dfs, ignore_index=True)
-        category = pd.concat(category_dfs, ignore_index=True)
-        item = pd.concat(item_dfs, ignore_index=True)
+        # Clip predictions to training range
+        return final_model.predict(X_test).clip(lower=y_train_min, upper=y_train_max)
+    except Exception as e:
+        # Prediction failed: use the mean
+        print(f"Prediction failed for {target}: {e}")
+        return mean_prediction
+
+
+# Revenue model
+#
+# /predict_revenue_stepwise regresses monthly revenue on polynomial month terms. There
+# are only a few terms, so every subset of them is fitted up front from one design
+# matrix (for every revenue series at once), and the stepwise search just walks the
+# resulting table of subset AICs instead of refitting formulas.
+
+REVENUE_TERMS = ["month_num", "month_sq", "month_cu"]
+# A move must improve AIC by more than this to be taken
+REVENUE_AIC_MARGIN = 1e-4
+
+
+def revenue_design(month_num):
+    """The REVENUE_TERMS columns for the given month numbers."""
+    month_num = np.asarray(month_num, dtype=np.float64)
+    return pd.DataFrame({"month_num": month_num, "month_sq": month_num ** 2, "month_cu": month_num ** 3})
+
+
+@dataclass(frozen=True, eq=False)
+class SubsetFits:
+    terms: list          # column names of the design
+    aic: np.ndarray      # (2 ** len(terms), series); row `mask` is the subset of terms in the bitmask
+    params: list         # per mask: (1 + terms in mask, series) coefficients, intercept first
+
+    def coefficients(self, selected, series=0):
+        """Intercept and coefficients of the model on `selected` (in that order), as a Series."""
+        mask = self.mask(selected)
+        in_mask = [term for j, term in enumerate(self.terms) if mask >> j & 1]
+        coef = dict(zip(["Intercept"] + in_mask, self.params[mask][:, series]))
+        return pd.Series({name: coef[name] for name in ["Intercept"] + list(selected)})
+
+    def mask(self, selected):
+        return sum(1 << self.terms.index(term) for term in selected)
+
+
+def fit_all_subsets(X, Y):
+    """OLS (intercept always in) of every column of Y on every subset of the columns of X."""
+    terms = list(X.columns)
+    X = X.to_numpy(dtype=np.float64)
+    Y = np.asarray(Y, dtype=np.float64).reshape(len(X), -1)
+    nobs, k = X.shape
+    aic = np.empty((2 ** k, Y.shape[1]))
+    params = []
+    for mask in range(2 ** k):
+        design = np.column_stack([np.ones(nobs)] + [X[:, j] for j in range(k) if mask >> j & 1])
+        coef, _, rank, _ = np.linalg.lstsq(design, Y, rcond=None)
+        rss = ((Y - design @ coef) ** 2).sum(axis=0)
+        aic[mask] = ols_aic(rss, nobs, rank)
+        params.append(coef)
+    return SubsetFits(terms, aic, params)
+
+
+def revenue_stepwise(fits, series=0):
+    """The revenue route's stepwise rule on precomputed subset AICs; returns the selected terms.
+
+    Each round tries the best single addition, then the best single removal (never down to
+    the intercept-only model), taking a move only if it lowers AIC by REVENUE_AIC_MARGIN.
+    """
+    aic = fits.aic[:, series]
+    k = len(fits.terms)
+    included, mask = [], 0
+    changed = True
+    while changed:
+        changed = False
+        # Forward step
+        excluded = [j for j in range(k) if not mask >> j & 1]
+        if excluded:
+            scores = [aic[mask | 1 << j] for j in excluded]
+            best = int(np.argmin(scores))
+            current_aic = aic[mask] if included else float("inf")
+            if scores[best] + REVENUE_AIC_MARGIN < current_aic:
+                included.append(excluded[best])
+                mask |= 1 << excluded[best]
+                changed = True
+        # Backward step
+        if included:
+            scores = [aic[mask & ~(1 << j)] if mask & ~(1 << j) else float("inf") for j in included]
+            worst = int(np.argmin(scores))
+            if scores[worst] + REVENUE_AIC_MARGIN < aic[mask]:
+                mask &= ~(1 << included.pop(worst))
+                changed = True
+    return [fits.terms[j] for j in included]
+
+
+def clip_revenue_history(data, second_month_num, last_observed_month_num):
+    """Clip in-sample revenue predictions and score them; returns (predicted, squared_error).
+
+    data holds one row per consecutive period ("month_num", "amount", "predicted"), so the
+    previous period's actual is a shift. Predictions after second_month_num up to the last
+    observed period are clipped to +-5% of that actual; squared errors cover the periods
+    after second_month_num that have both values, and are NaN elsewhere.
+    """
+    period = data["month_num"].to_numpy(dtype=np.float64)
+    actual = data["amount"].to_numpy(dtype=np.float64)
+    predicted = data["predicted"].to_numpy(dtype=np.float64).copy()
+    previous = data["amount"].shift(1).to_numpy(dtype=np.float64)
+
+    clip = (period > second_month_num) & (period <= last_observed_month_num) & ~np.isnan(previous)
+    predicted[clip] = np.clip(predicted[clip], previous[clip] * 0.95, previous[clip] * 1.05)
+
+    scored = (period > second_month_num) & ~np.isnan(actual) & ~np.isnan(predicted)
+    squared_error = np.where(scored, (predicted - actual) ** 2, np.nan)
+    return predicted, squared_error
+
+
+def revenue_stepwise_batch(fits):
+    """revenue_stepwise() for every series (column of fits.aic) at once; returns each series' subset mask.
+
+    Drops are compared in term order rather than inclusion order; the two only differ on
+    exactly tied AICs.
+    """
+    aic = fits.aic
+    bits = 1 << np.arange(len(fits.terms))
+    masks = np.zeros(aic.shape[1], dtype=np.int64)
+    active = np.arange(aic.shape[1])
+    while len(active):
+        mask, rows = masks[active], np.arange(len(active))
+        # Forward step
+        has = (mask[:, None] & bits) != 0
+        scores = np.where(has, np.inf, aic[mask[:, None] | bits, active[:, None]])
+        best = np.argmin(scores, axis=1)
+        current_aic = np.where(mask == 0, np.inf, aic[mask, active])
+        added = scores[rows, best] + REVENUE_AIC_MARGIN < current_aic
+        mask = np.where(added, mask | bits[best], mask)
+        # Backward step (never down to the intercept-only model)
+        smaller = mask[:, None] & ~bits
+        scores = np.where(((mask[:, None] & bits) == 0) | (smaller == 0), np.inf, aic[smaller, active[:, None]])
+        worst = np.argmin(scores, axis=1)
+        dropped = scores[rows, worst] + REVENUE_AIC_MARGIN < aic[mask, active]
+        mask = np.where(dropped, mask & ~bits[worst], mask)
+        masks[active] = mask
+        active = active[added | dropped]
+    return masks
+
+
+def forecast_revenue_batch(months, Y):
+    """Fit, clip and score every revenue series (columns of the months x series matrix Y) at once.
+
+    Same rules as /predict_revenue_stepwise for each series: the first two months get no
+    prediction, later in-sample predictions are clipped to +-5% of the previous month's
+    actual, the next month's forecast to +-5% of the last actual, and metrics cover the
+    months after the first two.
+    """
+    months = np.asarray(months, dtype=np.float64)
+    Y = np.asarray(Y, dtype=np.float64)
+    design = revenue_design(months)
+    fits = fit_all_subsets(design[REVENUE_TERMS], Y)
+    masks = revenue_stepwise_batch(fits)
+
+    # Coefficients per series (0 for terms not selected), intercept first
+    coefficients = np.zeros((Y.shape[1], 1 + len(REVENUE_TERMS)))
+    for mask in np.unique(masks):
+        series = masks == mask
+        positions = [0] + [1 + j for j in range(len(REVENUE_TERMS)) if mask >> j & 1]
+        coefficients[np.ix_(series, positions)] = fits.params[mask][:, series].T
+
+    def predict(month_values):
+        terms = revenue_design(month_values)[REVENUE_TERMS].to_numpy()
+        return np.column_stack([np.ones(len(terms)), terms]) @ coefficients.T
+
+    previous = np.vstack([np.full((1, Y.shape[1]), np.nan), Y[:-1]])
+    predicted = np.clip(predict(months), previous * 0.95, previous * 1.05)
+    predicted[:2] = np.nan
+    forecast = np.clip(predict([months[-1] + 1])[0], Y[-1] * 0.95, Y[-1] * 1.05)
+
+    actual_eval, predicted_eval = Y[2:], predicted[2:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mse = ((predicted_eval - actual_eval) ** 2).mean(axis=0)
+        variance = actual_eval.var(axis=0)
+        explained_variance = np.where(variance > 0, 1 - mse / variance, 0.0)
+    return {
+        "masks": masks,
+        "coefficients": coefficients,
+        "predicted": predicted,
+        "forecast": forecast,
+        "mse": mse,
+        "variance": variance,
+        "explained_variance": explained_variance,
+    }
 
-        group["type"] = "Group"
-        category["type"] = "Category"
-        item["type"] = "Specific Item"
 
-        # Numeric conversions
-        for df in [group, category, item]:
-            for col in ["Amount", "Count"]:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(
-                        df[col].astype(str).str.replace(r"[^0-9.\-]", "", regex=True),
-                        errors="coerce",
-                    )
-            df["cost"] = (df.get("Amount", 0) / df.get("Count", 1)).fillna(0)
-
-        # Load external data
-        ing = pd.read_csv("data/MSY Data - Ingredient.csv")
-        ship = pd.read_csv("data/MSY Data - Shipment.csv")
-
-        # --- Merge item and ingredient datasets ---
-        item["Item Name"] = item["Item Name"].astype(str)
-        ing["Item name"] = ing["Item name"].astype(str)
-
-        item_ing = pd.merge(
-            item,
-            ing,
-            left_on=item["Item Name"].str.strip().str.lower(),
-            right_on=ing["Item name"].str.strip().str.lower(),
-            how="outer",
-            suffixes=("_item", "_ing"),
-        )
+# Chart specs
+#
+# With {"format": "spec"} the chart routes skip matplotlib and return the aggregated
+# series they would have plotted, and the page draws them itself (the Chart component in
+# frontend/src/app.jsx). "png" stays the default, so existing clients keep getting "image"; the
+# page asks for it only when a chart is exported.
 
-        item_ing.rename(
-            columns={"Item name": "Items with Ingredient Counts"}, inplace=True
-        )
-        item_ing.columns = item_ing.columns.str.strip()
+CHART_FORMATS = ("png", "spec")
 
-        # --- Fix ship total calculation ---
-        ship["total"] = (
-            ship["Quantity per shipment"].astype(int)
-            * ship["Number of shipments"].astype(int)
-        )
 
-        # Iterate properly
-        for row in ship.itertuples():
-            freq = str(row.frequency).strip().lower()
-            if freq == "weekly":
-                ship.at[row.Index, "total"] *= 4  # Approximate 4 weeks in a month
-            elif freq == "biweekly":
-                ship.at[row.Index, "total"] *= 2  # Approximate 2 biweeks in a month
-
-        # --- Drop NaNs from categorical columns ---
-        def drop_categorical_nans(df):
-            non_numeric_cols = df.select_dtypes(
-                include=["object", "category", "bool", "datetime"]
-            ).columns
-            df_cleaned = df.dropna(subset=non_numeric_cols)
-            print(f"Dropped {len(df) - len(df_cleaned)} rows due to categorical NaNs.")
-            return df_cleaned
-
-        group = drop_categorical_nans(group)
-        category = drop_categorical_nans(category)
-        item_ing = drop_categorical_nans(item_ing)
-
-        # --- Fill NaNs ---
-        group.fillna(0, inplace=True)
-        category.fillna(0, inplace=True)
-        item_ing.fillna(0, inplace=True)
-
-        # --- Map month numbers ---
-        month_map = {
-            "May": 5,
-            "June": 6,
-            "July": 7,
-            "August": 8,
-            "September": 9,
-            "October": 10,
-        }
+def chart_values(values):
+    """Numbers for a chart spec, with missing values as null."""
+    return [float(v) if v is not None and np.isfinite(v) else None for v in pd.to_numeric(pd.Series(values), errors="coerce").astype(float)]
+
+
+def chart_spec(kind, title, x_label, y_label, categories, series):
+    """Chart description for the page: kind "bar" (grouped) or "line", one x category per
+    point, and series as {name: values} (a dict or DataFrame aligned with categories)."""
+    return {
+        "kind": kind,
+        "title": title,
+        "x_label": x_label,
+        "y_label": y_label,
+        "categories": [str(c) for c in categories],
+        "series": [{"name": str(name), "values": chart_values(values)} for name, values in series.items()],
+    }
+
+
+# Plot aggregation
+#
+# /plot reduces the chosen columns to a bounded number of marks before anything is drawn,
+# so a chart costs the same however many rows the table has: bar charts show the mean of
+# y for the most frequent x values, line charts the mean of y per x thinned with largest-triangle-three-buckets
+# (LTTB), and scatter plots with many rows a density grid of occupied cells weighted by
+# their row count; pie charts keep their largest slices. Intervals are off by default; {"ci": true} adds a normal-approximation
+# 95% interval from each group's standard error instead of seaborn's bootstrap.
+
+# Most points a line keeps (LTTB) and a scatter plot draws unbinned
+PLOT_MAX_POINTS = 2000
+# Cells per numeric axis when a scatter plot is binned
+PLOT_SCATTER_BINS = 80
+# Largest slices a pie chart shows; the rest are summed into "Other"
+PLOT_PIE_SLICES = 20
+# Most bars a bar chart draws: the x values with the most rows, in their usual order
+PLOT_BAR_CATEGORIES = 50
+
+
+def lttb(x, y, threshold):
+    """Indices of the `threshold` points of the line (x, y) that LTTB keeps, in order."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # threshold - 2 buckets over the interior points; the first and last are always kept
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for b in range(threshold - 2):
+        start, end = edges[b], edges[b + 1]
+        next_end = edges[b + 2] if b + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        keep[b + 1] = a
+    return keep
+
+
+def _axis_values(column):
+    """(positions, labels): numeric columns as they are, anything else as category codes."""
+    if pd.api.types.is_numeric_dtype(column):
+        return column.to_numpy(dtype=np.float64), None
+    codes, labels = pd.factorize(column)
+    return codes.astype(np.float64), [str(label) for label in labels]
+
+
+def _axis_bins(values, labels):
+    """histogram2d bins and range for one axis: one bin per category, else PLOT_SCATTER_BINS."""
+    if labels is not None:
+        return len(labels), (-0.5, len(labels) - 0.5)
+    low, high = values.min(), values.max()
+    return PLOT_SCATTER_BINS, (low, high) if high > low else (low - 0.5, high + 0.5)
+
+
+def scatter_spec(df, x, y, title):
+    """Scatter chart spec: every row, or occupied density cells once there are too many."""
+    data = df[list(dict.fromkeys((x, y)))].dropna()
+    xs, x_labels = _axis_values(data[x])
+    ys, y_labels = _axis_values(data[y])
+    if len(data) > PLOT_MAX_POINTS:
+        (x_bins, x_range), (y_bins, y_range) = _axis_bins(xs, x_labels), _axis_bins(ys, y_labels)
+        counts, x_edges, y_edges = np.histogram2d(xs, ys, bins=[x_bins, y_bins], range=[x_range, y_range])
+        ix, iy = np.nonzero(counts)
+        xs, ys, counts = (x_edges[ix] + x_edges[ix + 1]) / 2, (y_edges[iy] + y_edges[iy + 1]) / 2, counts[ix, iy]
+    else:
+        counts = np.ones(len(xs))
+    return {
+        "kind": "scatter",
+        "title": title,
+        "x_label": x,
+        "y_label": y,
+        "x_values": chart_values(xs),
+        "x_categories": x_labels,
+        "y_categories": y_labels,
+        "series": [{"name": y, "values": chart_values(ys)}],
+        "counts": counts.astype(np.int64).tolist(),
+    }
+
+
+def mean_spec(kind, df, x, y, title, ci=False):
+    """Bar or line chart spec of the mean of y per x (numeric x sorted, else in order of appearance).
+
+    Raises ValueError when y has no numeric values.
+    """
+    data = df[list(dict.fromkeys((x, y)))].dropna()
+    values = pd.to_numeric(data[y], errors="coerce")
+    if values.isna().all():
+        raise ValueError(f"'{y}' has no numeric values to average.")
+    numeric_x = pd.api.types.is_numeric_dtype(data[x])
+    stats = values.groupby(data[x], sort=numeric_x).agg(["mean", "std", "count"])
+
+    if kind == "bar" and len(stats) > PLOT_BAR_CATEGORIES:
+        top = stats["count"].nlargest(PLOT_BAR_CATEGORIES, keep="first").index
+        stats = stats[stats.index.isin(top)]
+    if kind == "line" and len(stats) > PLOT_MAX_POINTS:
+        line_x = stats.index.to_numpy(dtype=np.float64) if numeric_x else np.arange(len(stats), dtype=np.float64)
+        stats = stats.iloc[lttb(line_x, stats["mean"].to_numpy(dtype=np.float64), PLOT_MAX_POINTS)]
+
+    spec = chart_spec(kind, title, x, y, stats.index, {y: stats["mean"]})
+    if kind == "line" and numeric_x:
+        # Numeric x is drawn to scale rather than as evenly spaced categories
+        spec["x_values"] = chart_values(stats.index.to_numpy(dtype=np.float64))
+    if ci:
+        half = 1.96 * stats["std"] / np.sqrt(stats["count"])
+        spec["series"][0]["low"] = chart_values(stats["mean"] - half)
+        spec["series"][0]["high"] = chart_values(stats["mean"] + half)
+    return spec
+
+
+# Chart rendering
+#
+# PNG charts are drawn from the same specs by charts.render_chart() (matplotlib's
+# object-oriented API, no pyplot state) on a pool of worker processes, each of which has
+# loaded its fonts and drawn a first chart before any request arrives. The workers run
+# only charts.py, which imports numpy and matplotlib and nothing from this module. Route
+# handlers submit a spec and wait for the PNG bytes, so concurrent requests render in
+# parallel and never share a figure.
+
+# "process" (default) or "serial" (render on the request thread)
+RENDER_EXECUTOR = os.environ.get("RENDER_EXECUTOR", "process")
+# Render processes (0 = default_pool_size())
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", "0"))
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+def render_pool():
+    """The long-lived render process pool, created (and warmed) on first use."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            workers = RENDER_WORKERS or default_pool_size()
+            _render_pool = ProcessPoolExecutor(max_workers=workers, mp_context=worker_context(),
+                                               initializer=charts.init_worker)
+            # Start every worker now rather than on the first requests
+            for _ in range(workers):
+                _render_pool.submit(int)
+        return _render_pool
+
+
+def render_png(spec, **style):
+    """render_chart(spec, **style) on the render pool (or inline for RENDER_EXECUTOR=serial)."""
+    global _render_pool
+    if RENDER_EXECUTOR == "serial":
+        return charts.render_chart(spec, **style)
+    pool = render_pool()
+    try:
+        return pool.submit(charts.render_chart, spec, **style).result()
+    except BrokenProcessPool:
+        # A worker died (e.g. killed by the OS); start a fresh pool next time
+        with _render_pool_lock:
+            if _render_pool is pool:
+                _render_pool = None
+        return charts.render_chart(spec, **style)
+
+
+def chart_output(chart_format, spec, **style):
+    """Response fields for a chart: {"chart": spec}, or {"image": base64 PNG} rendered with style."""
+    if chart_format == "spec":
+        return {"chart": spec}
+    return {"image": base64.b64encode(render_png(spec, **style)).decode("utf-8")}
+
+
+# Flask endpoints
+
+
+@app.route("/")
+def index():
+    # Revalidated on every load so a new build's bundle name is picked up straight away
+    response = make_response(render_template_string(HTML_TEMPLATE, bundle=frontend_bundle()))
+    response.cache_control.no_cache = True
+    response.add_etag()
+    return response.make_conditional(request)
 
-        for df in [group, category, item_ing]:
-            df["month numerical"] = df["month"].map(month_map).fillna(0).astype(int)
 
-        # Assign final item data
-        item = item_ing.copy()
+@app.route("/assets/<path:filename>")
+def frontend_asset(filename):
+    response = send_from_directory(FRONTEND_DIST_DIR, filename, max_age=FRONTEND_ASSET_MAX_AGE)
+    response.cache_control.immutable = True
+    return response
 
-        # --- Save processed files ---
-        group.to_csv("data/processed/group.csv", index=False)
-        category.to_csv("data/processed/category.csv", index=False)
-        item.to_csv("data/processed/item.csv", index=False)
-        ship.to_csv("data/processed/ship.csv", index=False)
+
+@app.route("/frontend/<path:filename>")
+def frontend_source(filename):
+    # Unbuilt sources, only loaded while there is no bundle for the current app.jsx
+    return send_from_directory(FRONTEND_DIR, filename, max_age=0)
+
+
+@app.route("/upload", methods=["POST"])
+def upload_file():
+    try:
+        # --- Initial Data Loading ---
+        months = discover_month_files()
+        sources = source_signature(months)
+        manifest = read_manifest()
+        dataset = current_dataset()
+        if dataset is not None and manifest is not None and manifest["sources"] == sources:
+            # Nothing changed since the last snapshot
+            return jsonify(
+                {
+                    "columns": list(dataset.item.columns),
+                    "note": "Default data loaded successfully.",
+                }
+            )
+
+        ing = load_ingredients()
+        group_dfs, category_dfs, item_dfs = [], [], []
+        for fpath, sheets in zip(months, read_workbooks_cached(months)):
+            group_m, category_m, item_m = normalize_month(sheets, month_from_path(fpath), ing)
+            group_dfs.append(group_m)
+            category_dfs.append(category_m)
+            item_dfs.append(item_m)
+
+        # --- Save processed snapshot, then serve from its memory-mapped copy ---
+        publish_snapshot(
+            {
+                "group": pd.concat(group_dfs, ignore_index=True),
+                "category": pd.concat(category_dfs, ignore_index=True),
+                "item": pd.concat(item_dfs, ignore_index=True),
+                "ship": load_shipments(),
+                "ingredient": ing,
+            },
+            sources,
+        )
+        restore_snapshot()
+        start_warmup()
 
         # Return success
         return jsonify(
             {
-                "columns": list(item.columns),
+                "columns": list(current_dataset().item.columns),
                 "note": "Default data loaded and merged successfully.",
             }
         )
@@ -1600,19 +1787,65 @@ def upload_file():
         return jsonify({"error": f"Failed to load default data: {str(e)}"}), 500
 
 
+@app.route("/ingest_month", methods=["POST"])
+def ingest_month_route():
+    """Append a single new *_Data_Matrix.xlsx, sent as a 'file' upload or {"path": ...} in data/."""
+    try:
+        if "file" in request.files:
+            upload = request.files["file"]
+            fname = secure_filename(upload.filename)
+            keep_as = os.path.join(DATA_DIR, fname)
+            if os.path.exists(keep_as):
+                return jsonify({"error": f"{fname} already exists in {DATA_DIR}/."}), 400
+            # Staged outside data/ until it is accepted, so a rejected upload never replaces a workbook
+            staging = tempfile.mkdtemp(dir=UPLOAD_FOLDER)
+            try:
+                fpath = os.path.join(staging, fname)
+                upload.save(fpath)
+                month = ingest_month(fpath, keep_as=keep_as)
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+        else:
+            fname = (request.json or {}).get("path")
+            if not fname:
+                return jsonify({"error": "A workbook file or path is required."}), 400
+            month = ingest_month(os.path.join(DATA_DIR, os.path.basename(fname)))
+
+        start_warmup()
+        return jsonify({
+            "month": month,
+            "columns": list(current_dataset().item.columns),
+            "note": f"{month} data ingested successfully.",
+        })
+
+    except (ValueError, FileNotFoundError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to ingest month: {str(e)}"}), 500
+
+
+
+
+@app.route("/warmup_status")
+def warmup_status_route():
+    """Progress of the background computation of prediction results for the live dataset."""
+    return jsonify(warmup_status())
+
 
- 
 @app.route("/get_dataframe_columns", methods=["POST"])
 def get_dataframe_columns():
-    global group, category, item, ship
+    dataset = current_dataset()
     req = request.json or {}
     groupBy = req.get("groupBy")
 
+    if dataset is None:
+        return jsonify({"columns": []})
+
     df_map = {
-        "Group": group,
-        "Category": category,
-        "Item": item,
-        "Shipment": ship
+        "Group": dataset.group,
+        "Category": dataset.category,
+        "Item": dataset.item,
+        "Shipment": dataset.ship
     }
 
     df = df_map.get(groupBy)
@@ -1625,19 +1858,27 @@ def get_dataframe_columns():
 
 
 @app.route("/plot", methods=["POST"])
+@cached_result(x=None, y=None, groupBy=None, plotType="scatterplot", ci=False, format="png")
 def plot():
-    global group, category, item, ship
+    dataset = current_dataset()
     req = request.json or {}
     x = req.get("x")
     y = req.get("y")
     groupBy = req.get("groupBy")
     plot_type = req.get("plotType", "scatterplot").lower()
+    chart_format = req.get("format", "png")
+
+    if dataset is None:
+        return "Data not loaded. Please upload data first.", 400
+
+    if chart_format not in CHART_FORMATS:
+        return f"Invalid format: {chart_format} (expected 'png' or 'spec').", 400
 
     df_map = {
-        "Group": group,
-        "Category": category,
-        "Item": item,
-        "Shipment": ship
+        "Group": dataset.group,
+        "Category": dataset.category,
+        "Item": dataset.item,
+        "Shipment": dataset.ship
     }
 
     df_temp = df_map.get(groupBy)
@@ -1647,26 +1888,31 @@ def plot():
     if plot_type == "pie chart" and x and y:
         return "Pie chart can only have one variable (choose either X or Y).", 400
 
-    plt.figure(figsize=(8, 6))
+    # Parsed explicitly, since bool("false") would switch intervals on
+    ci = req.get("ci", False)
+    ci = ci.strip().lower() if isinstance(ci, str) else ci
+    ci = {True: True, "true": True, "1": True, False: False, "false": False, "0": False}.get(ci) if isinstance(ci, (bool, int, str)) else None
+    if ci is None:
+        return "ci must be true or false.", 400
+
     try:
+        df_temp = plain_dtypes(df_temp[list(dict.fromkeys(c for c in (x, y) if c))])
+
         if plot_type == "scatterplot":
             if x and y:
-                sns.scatterplot(data=df_temp, x=x, y=y).tick_params(axis='x', labelrotation=90)
-                plt.title(f"Scatterplot: {y} vs {x} ({groupBy})")
+                spec = scatter_spec(df_temp, x, y, f"Scatterplot: {y} vs {x} ({groupBy})")
             else:
                 return "Scatterplot requires both X and Y variables.", 400
 
         elif plot_type == "barplot":
             if x and y:
-                sns.barplot(data=df_temp, x=x, y=y).tick_params(axis='x', labelrotation=90)
-                plt.title(f"Barplot of {y} by {x} ({groupBy})")
+                spec = mean_spec("bar", df_temp, x, y, f"Barplot of {y} by {x} ({groupBy})", ci)
             else:
                 return "Barplot requires both X and Y variables.", 400
 
         elif plot_type == "line plot":
             if x and y:
-                sns.lineplot(data=df_temp, x=x, y=y).tick_params(axis='x', labelrotation=90)
-                plt.title(f"Line Plot of {y} vs {x} ({groupBy})")
+                spec = mean_spec("line", df_temp, x, y, f"Line Plot of {y} vs {x} ({groupBy})", ci)
             else:
                 return "Line plot requires both X and Y variables.", 400
 
@@ -1675,40 +1921,34 @@ def plot():
             if not var:
                 return "Pie chart requires one variable.", 400
             counts = df_temp[var].value_counts()
-            plt.pie(counts.values, labels=counts.index, autopct='%1.1f%%')
-            plt.title(f"Pie Chart of {var} ({groupBy})")
+            if len(counts) > PLOT_PIE_SLICES:
+                top = counts.iloc[:PLOT_PIE_SLICES]
+                counts = pd.concat([top, pd.Series({"Other": counts.iloc[PLOT_PIE_SLICES:].sum()})])
+            spec = chart_spec("pie", f"Pie Chart of {var} ({groupBy})", None, None, counts.index, {var: counts})
 
         else:
             return f"Invalid plot type '{plot_type}'", 400
 
-        plt.tight_layout()
-        buf = io.BytesIO()
-        plt.savefig(buf, format="png")
-        buf.seek(0)
-        plt.close('all')
-        return send_file(buf, mimetype="image/png")
+        if chart_format == "spec":
+            return jsonify({"chart": spec})
+        png = render_png(spec, figsize=(8, 6), title_size=None, label_size=None, tick_rotation=90)
+        return send_file(io.BytesIO(png), mimetype="image/png")
 
+    except ValueError as e:
+        # A column that cannot be plotted this way, e.g. a text y for a bar or line chart
+        return str(e), 400
     except Exception as e:
-        plt.close('all')
         return str(e), 500
 
 
 
 
 @app.route("/predict_next_month_usage", methods=["POST"])
+@cached_result(month=None, format="png")
 def predict_next_month_usage():
-    global item # Use the global item DataFrame
-
-    # Assuming normalize_text is available globally or imported
-    def normalize_text(s):
-        if isinstance(s, str):
-            s = s.strip().lower()
-            s = re.sub(r"[^a-z]+$", "", s)
-            s = re.sub(r"[^a-z]+", "", s) 
-            return s
-        return s
-    
-    if item is None or item.empty:
+    dataset = current_dataset()
+
+    if dataset is None or dataset.item.empty:
         return jsonify({"error": "Item data not loaded. Please upload data first."}), 400
 
     req = request.json or {}
@@ -1716,6 +1956,9 @@ def predict_next_month_usage():
 
     if not month_to_predict_str:
         return jsonify({"error": "Month to predict is required."}), 400
+    chart_format = req.get("format", "png")
+    if chart_format not in CHART_FORMATS:
+        return jsonify({"error": f"Invalid format: {chart_format} (expected 'png' or 'spec')."}), 400
 
     # Map month names to numerical order for filtering
     month_map = {
@@ -1743,18 +1986,13 @@ def predict_next_month_usage():
     ]
     
 
-    col_name_map_forward = {col: normalize_text(col) for col in item.columns}
-    
-    col_name_map_reverse = {v: k for k, v in col_name_map_forward.items()}
-    
-    df_pred_base = item.copy()
-    df_pred_base.columns = df_pred_base.columns.map(col_name_map_forward)
+    df_pred_base = dataset.item_norm
     
     # Ensure 'month' column is handled consistently
     if 'month' not in df_pred_base.columns:
          return jsonify({"error": "Could not find 'month' column after normalization."}), 400
          
-    df_pred_base['month_num'] = df_pred_base['month'].astype(str).str.lower().map(month_map)
+    df_pred_base = df_pred_base.assign(month_num=df_pred_base['month'].astype(str).str.lower().map(month_map))
     
     # 2. Filter the training data: Use all months BEFORE the selected month (using month_num)
     train_df = df_pred_base[df_pred_base['month_num'] < month_num].copy()
@@ -1771,14 +2009,10 @@ def predict_next_month_usage():
     if train_df.empty:
         return jsonify({"error": f"No historical data available before {month_to_predict_str} to build the model."}), 400
 
-    # Ensure all target columns are numeric and fill NaNs with 0 for model input
+    # Target columns are already numeric with NaNs filled in dataset.item_norm
     for col in targets:
         if col not in train_df.columns:
              return jsonify({"error": f"Required ingredient column '{col}' not found in the item dataset."}), 400
-        
-        train_df[col] = pd.to_numeric(train_df[col], errors='coerce').fillna(0)
-        if not test_df.empty:
-            test_df[col] = pd.to_numeric(test_df[col], errors='coerce').fillna(0)
 
 
     # Select all *other* numeric columns as predictors (excluding month_num and the targets)
@@ -1804,124 +2038,20 @@ def predict_next_month_usage():
     X_train = train_df[predictors].fillna(train_df[predictors].mean())
     train_means = X_train.mean().to_dict()
 
-    for target in targets:
-        y_train = train_df[target]
-        
-        # Stepwise Selection (Both directions, using AIC)
-        selected_features = []
-        remaining = list(X_train.columns)
-        best_score = float("inf")
-        
-        while True:
-            # --- 1. FORWARD STEP (Adding a predictor) ---
-            scores_to_add = []
-            
-            # Filter remaining candidates for stability
-            valid_candidates_to_add = [
-                c for c in remaining if X_train[c].nunique() > 1
-            ]
-            
-            for candidate in valid_candidates_to_add:
-                try:
-                    features = selected_features + [candidate]
-                    model_try = sm.OLS(y_train, sm.add_constant(X_train[features], has_constant="add")).fit()
-                    score = model_try.aic 
-                    scores_to_add.append((score, candidate))
-                except (np.linalg.LinAlgError, Exception):
-                    continue
-
-            # --- 2. BACKWARD STEP (Removing a predictor) ---
-            scores_to_remove = []
-            
-            if selected_features:
-                for candidate in selected_features:
-                    try:
-                        features = [f for f in selected_features if f != candidate]
-                        # Must check if constant can be added if features list becomes empty
-                        if not features:
-                            # Model with only constant
-                            model_try = sm.OLS(y_train, sm.add_constant(pd.DataFrame(index=X_train.index), has_constant="add")).fit()
-                        else:
-                            model_try = sm.OLS(y_train, sm.add_constant(X_train[features], has_constant="add")).fit()
-                            
-                        score = model_try.aic 
-                        scores_to_remove.append((score, candidate))
-                    except (np.linalg.LinAlgError, Exception):
-                        continue
-
-            # --- 3. DECISION STEP ---
-            
-            # Find the best move (lowest score from adding or removing)
-            best_forward = min(scores_to_add) if scores_to_add else (float("inf"), None)
-            best_backward = min(scores_to_remove) if scores_to_remove else (float("inf"), None)
+    # Candidate predictors must vary in the training window
+    valid_candidates = [c for c in X_train.columns if X_train[c].nunique() > 1]
 
-            current_best_score = min(best_forward[0], best_backward[0])
-            
-            if current_best_score < best_score:
-                # A move improved the model score
-                if current_best_score == best_forward[0]:
-                    # Best move is to add a feature (Forward)
-                    best_candidate = best_forward[1]
-                    selected_features.append(best_candidate)
-                    if best_candidate in remaining:
-                        remaining.remove(best_candidate)
-                    # print(f"Added {best_candidate}. New AIC: {current_best_score:.4f}") # Debugging
-                else:
-                    # Best move is to remove a feature (Backward)
-                    best_candidate = best_backward[1]
-                    selected_features.remove(best_candidate)
-                    remaining.append(best_candidate) # Move the removed feature back to 'remaining'
-                    # print(f"Removed {best_candidate}. New AIC: {current_best_score:.4f}") # Debugging
-                    
-                best_score = current_best_score
-            else:
-                # No move improved the model score, stop iteration
-                break
-            
-            
-        # --- Model Prediction ---
-        
-        # If test_df is empty (November), create dummy X_test with training means to get a prediction
-        if test_df.empty:
-            # Create a single dummy row for prediction, filled with training means
-            X_test_dummy = pd.DataFrame([train_means], index=[month_to_predict_str])
-            X_test_base = X_test_dummy[selected_features].copy()
-            y_train_min, y_train_max = y_train.min(), y_train.max()
-        else:
-            X_test_base = test_df[selected_features].copy()
-            y_train_min, y_train_max = y_train.min(), y_train.max()
-
-        # Handle prediction based on selected features
-        if not selected_features:
-            predictions[target] = pd.Series(y_train.mean(), index=X_test_base.index if not X_test_base.empty else [month_to_predict_str])
-            final_model = None
-        else:
-            try:
-                # Final model fitting (using the training data)
-                final_model = sm.OLS(y_train, sm.add_constant(X_train[selected_features], has_constant="add")).fit()
-                
-                # Fill missing test data with training means
-                for col_name, mean_val in train_means.items():
-                    if col_name in X_test_base.columns:
-                        X_test_base[col_name] = X_test_base[col_name].fillna(mean_val)
-                
-                # Prepare X_test for prediction
-                X_test = sm.add_constant(X_test_base, has_constant="add")
-                X_test = X_test.reindex(columns=final_model.model.exog_names, fill_value=0.0).astype(float)
-                
-                preds = final_model.predict(X_test)
-                
-                
-                # Clip predictions to training range
-                preds = preds.clip(lower=y_train_min, upper=y_train_max)
-                predictions[target] = preds
-
-            except Exception as e:
-                # Prediction failed: use the mean
-                predictions[target] = pd.Series(y_train.mean(), index=X_test_base.index if not X_test_base.empty else [month_to_predict_str])
-                print(f"Prediction failed for {target}: {e}")
-                final_model = None
+    # Stepwise Selection (Both directions, using AIC) for all targets over the shared X_train
+    selections = stepwise_aic_multi(X_train, train_df[targets], valid_candidates)
 
+    # Targets are fitted independently (on the PREDICT_EXECUTOR pool, if any) and merged in target order
+    X_test = test_df[predictors]
+    jobs = [
+        (target, train_df[target], X_train, selected_features, X_test, train_means, month_to_predict_str)
+        for target, (selected_features, _) in zip(targets, selections)
+    ]
+    for target, target_predictions in zip(targets, map_targets(predict_usage_target, jobs)):
+        predictions[target] = target_predictions
         
         # Aggregate metrics for valid test month data
         if not test_df.empty:
@@ -1980,12 +2110,9 @@ def predict_next_month_usage():
     
     # --- FIX: Rename Index to Unnormalized Names ---
     
-    # Create the mapping: Original Name -> Normalized Name
-    col_name_map_forward = {col: normalize_text(col) for col in item.columns}
-    
-    # Create the REVERSE mapping: Normalized Name -> Original Name (for plotting)
+    # REVERSE mapping: Normalized Name -> Original Name (for plotting)
     # This is the key to using the unnormalized names for plotting later.
-    col_name_map_reverse = {v: k for k, v in col_name_map_forward.items()}
+    col_name_map_reverse = dataset.item_labels
 
     # 1. Create a dictionary to map normalized targets (the current index) back to their original names
     # Only map the targets we actually processed
@@ -1999,29 +2126,9 @@ def predict_next_month_usage():
     
     # --- End Fix ---
     
-    # Ensure import is inside function if it wasn't global
-    import matplotlib.pyplot as plt 
-    import io, base64 
-    
-    plt.figure(figsize=(12, 6))
-    
-    # plot_data.plot uses the index for X-axis labels (now unnormalized)
-    plot_data.plot(kind='bar', ax=plt.gca(), width=0.8)
-    
-    plt.title(f"Actual vs. Predicted Ingredient Usage (Total for {month_to_predict_str})")
-    plt.ylabel("Total Usage (Sum)")
-    plt.xlabel("Ingredient")
-    plt.xticks(rotation=45, ha='right') # Ticks will use the unnormalized names
-    plt.legend(title='Usage Type')
-    plt.tight_layout()
-
-    # Encoding plot to base64
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    buf.seek(0)
-    img_b64 = base64.b64encode(buf.read()).decode("utf-8")
-    buf.close()
-    plt.close("all")
+    chart_title = f"Actual vs. Predicted Ingredient Usage (Total for {month_to_predict_str})"
+    chart = chart_output(chart_format, chart_spec("bar", chart_title, "Ingredient", "Total Usage (Sum)", plot_data.index, plot_data),
+                         figsize=(12, 6), title_size=None, label_size=None, legend_title="Usage Type")
 
     # --- Return Results ---
     
@@ -2029,8 +2136,9 @@ def predict_next_month_usage():
         "mse": avg_mse,
         "variance": avg_var,
         "explained_variance": explained_var,
-        "image": img_b64,
-        "note": note
+        **chart,
+        "note": note,
+        "selected_features": {target: selected for target, (selected, _) in zip(targets, selections)},
     })
 
 
@@ -2038,27 +2146,32 @@ def predict_next_month_usage():
 
 
 @app.route("/predict_cost_loocv", methods=["POST"])
+@cached_result(mode="fast", format="png")
 def predict_cost_loocv():
-    global item, TARGETS_INGREDIENTS # Included TARGETS_INGREDIENTS for clear global access (assuming it's defined outside)
-    
-    if item is None or item.empty:
+    dataset = current_dataset()
+    if dataset is None or dataset.item.empty:
         return jsonify({"error": "Item data not loaded."}), 400
 
+    req = request.get_json(silent=True) or {}
+    # "fast" reads every fold from shared cross-products; "exact" refits each fold (for validation)
+    mode = req.get("mode", "fast")
+    if mode not in ("fast", "exact"):
+        return jsonify({"error": f"Invalid mode: {mode} (expected 'fast' or 'exact')."}), 400
+    chart_format = req.get("format", "png")
+    if chart_format not in CHART_FORMATS:
+        return jsonify({"error": f"Invalid format: {chart_format} (expected 'png' or 'spec')."}), 400
+
     # ... (omitted sections 1-3 which prepare df_agg, X_full, y_full, etc.) ...
     
-    df_temp = item.copy()
-    col_name_map_forward = {col: normalize_text(col) for col in item.columns}
-    df_pred_base = item.copy()
-    df_pred_base.columns = df_pred_base.columns.map(col_name_map_forward)
-    df_pred_base['cost'] = pd.to_numeric(df_pred_base.get('cost'), errors='coerce').fillna(0)
-    df_pred_base = df_pred_base.dropna(subset=['cost'])
+    # 'cost' and the ingredient columns are already numeric in the normalized view
+    df_pred_base = dataset.item_norm
 
     ingredient_cols = [col for col in TARGETS_INGREDIENTS if col in df_pred_base.columns]
     
     if not ingredient_cols:
         return jsonify({"error": "Ingredient columns not found in dataset after normalization."}), 400
     
-    df_pred_base['total_ing_usage'] = df_pred_base[ingredient_cols].sum(axis=1)
+    df_pred_base = df_pred_base.assign(total_ing_usage=df_pred_base[ingredient_cols].sum(axis=1))
     df_filtered = df_pred_base[df_pred_base['total_ing_usage'] > 0].copy()
     
     if df_filtered.empty:
@@ -2088,136 +2201,112 @@ def predict_cost_loocv():
     item_mse_list = []
     all_model_coefficients = defaultdict(list)
     
-    for item_index, item_value in enumerate(unique_items):
-        test_mask = df_agg[food_item_col] == item_value
-        
-        # NOTE: X_train and X_test are COPIED from X_full here
-        X_train = X_full[~test_mask].copy()
-        y_train = y_full[~test_mask].copy()
-        X_test = X_full[test_mask].copy()
-        y_test = y_full[test_mask].copy() 
+    if mode == "fast":
+        # Same folds and models as the per-item refit below, read from one set of cross-products
+        if len(df_agg) > 1:
+            fold_predictions, fold_coefficients, has_model = loocv_stepwise(X_full, y_full, ingredient_cols)
+        else:
+            fold_predictions, fold_coefficients, has_model = [], None, []
+        for item_index, item_value in enumerate(unique_items[:len(fold_predictions)]):
+            actual_cost = y_full.iloc[item_index]
+            predicted_cost = fold_predictions[item_index]
 
-        if X_train.empty or X_test.empty or y_test.empty:
-            continue
+            all_actuals_agg.append(actual_cost)
+            all_predictions_agg.append(predicted_cost)
+            food_item_labels.append(item_value)
+            for feature in ingredient_cols:
+                all_model_coefficients[feature].append(fold_coefficients.iloc[item_index][feature])
+
+            if has_model[item_index]:
+                item_mse = mean_squared_error([actual_cost], [predicted_cost])
+                item_mse_list.append({'Item': item_value, 'MSE': item_mse})
+    else:
+        for item_index, item_value in enumerate(unique_items):
+            test_mask = df_agg[food_item_col] == item_value
+        
+            # NOTE: X_train and X_test are COPIED from X_full here
+            X_train = X_full[~test_mask].copy()
+            y_train = y_full[~test_mask].copy()
+            X_test = X_full[test_mask].copy()
+            y_test = y_full[test_mask].copy() 
+
+            if X_train.empty or X_test.empty or y_test.empty:
+                continue
             
-        stable_predictors = [col for col in ingredient_cols if X_train[col].nunique() > 1]
+            stable_predictors = [col for col in ingredient_cols if X_train[col].nunique() > 1]
         
-        if not stable_predictors:
-            mean_pred = y_train.mean()
-            all_actuals_agg.append(y_test.iloc[0])
-            all_predictions_agg.append(mean_pred)
-            food_item_labels.append(item_value)
+            if not stable_predictors:
+                mean_pred = y_train.mean()
+                all_actuals_agg.append(y_test.iloc[0])
+                all_predictions_agg.append(mean_pred)
+                food_item_labels.append(item_value)
             
-            # Store 0 for coefficients if no features selected
-            for feature in ingredient_cols: # Use all ingredient_cols for coefficient accumulation
-                all_model_coefficients[feature].append(0.0)
-            continue
+                # Store 0 for coefficients if no features selected
+                for feature in ingredient_cols: # Use all ingredient_cols for coefficient accumulation
+                    all_model_coefficients[feature].append(0.0)
+                continue
             
-        # -----------------------------------------------------------
-        # FEATURE STANDARDIZATION (FIX IMPLEMENTATION)
-        # -----------------------------------------------------------
-        scaler = StandardScaler()
+            # -----------------------------------------------------------
+            # FEATURE STANDARDIZATION (FIX IMPLEMENTATION)
+            # -----------------------------------------------------------
+            scaler = StandardScaler()
         
-        # 1. Fit scaler only on the training features that are stable
-        X_train_stable = X_train[stable_predictors]
-        scaler.fit(X_train_stable)
+            # 1. Fit scaler only on the training features that are stable
+            X_train_stable = X_train[stable_predictors]
+            scaler.fit(X_train_stable)
 
-        # 2. Transform both the training and test sets, maintaining structure
-        X_train_scaled_array = scaler.transform(X_train_stable)
-        X_test_scaled_array = scaler.transform(X_test[stable_predictors])
+            # 2. Transform both the training and test sets, maintaining structure
+            X_train_scaled_array = scaler.transform(X_train_stable)
+            X_test_scaled_array = scaler.transform(X_test[stable_predictors])
         
-        # Convert back to DataFrame for sm.OLS compatibility
-        X_train_scaled = pd.DataFrame(X_train_scaled_array, columns=stable_predictors, index=X_train.index)
-        X_test_scaled = pd.DataFrame(X_test_scaled_array, columns=stable_predictors, index=X_test.index)
+            # Convert back to DataFrame for sm.OLS compatibility
+            X_train_scaled = pd.DataFrame(X_train_scaled_array, columns=stable_predictors, index=X_train.index)
+            X_test_scaled = pd.DataFrame(X_test_scaled_array, columns=stable_predictors, index=X_test.index)
         
-        # --- Stepwise Selection (Both Directions, AIC) ---
-        selected_features = []
-        remaining = list(stable_predictors)
-        best_score = float("inf")
+            # --- Stepwise Selection (Both Directions, AIC) ---
+            selected_features, _ = stepwise_aic(X_train_scaled, y_train, stable_predictors)
         
-        while True:
-            scores_to_add = []
-            scores_to_remove = []
-            
-            # Forward Step uses X_train_scaled
-            for candidate in remaining:
-                try:
-                    features = selected_features + [candidate]
-                    model_try = sm.OLS(y_train, sm.add_constant(X_train_scaled[features], has_constant="add")).fit()
-                    scores_to_add.append((model_try.aic, candidate))
-                except (np.linalg.LinAlgError, Exception): continue
-
-            # Backward Step uses X_train_scaled
-            if selected_features:
-                for candidate in selected_features:
-                    try:
-                        features = [f for f in selected_features if f != candidate]
-                        if not features:
-                            # Model with only constant
-                            model_try = sm.OLS(y_train, sm.add_constant(pd.DataFrame(index=X_train.index), has_constant="add")).fit()
-                        else:
-                            model_try = sm.OLS(y_train, sm.add_constant(X_train_scaled[features], has_constant="add")).fit()
-                        scores_to_remove.append((model_try.aic, candidate))
-                    except (np.linalg.LinAlgError, Exception): continue
-
-            best_forward = min(scores_to_add) if scores_to_add else (float("inf"), None)
-            best_backward = min(scores_to_remove) if scores_to_remove else (float("inf"), None)
-            current_best_score = min(best_forward[0], best_backward[0])
-            
-            if current_best_score < best_score:
-                if current_best_score == best_forward[0]:
-                    best_candidate = best_forward[1]
-                    selected_features.append(best_candidate)
-                    if best_candidate in remaining: remaining.remove(best_candidate)
-                else:
-                    best_candidate = best_backward[1]
-                    selected_features.remove(best_candidate)
-                    remaining.append(best_candidate)
-                best_score = current_best_score
-            else:
-                break
-        
-        # --- Final Prediction and Metric Extraction ---
+            # --- Final Prediction and Metric Extraction ---
         
-        predicted_cost = y_train.mean() 
+            predicted_cost = y_train.mean() 
         
-        if selected_features:
-            try:
-                final_model = sm.OLS(y_train, sm.add_constant(X_train_scaled[selected_features], has_constant="add")).fit()
+            if selected_features:
+                try:
+                    final_model = sm.OLS(y_train, sm.add_constant(X_train_scaled[selected_features], has_constant="add")).fit()
                 
-                # STORE COEFFICIENTS (NEW): Store coefficients for ALL ingredient columns
-                for feature in ingredient_cols: 
-                    # Store the coefficient if selected, otherwise 0.0
-                    if feature in final_model.params:
-                        all_model_coefficients[feature].append(final_model.params[feature])
-                    else:
-                        all_model_coefficients[feature].append(0.0)
+                    # STORE COEFFICIENTS (NEW): Store coefficients for ALL ingredient columns
+                    for feature in ingredient_cols: 
+                        # Store the coefficient if selected, otherwise 0.0
+                        if feature in final_model.params:
+                            all_model_coefficients[feature].append(final_model.params[feature])
+                        else:
+                            all_model_coefficients[feature].append(0.0)
                 
-                # Prepare test data with constant and feature alignment
-                X_test_aligned = sm.add_constant(X_test_scaled[selected_features], has_constant="add")
-                X_test_aligned = X_test_aligned.reindex(columns=final_model.model.exog_names, fill_value=0.0).astype(float)
+                    # Prepare test data with constant and feature alignment
+                    X_test_aligned = sm.add_constant(X_test_scaled[selected_features], has_constant="add")
+                    X_test_aligned = X_test_aligned.reindex(columns=final_model.model.exog_names, fill_value=0.0).astype(float)
                 
-                preds = final_model.predict(X_test_aligned)
-                predicted_cost = preds.iloc[0] 
+                    preds = final_model.predict(X_test_aligned)
+                    predicted_cost = preds.iloc[0] 
                 
-            except Exception:
-                predicted_cost = y_train.mean() 
-                # Store 0 for coefficients if model failed
-                for feature in ingredient_cols:
-                    all_model_coefficients[feature].append(0.0)
-        else:
-             # Store 0 for coefficients if no features selected
-             for feature in ingredient_cols:
-                 all_model_coefficients[feature].append(0.0)
+                except Exception:
+                    predicted_cost = y_train.mean() 
+                    # Store 0 for coefficients if model failed
+                    for feature in ingredient_cols:
+                        all_model_coefficients[feature].append(0.0)
+            else:
+                 # Store 0 for coefficients if no features selected
+                 for feature in ingredient_cols:
+                     all_model_coefficients[feature].append(0.0)
 
-        actual_cost = y_test.iloc[0]
+            actual_cost = y_test.iloc[0]
         
-        all_actuals_agg.append(actual_cost)
-        all_predictions_agg.append(predicted_cost)
-        food_item_labels.append(item_value)
+            all_actuals_agg.append(actual_cost)
+            all_predictions_agg.append(predicted_cost)
+            food_item_labels.append(item_value)
         
-        item_mse = mean_squared_error([actual_cost], [predicted_cost])
-        item_mse_list.append({'Item': item_value, 'MSE': item_mse})
+            item_mse = mean_squared_error([actual_cost], [predicted_cost])
+            item_mse_list.append({'Item': item_value, 'MSE': item_mse})
 
     # ... (sections 3, 4, 5, and 6 remain the same) ...
     # This ensures that the final aggregate metrics, plotting, and coefficient table creation
@@ -2272,30 +2361,10 @@ def predict_cost_loocv():
     
     # --- 5. Plotting (Side-by-Side Bar Chart sorted by Item MSE) ---
     
-    plt.figure(figsize=(20, 10))
-    sns.barplot(
-        data=plot_df, 
-        x='Food Item', 
-        y='Cost Value', 
-        hue='Cost Type', 
-        order=item_order_by_mse, # <-- SORT BY MSE
-    )
-    
-    plt.title("Actual vs. Predicted Cost by Food Item", fontsize=20)
-    plt.xlabel("Food Item", fontsize=18)
-    plt.ylabel("Cost", fontsize=18)
-    plt.xticks(rotation=45, ha='right', fontsize=15)
-    plt.legend(title='Cost Type')
-    plt.grid(axis='y', linestyle='--', alpha=0.6)
-    plt.tight_layout()
-
-    # Encoding plot to base64
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    buf.seek(0)
-    img_b64 = base64.b64encode(buf.read()).decode("utf-8")
-    buf.close()
-    plt.close("all")
+    # The bar heights seaborn drew: the mean per food item and cost type
+    bars = plot_df.groupby(["Food Item", "Cost Type"])["Cost Value"].mean().unstack("Cost Type").reindex(list(dict.fromkeys(item_order_by_mse)))
+    chart = chart_output(chart_format, chart_spec("bar", "Actual vs. Predicted Cost by Food Item", "Food Item", "Cost", bars.index, bars),
+                         figsize=(20, 10), title_size=20, label_size=18, tick_size=15, legend_title="Cost Type", grid="y")
 
     # --- 6. Final Response ---
     
@@ -2303,7 +2372,7 @@ def predict_cost_loocv():
         "mse": final_mse,
         "variance": final_variance,
         "explained_variance": final_explained_variance,
-        "image": img_b64,
+        **chart,
         "note": "Cost prediction completed",
         "coefficient_table": coefficient_table # <-- NEW TABLE DATA
     })
@@ -2315,26 +2384,27 @@ from flask import jsonify, request
 import pandas as pd
 import numpy as np
 import io, base64
-import seaborn as sns
-import matplotlib.pyplot as plt
 from sklearn.metrics import mean_squared_error
 import statsmodels.api as sm
 import re 
 
 @app.route("/predict_revenue_stepwise", methods=["POST"])
+@cached_result(plot_type="bar", format="png")
 def predict_revenue_stepwise():
-    global item
+    dataset = current_dataset()
 
     try:
-        if item is None or item.empty:
+        if dataset is None or dataset.item.empty:
             return jsonify({"error": "Item data not loaded."}), 400
 
         req = request.json or {}
         plot_type_str = req.get("plot_type", "bar")
+        chart_format = req.get("format", "png")
+        if chart_format not in CHART_FORMATS:
+            return jsonify({"error": f"Invalid format: {chart_format} (expected 'png' or 'spec')."}), 400
 
         # --- Normalize & prepare data ---
-        df_temp = item.copy()
-        df_temp.columns = df_temp.columns.map(lambda x: str(x).strip().lower())
+        df_temp = dataset.item_norm
 
         if 'amount' not in df_temp.columns or 'month' not in df_temp.columns:
             return jsonify({"error": "Item dataset missing 'Amount' or 'Month' columns."}), 400
@@ -2350,7 +2420,7 @@ def predict_revenue_stepwise():
         }
         reverse_month_map = {v: k.capitalize() for k, v in month_map.items() if v < 11}
 
-        df_temp["month_num"] = df_temp["month"].astype(str).str.lower().map(month_map)
+        df_temp = df_temp.assign(month_num=df_temp["month"].astype(str).str.lower().map(month_map))
         df_temp = df_temp.dropna(subset=["month_num"])
 
         # --- Aggregate Amount by month ---
@@ -2382,76 +2452,24 @@ def predict_revenue_stepwise():
         # --- Prepare modeling data ---
         data = monthly_revenue.copy()
         data["amount"] = data["amount"].astype(float)
-        data["month_sq"] = data["month_num"] ** 2
-        data["month_cu"] = data["month_num"] ** 3
-
-        # --- Run stepwise model ---
-        def stepwise_selection(data, response, direction="both", criterion="AIC"):
-            # ... (Stepwise selection logic remains the same) ...
-            included = []
-            predictors = [col for col in data.columns if col not in [response, "month"]]
-            changed = True
-
-            while changed:
-                changed = False
-                # Forward step
-                excluded = list(set(predictors) - set(included))
-                aic_scores = pd.Series(dtype=float)
-                for new_col in excluded:
-                    formula = f"{response} ~ {' + '.join(included + [new_col]) if included else new_col}"
-                    model = sm.OLS.from_formula(formula, data).fit()
-                    aic_scores.loc[new_col] = model.aic
-
-                if not aic_scores.empty:
-                    best_candidate = aic_scores.idxmin()
-                    best_aic = aic_scores.min()
-                    if included:
-                        current_aic = sm.OLS.from_formula(f"{response} ~ {' + '.join(included)}", data).fit().aic
-                    else:
-                        current_aic = float("inf")
-
-                    if best_aic + 1e-4 < current_aic:
-                        included.append(best_candidate)
-                        changed = True
-
-                # Backward step
-                if direction in ("both", "backward") and included:
-                    aics = pd.Series(dtype=float)
-                    for col in included:
-                        subset = list(set(included) - {col})
-                        if subset:
-                            formula = f"{response} ~ {' + '.join(subset)}"
-                            model = sm.OLS.from_formula(formula, data).fit()
-                            aics.loc[col] = model.aic
-                        else:
-                            aics.loc[col] = float("inf")
-
-                    worst_candidate = aics.idxmin()
-                    worst_aic = aics.min()
-                    current_aic = sm.OLS.from_formula(f"{response} ~ {' + '.join(included)}", data).fit().aic
-
-                    if worst_aic + 1e-4 < current_aic:
-                        included.remove(worst_candidate)
-                        changed = True
-
-            final_formula = f"{response} ~ {' + '.join(included)}" if included else f"{response} ~ 1"
-            model = sm.OLS.from_formula(final_formula, data).fit()
-            model.selected_features = included
-            return model
+        data = data.join(revenue_design(data["month_num"]).drop(columns="month_num"))
 
+        # --- Run stepwise model over the precomputed fits of every term subset ---
         # Run model on ALL existing data points (May - Oct)
-        model = stepwise_selection(data[data["amount"].notna()], "amount", direction="both", criterion="AIC")
+        observed = data[data["amount"].notna()]
+        fits = fit_all_subsets(observed[REVENUE_TERMS], observed["amount"])
+        selected_features = revenue_stepwise(fits)
+        coefficients = fits.coefficients(selected_features)
+
+        def predict(rows):
+            return coefficients["Intercept"] + rows[selected_features].to_numpy(dtype=np.float64) @ coefficients[selected_features].to_numpy()
 
         # --- Predict and Apply Exclusion (FIXED) ---
-        data["predicted"] = model.predict(data)
+        data["predicted"] = predict(data)
         
         # FIX 1: Exclude predictions for the first two months numerically (e.g., May=5, June=6)
         data.loc[data["month_num"].isin([first_month_num, second_month_num]), "predicted"] = np.nan
 
-        # --- Add Previous Month Amount for Clipping ---
-        # Create a shifted column to hold the previous month's actual amount
-        data['prev_amount'] = data['amount'].shift(1)
-        
         # --- Forecast next month safely ---
         
         # Get the highest month number currently available in the dataset
@@ -2460,19 +2478,7 @@ def predict_revenue_stepwise():
         next_month_num = last_observed_month_num + 1
         next_month_label = reverse_month_map.get(next_month_num, f"Nov")
 
-        # Create new_row with the same predictors the model expects
-        predictors = model.model.exog_names
-        predictors = [p for p in predictors if p != "Intercept"]
-        new_row = pd.DataFrame({
-            "month_num": [next_month_num],
-            "month_sq": [next_month_num ** 2],
-            "month_cu": [next_month_num ** 3],
-        })
-
-        new_row = new_row[[col for col in predictors if col in new_row.columns]]
-        new_row = sm.add_constant(new_row, has_constant="add")
-
-        next_pred = float(model.predict(new_row)[0])
+        next_pred = float(predict(revenue_design([next_month_num]))[0])
         
         # Determine clipping bounds for the forecast (based on the last observed amount)
         last_amount = data.loc[data['month_num'] == last_observed_month_num, 'amount'].iloc[0]
@@ -2492,107 +2498,49 @@ def predict_revenue_stepwise():
 
 
         # --- Apply Clipping to Historical Predictions (In-Sample Predictions) ---
-        # Clip all predictions from the third month onwards (where a prev_amount exists)
-        for i in range(len(data)):
-            month_n = data.loc[i, 'month_num']
-            
-            # Skip the first two months and the final forecast row
-            if month_n > second_month_num and month_n <= last_observed_month_num:
-                
-                # Get previous month's amount (actual)
-                prev_month_amount = data.loc[data['month_num'] == month_n - 1, 'amount'].iloc[0]
-                
-                if not np.isnan(prev_month_amount):
-                    pred_val = data.loc[i, 'predicted']
-                    lower_b = prev_month_amount * 0.95
-                    upper_b = prev_month_amount * 1.05
-                    data.loc[i, 'predicted'] = np.clip(pred_val, lower_b, upper_b)
+        # Clip all predictions from the third month onwards against the previous month's actual
+        data["predicted"], squared_error = clip_revenue_history(data, second_month_num, last_observed_month_num)
 
 
         # --- Metrics (Exclude first two months, include Nov only for plotting) ---
-        
-        mask_eval = data["month_num"] > second_month_num
-        
-        actual_eval = data.loc[mask_eval & data["amount"].notna(), "amount"]
-        pred_eval = data.loc[mask_eval & data["predicted"].notna(), "predicted"]
-        
-        common_index = actual_eval.index.intersection(pred_eval.index)
-        actual_eval = actual_eval.loc[common_index]
-        pred_eval = pred_eval.loc[common_index]
+        scored = ~np.isnan(squared_error)
 
-        if len(actual_eval) == len(pred_eval) and len(actual_eval) > 0:
-            avg_mse = mean_squared_error(actual_eval, pred_eval)
+        if scored.any():
+            actual_eval = data["amount"].to_numpy()[scored]
+            avg_mse = mean_squared_error(actual_eval, data["predicted"].to_numpy()[scored])
             avg_var = np.var(actual_eval)
             explained_var = 1 - (avg_mse / avg_var) if avg_var > 0 else 0.0
         else:
             avg_mse = avg_var = explained_var = "N/A"
 
         # --- Plot (FIXED to be dynamic) ---
-        plt.figure(figsize=(10, 6))
-        
-        # Prepare data for plotting (melted form is needed for bar, but lineplot can use wide form)
-        
         if plot_type_str == "line": # FIX: Match frontend value "line"
-            # Ensure line plot handles the concatenated data frame correctly
-            sns.lineplot(data=data, x="month", y="amount", marker="o", label="Actual")
-            sns.lineplot(data=data, x="month", y="predicted", marker="x", linestyle="--", label="Predicted")
-            plot_title = "Revenue Timeline: Actual vs Predicted"
+            spec = chart_spec("line", "Revenue Timeline: Actual vs Predicted", "Month", "Amount", data["month"],
+                              {"Actual": data["amount"], "Predicted": data["predicted"]})
+            style = {"line_styles": [{"marker": "o"}, {"marker": "x", "linestyle": "--"}]}
         else: # Default or "bar"
-            data_melted = pd.melt(
-                data, 
-                id_vars='month', 
-                value_vars=['amount', 'predicted'],
-                var_name='Type',
-                value_name='Amount'
-            ).rename(columns={'amount': 'Actual', 'predicted': 'Predicted'})
-            
-            data_melted['Type'] = data_melted['Type'].replace({'amount': 'Actual', 'predicted': 'Predicted'})
-            
-            data_melted.loc[(data_melted['month'] == next_month_label) & (data_melted['Type'] == 'Actual'), 'Amount'] = np.nan
-            
-            sns.barplot(
-                data=data_melted, 
-                x="month", 
-                y="Amount", 
-                hue="Type"
-            )
-            plot_title = "Revenue Bar Chart: Actual vs Predicted"
-            
-        plt.title(plot_title, fontsize=14)
-        plt.xlabel("Month")
-        plt.ylabel("Amount")
-        plt.xticks(rotation=45, ha="right")
-        plt.tight_layout()
-
-        buf = io.BytesIO()
-        plt.savefig(buf, format="png")
-        buf.seek(0)
-        img_b64 = base64.b64encode(buf.read()).decode("utf-8")
-        buf.close()
-        plt.close("all")
+            spec = chart_spec("bar", "Revenue Bar Chart: Actual vs Predicted", "Month", "Amount", data["month"],
+                              {"Actual": data["amount"], "Predicted": data["predicted"]})
+            style = {"legend_title": "Type"}
+        chart = chart_output(chart_format, spec, figsize=(10, 6), label_size=None, **style)
 
         # --- Table output ---
         # ... (Table generation logic remains the same, but using the correctly evaluated data) ...
-        mse_list = []
-        for _, row in data.iterrows():
-            if not np.isnan(row["predicted"]) and not np.isnan(row["amount"]) and row["month_num"] > second_month_num:
-                mse_list.append((row["predicted"] - row["amount"]) ** 2)
-            else:
-                mse_list.append(np.nan)
-
         table_df = pd.DataFrame({
             "Month": data["month"],
             "Predicted": data["predicted"],
             "Actual": data["amount"],
-            "MSE": mse_list
+            "MSE": squared_error
         })
 
         return jsonify({
             "mse": avg_mse,
             "variance": avg_var,
             "explained_variance": explained_var,
-            "image": img_b64,
+            **chart,
             "table": table_df.fillna("").to_dict(orient="records"),
+            "selected_features": selected_features,
+            "coefficients": coefficients.to_dict(),
             "note": f"Stepwise regression with AIC (both directions). {reverse_month_map.get(first_month_num)} and {reverse_month_map.get(second_month_num)} excluded.",
         })
 
@@ -2604,25 +2552,76 @@ def predict_revenue_stepwise():
     
     
 
-def normalize_text(s):
-    """Normalizes text by removing non-alphanumeric chars and converting to lowercase."""
-    if isinstance(s, str):
-        s = s.strip().lower()
-        s = re.sub(r"[^a-z]+$", "", s)
-        s = re.sub(r"[^a-z]+", "", s) 
-        return s
-    return s
+@app.route("/predict_revenue_batch", methods=["POST"])
+@cached_result(by=None)
+def predict_revenue_batch():
+    """One revenue forecast per series, e.g. {"by": ["Category"]}, returned column-wise.
+
+    "by" names the column(s) that identify a series; they are looked up in the Group,
+    Category and Item tables in that order. Months missing from a series count as 0.
+    """
+    dataset = current_dataset()
+    if dataset is None or dataset.item.empty:
+        return jsonify({"error": "Item data not loaded."}), 400
+
+    by = (request.get_json(silent=True) or {}).get("by")
+    by = [by] if isinstance(by, str) else list(by or [])
+    if not by:
+        return jsonify({"error": "'by' must name at least one series column (e.g. Group or Category)."}), 400
+    table = next((t for t in (dataset.group, dataset.category, dataset.item) if set(by) <= set(t.columns)), None)
+    if table is None:
+        return jsonify({"error": f"No table has all of the columns {by}."}), 400
+
+    try:
+        month_col = "month numerical"
+        amounts = (
+            table.assign(Amount=table["Amount"].astype("float64"))
+            .groupby(by + [month_col], observed=True)["Amount"].sum()
+            .unstack(month_col)
+        )
+        months = np.arange(int(amounts.columns.min()), int(amounts.columns.max()) + 1)
+        amounts = amounts.reindex(columns=months).fillna(0.0)
+        if len(months) < 3:
+            return jsonify({"error": "At least three months of data are needed to forecast."}), 400
+
+        result = forecast_revenue_batch(months, amounts.to_numpy().T)
+
+        def column(values):
+            return [float(v) if np.isfinite(v) else None for v in values]
+
+        keys = amounts.index.to_frame(index=False)
+        coefficients = result["coefficients"]
+        return jsonify({
+            "by": by,
+            "keys": {name: keys[name].tolist() for name in by},
+            "months": months.tolist(),
+            "forecast_month": int(months[-1] + 1),
+            "selected_features": [
+                [term for j, term in enumerate(REVENUE_TERMS) if mask >> j & 1] for mask in result["masks"]
+            ],
+            "coefficients": {
+                name: column(coefficients[:, i]) for i, name in enumerate(["Intercept"] + REVENUE_TERMS)
+            },
+            "predicted": {str(month): column(row) for month, row in zip(months, result["predicted"])},
+            "forecast": column(result["forecast"]),
+            "mse": column(result["mse"]),
+            "variance": column(result["variance"]),
+            "explained_variance": column(result["explained_variance"]),
+        })
+
+    except Exception as e:
+        return jsonify({"error": f"Batch revenue forecast failed: {str(e)}"}), 500
 
 
 @app.route("/get_unique_months")
 def get_unique_months():
-    global item
+    dataset = current_dataset()
 
-    if item is None or item.empty:
+    if dataset is None or dataset.item.empty:
         return jsonify({"months": []})
     
     try:
-        df_temp = item.copy()
+        df_temp = dataset.item
         
         # 1. Ensure required columns exist
         if 'month' not in df_temp.columns:
@@ -2650,10 +2649,11 @@ def get_unique_months():
 # ... (omitting setup and sections 1-2 for brevity) ...
 
 @app.route("/shipment_vs_usage_plot", methods=["POST"])
+@cached_result(month=None, format="png")
 def shipment_vs_usage_plot():
-    global item, ship 
+    dataset = current_dataset()
 
-    if item is None or item.empty or ship is None or ship.empty:
+    if dataset is None or dataset.item.empty or dataset.ship.empty:
         return jsonify({"error": "Item or Ship data not loaded."}), 400
 
     req = request.json or {}
@@ -2661,66 +2661,31 @@ def shipment_vs_usage_plot():
 
     if not selected_month:
         return jsonify({"error": "Month selection is required."}), 400
+    chart_format = req.get("format", "png")
+    if chart_format not in CHART_FORMATS:
+        return jsonify({"error": f"Invalid format: {chart_format} (expected 'png' or 'spec')."}), 400
 
-    # The conversion map (normalized item ingredient : normalized ship ingredient)
-    INGREDIENT_CONVERSION_MAP = {
-        "braisedbeefusedg": "beef", 
-        "braisedchickeng": "chicken", 
-        "eggcount": "egg", 
-        "riceg": "rice", 
-        "ramencount": "ramen", 
-        "ricenoodlesg": "ricenoodles", 
-        "chickenthighpcs": "chicken", 
-        "chickenwingspcs": "chickenwings", 
-        "flourg": "flour", 
-        "greenonion": "greenonion", 
-        "cilantro": "cilantro", 
-        "whiteonion": "whiteonion", 
-        "peasg": "peascarrot", 
-        "bokchoyg": "bokchoy", 
-        "tapiocastarch": "tapiocastarch"
-    }
+    INGREDIENT_CONVERSION_MAP = SHIP_INGREDIENT_MAP
     ITEM_TARGETS_NORMALIZED = list(INGREDIENT_CONVERSION_MAP.keys())
-    UNIT_CONVERSION_REQUIRED = {
-        "braisedbeefusedg": 1, "braisedchickeng": 1, "riceg": 1, 
-        "ricenoodlesg": 1, "flourg": 1, "peasg": 1, "carrotg": 1, 
-        "bokchoyg": 1, "greenonion":1, "cilantro":1,
-    }
-    LB_TO_GRAM = 453.592
-
-    # Helper function needed inside the route for mapping/processing (assuming it was defined externally)
-    def normalize_text(s):
-        s = str(s).strip().lower()
-        s = re.sub(r"[^a-z]+$", "", s)
-        s = re.sub(r"[^a-z]+", "", s)
-        return s
 
-    # --- 1. Compute usage per ingredient (Replicating logic to define necessary variables) ---
-    item_temp = item.copy()
-    item_temp.columns = item_temp.columns.map(normalize_text)
-    month_filter = item_temp['month'].astype(str).str.strip() == selected_month.strip()
-    filtered_item_df = item_temp[month_filter]
+    # --- 1. Usage per ingredient: one row of the precomputed month x ingredient table ---
+    usage_by_month = dataset.usage_by_month
+    month_rows = usage_by_month.index.get_level_values("month") == selected_month.strip()
+    month_usage = usage_by_month[month_rows].sum()
     
     usage_sums = {}
     item_col_to_display_name = {}
 
     for item_col in ITEM_TARGETS_NORMALIZED:
-        if item_col in filtered_item_df.columns:
-            # Assuming 'count' is available and numeric
-            count_multiplier = pd.to_numeric(filtered_item_df['count'], errors='coerce').fillna(1)
-            raw_usage = pd.to_numeric(filtered_item_df[item_col], errors='coerce').fillna(0)
-            value = (raw_usage * count_multiplier).sum()
-
-            if UNIT_CONVERSION_REQUIRED.get(item_col, 0) == 1 and value != 0:
-                value /= LB_TO_GRAM
-
-            usage_sums[item_col] = value
+        if item_col in month_usage.index:
+            usage_sums[item_col] = month_usage[item_col]
             mapped_ship_ingredient = INGREDIENT_CONVERSION_MAP.get(item_col, item_col)
             item_col_to_display_name[item_col] = mapped_ship_ingredient.capitalize()
     
     # --- 2. Process SHIPMENT Data (Replicating logic) ---
-    ship_temp = ship.copy()
-    ship_temp['normalized_ingredient'] = ship_temp['Ingredient'].astype(str).apply(normalize_text)
+    ship_temp = dataset.ship.assign(
+        normalized_ingredient=dataset.ship['Ingredient'].astype(str).apply(normalize_text)
+    )
     shipment_total = {}
     ship_to_item_map = {}
     for k, v in INGREDIENT_CONVERSION_MAP.items():
@@ -2798,39 +2763,19 @@ def shipment_vs_usage_plot():
 
 
     # 5. Plotting (With Sorting Applied)
-    plt.figure(figsize=(15, 8))
-    
     # --- SORTING FIX ---
     # 1. Sort the plotting DataFrame by 'Used' in descending order
     plot_df_sorted = plot_df.sort_values(by='Used', ascending=False)
-    
-    # 2. Get the new order of index labels
-    order_list = plot_df_sorted.index.tolist()
+    chart_title = f"Shipment vs. Usage per Ingredient for {selected_month} (Sorted by Used)"
+    chart_y_label = "Amount (in Pounds or Pieces/Counts)"
 
-    # 3. Plot the sorted DataFrame
-    # Note: plot_df.plot() uses the index order automatically, 
-    # but we need to explicitly plot the sorted DataFrame.
-    plot_df_sorted.plot(kind='bar', ax=plt.gca(), width=0.8)
-    
-    plt.title(f"Shipment vs. Usage per Ingredient for {selected_month} (Sorted by Used)", fontsize=16)
-    plt.ylabel("Amount (in Pounds or Pieces/Counts)", fontsize=12)
-    plt.xlabel("Ingredient", fontsize=12)
-    # The tick labels will automatically follow the sorted index
-    plt.xticks(rotation=45, ha='right') 
-    plt.legend(title='Category')
-    plt.grid(axis='y', linestyle='--', alpha=0.6)
-    plt.tight_layout()
-
-    # Encoding plot to base64
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    buf.seek(0)
-    img_b64 = base64.b64encode(buf.read()).decode("utf-8")
-    plt.close("all")
+    chart = chart_output(chart_format, chart_spec("bar", chart_title, "Ingredient", chart_y_label, plot_df_sorted.index,
+                                                  plot_df_sorted.select_dtypes("number")),
+                         figsize=(15, 8), title_size=16, legend_title="Category", grid="y")
 
     # 6. RETURN TABULAR DATA
     return jsonify({
-        "image": img_b64,
+        **chart,
         "note": f"Chart generated for {selected_month}.",
         "table_data": table_data,
         "action_table_data": action_table_data
@@ -2839,38 +2784,36 @@ def shipment_vs_usage_plot():
 
 @app.route("/get_ingredient_list")
 def get_ingredient_list():
-    """Return unique Ingredient names from the global 'ship' DataFrame."""
-    global ship
-    if ship is None or ship.empty:
+    """Return unique Ingredient names from the current 'ship' DataFrame."""
+    dataset = current_dataset()
+    if dataset is None or dataset.ship.empty:
         return jsonify({"ingredients": []})
     try:
-        ingredients = ship["Ingredient"].dropna().astype(str).unique().tolist()
+        ingredients = dataset.ship["Ingredient"].dropna().astype(str).unique().tolist()
         return jsonify({"ingredients": sorted(ingredients)})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/used_shipped_timeline_plot", methods=["POST"])
+@cached_result(ingredient=None, format="png")
 def used_shipped_timeline_plot():
-    global item, ship
+    dataset = current_dataset()
 
     try:
         # --- Validation ---
-        if item is None or item.empty or ship is None or ship.empty:
+        if dataset is None or dataset.item.empty or dataset.ship.empty:
             raise ValueError("Item or Ship data not loaded.")
+        ship = dataset.ship
 
         req = request.json or {}
         selected_ingredient = req.get("ingredient")
         if not selected_ingredient:
             raise ValueError("Ingredient selection is required.")
+        chart_format = req.get("format", "png")
+        if chart_format not in CHART_FORMATS:
+            raise ValueError(f"Invalid format: {chart_format} (expected 'png' or 'spec').")
             
-        # --- Normalize text helper ---
-        def normalize_text(s):
-            s = str(s).strip().lower()
-            s = re.sub(r"[^a-z]+$", "", s)
-            s = re.sub(r"[^a-z]+", "", s)
-            return s
-
         # Find correct column for total shipment amount
         SHIPMENT_AMOUNT_COL = None
         if 'total' in ship.columns:
@@ -2881,23 +2824,9 @@ def used_shipped_timeline_plot():
             raise KeyError("Ship dataset missing required total shipment column ('total' or 'Quantity per month').")
 
         # --- Conversion and mapping ---
-        INGREDIENT_CONVERSION_MAP = {
-            "braisedbeefusedg": "beef", "braisedchickeng": "chicken", "eggcount": "egg",
-            "riceg": "rice", "ramencount": "ramen", "ricenoodlesg": "ricenoodles", 
-            "chickenthighpcs": "chicken", "chickenwingspcs": "chickenwings",
-            "flourg": "flour", "greenonion": "greenonion", "cilantro": "cilantro",
-            "whiteonion": "whiteonion", "peasg": "peascarrot", "bokchoyg": "bokchoy", 
-            "tapiocastarch": "tapiocastarch"
-        }
+        INGREDIENT_CONVERSION_MAP = SHIP_INGREDIENT_MAP
 
-        UNIT_CONVERSION_REQUIRED = {
-            "braisedbeefusedg": 1, "braisedchickeng": 1, "riceg": 1,
-            "ricenoodlesg": 1, "flourg": 1, "peasg": 1, "carrotg": 1,
-            "bokchoyg": 1, "greenonion": 1, "cilantro": 1,
-        }
-        LB_TO_GRAM = 453.592
-
-        normalized_target = normalize_text(selected_ingredient)
+        normalized_target = normalize_text(str(selected_ingredient))
 
         # Reverse mapping: ship ingredient -> item columns
         ship_to_item_map = {}
@@ -2905,38 +2834,21 @@ def used_shipped_timeline_plot():
             ship_to_item_map.setdefault(v, []).append(k)
 
         # --- 1. Monthly Shipped Total ---
-        ship_temp = ship.copy()
-        if "Ingredient" not in ship_temp.columns:
+        if "Ingredient" not in ship.columns:
             raise KeyError("Ship dataset missing 'Ingredient' column.")
 
-        ship_temp["normalized_ingredient"] = ship_temp["Ingredient"].astype(str).apply(normalize_text)
+        ship_temp = ship.assign(normalized_ingredient=ship["Ingredient"].astype(str).apply(normalize_text))
         filtered_ship = ship_temp[ship_temp["normalized_ingredient"] == normalized_target]
         monthly_shipment_total = pd.to_numeric(filtered_ship[SHIPMENT_AMOUNT_COL], errors='coerce').fillna(0).sum()
         
-        # --- 2. Used values per month ---
-        item_temp = item.copy()
-        item_temp.columns = item_temp.columns.map(normalize_text)
-        if "month" not in item_temp.columns or "monthnumerical" not in item_temp.columns:
-            raise KeyError("Item dataset missing 'month' or 'monthnumerical' column.")
-
-        used_per_month = []
+        # --- 2. Used values per month (columns of the precomputed month x ingredient table) ---
         related_item_cols = ship_to_item_map.get(normalized_target, [])
         if not related_item_cols:
             raise ValueError(f"No matching columns found in item dataset for ingredient '{selected_ingredient}'.")
 
-        for name, group in item_temp.groupby(["month", "monthnumerical"]):
-            month_name, month_num = name
-            used_sum = 0
-            for col in related_item_cols:
-                if col in group.columns:
-                    val = (pd.to_numeric(group[col], errors="coerce").fillna(0)) * group["count"]
-                    val = val.sum()
-                    if UNIT_CONVERSION_REQUIRED.get(col, 0) == 1:
-                        val /= LB_TO_GRAM
-                    used_sum += val
-            used_per_month.append({"month": month_name, "monthnumerical": month_num, "Used": used_sum})
-
-        used_df = pd.DataFrame(used_per_month)
+        usage_by_month = dataset.usage_by_month
+        used_cols = [col for col in related_item_cols if col in usage_by_month.columns]
+        used_df = usage_by_month[used_cols].sum(axis=1).rename("Used").reset_index()
         used_df['Shipped'] = monthly_shipment_total
         merged = used_df.sort_values("monthnumerical").copy()
         if merged.empty:
@@ -2952,24 +2864,11 @@ def used_shipped_timeline_plot():
         y_label = f"Amount ({unit_label})"  # dynamic true units
 
         # --- 4. Plot ---
-        plt.figure(figsize=(12, 6))
         merged_plot = merged[["month", "Used", "Shipped"]]
-        plt.plot(merged_plot["month"], merged_plot["Used"], marker="o", label="Used")
-        plt.plot(merged_plot["month"], merged_plot["Shipped"], marker="s", label="Shipped")
-
-        plt.title(f"Used vs Shipped Over Time: {selected_ingredient}")
-        plt.xlabel("Month")
-        plt.ylabel(y_label)
-        plt.legend()
-        plt.grid(True, linestyle="--", alpha=0.5)
-        plt.tight_layout()
-
-        buf = io.BytesIO()
-        plt.savefig(buf, format="png")
-        buf.seek(0)
-        img_b64 = base64.b64encode(buf.read()).decode("utf-8")
-        buf.close()
-        plt.close("all")
+        chart_title = f"Used vs Shipped Over Time: {selected_ingredient}"
+        chart = chart_output(chart_format, chart_spec("line", chart_title, "Month", y_label, merged_plot["month"], merged_plot[["Used", "Shipped"]]),
+                             figsize=(12, 6), title_size=None, label_size=None, tick_rotation=0, grid="both",
+                             line_styles=[{"marker": "o"}, {"marker": "s"}])
 
         # --- 5. Table Data ---
         table_data = merged[["month", "Used", "Shipped"]].copy()
@@ -2978,7 +2877,7 @@ def used_shipped_timeline_plot():
         table_records = table_data.to_dict("records")
 
         return jsonify({
-            "image": img_b64,
+            **chart,
             "note": f"Used vs Shipped timeline generated for {selected_ingredient}.",
             "table_data": table_records
         })
@@ -2990,8 +2889,9 @@ def used_shipped_timeline_plot():
 
 
 @app.route("/bestsellers_plot", methods=["POST"])
+@cached_result(month=None, format="png")
 def bestsellers_plot():
-    global item
+    dataset = current_dataset()
 
     INGREDIENT_CONVERSION_MAP = {
         "braisedbeefusedg": "beef", 
@@ -3011,27 +2911,27 @@ def bestsellers_plot():
         "tapiocastarch": "tapioca starch"
     }
     
-    if item is None or item.empty:
+    if dataset is None or dataset.item.empty:
         return jsonify({"error": "Item data not loaded."}), 400
 
     req = request.json or {}
     selected_month = req.get("month")
+    chart_format = req.get("format", "png")
+    if chart_format not in CHART_FORMATS:
+        return jsonify({"error": f"Invalid format: {chart_format} (expected 'png' or 'spec')."}), 400
 
     # --- 1. Data Preparation and Filtering (omitted for brevity) ---
     # ... (code to filter df_filtered, df_top_10, and top_item_names remains the same) ...
 
-    df_temp = item.copy()
-    col_name_map = {col: normalize_text(col) for col in item.columns}
-    df_temp.columns = df_temp.columns.map(col_name_map)
+    df_temp = dataset.item_norm
     
     if selected_month:
         month_col = 'month'
         month_filter = df_temp[month_col].astype(str).str.strip() == selected_month.strip()
-        df_filtered = df_temp[month_filter].copy()
+        df_filtered = df_temp[month_filter]
     else:
-        df_filtered = df_temp.copy()
+        df_filtered = df_temp
 
-    df_filtered['amount'] = pd.to_numeric(df_filtered['amount'], errors='coerce').fillna(0)
     df_grouped = df_filtered.groupby('itemname')['amount'].sum().reset_index()
     df_top_10 = df_grouped.sort_values(by='amount', ascending=False).head(10).copy()
     
@@ -3039,25 +2939,25 @@ def bestsellers_plot():
         return jsonify({"error": "No data available to determine top sellers."}), 400
     
     top_item_names = df_top_10['itemname'].tolist()
-    df_ingredients = df_filtered[df_filtered['itemname'].isin(top_item_names)].copy()
     
-    # --- 3. Ingredient Analysis for Top 10 Items ---
+    # --- 3. Ingredient Analysis for Top 10 Items (straight from the recipe matrix) ---
     
+    recipe = dataset.recipe
+    ingredient_cols = [col for col in INGREDIENT_CONVERSION_MAP if col in recipe.ingredients]
+    quantities = recipe.quantities[:, recipe.ingredients.get_indexer(ingredient_cols)]
     ingredient_data = []
     all_bestseller_ingredients = [] # <-- NEW LIST TO TRACK ALL INGREDIENTS
 
-    for item_name in top_item_names:
-        df_item = df_ingredients[df_ingredients['itemname'] == item_name].copy()
+    for item_name, row in zip(top_item_names, recipe.rows(top_item_names)):
         item_ingredients = []
+        if row < 0:
+            continue
 
-        for ingredient_col in INGREDIENT_CONVERSION_MAP.keys():
-            if ingredient_col in df_item.columns:
-                total_usage = pd.to_numeric(df_item[ingredient_col], errors='coerce').fillna(0).sum()
-                
-                if total_usage > 0:
-                    display_name = INGREDIENT_CONVERSION_MAP[ingredient_col].capitalize()
-                    item_ingredients.append(display_name)
-                    all_bestseller_ingredients.append(display_name) # <-- ADD TO FREQUENCY LIST
+        for ingredient_col, quantity in zip(ingredient_cols, quantities[row]):
+            if quantity > 0:
+                display_name = INGREDIENT_CONVERSION_MAP[ingredient_col].capitalize()
+                item_ingredients.append(display_name)
+                all_bestseller_ingredients.append(display_name) # <-- ADD TO FREQUENCY LIST
         
         if item_ingredients:
             ingredient_data.append({
@@ -3079,26 +2979,12 @@ def bestsellers_plot():
 
     # --- 5. Plot Generation (omitted for brevity) ---
     
-    plt.figure(figsize=(12, 6))
-    order_list = df_top_10['itemname'].tolist()
-    sns.barplot(data=df_top_10, x='itemname', y='amount', order=order_list, palette='viridis')
-    plt.title(f"Top 10 Bestselling Food Items (Filter: {selected_month if selected_month else 'All Months'})", fontsize=14)
-    plt.xlabel("Food Item", fontsize=12)
-    plt.ylabel("Total Amount ($)", fontsize=12)
-    plt.xticks(rotation=45, ha='right')
-    plt.grid(axis='y', linestyle='--', alpha=0.6)
-    plt.tight_layout()
-
-    # Encoding plot to base64
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    buf.seek(0)
-    img_b64 = base64.b64encode(buf.read()).decode("utf-8")
-    buf.close()
-    plt.close("all")
+    chart_title = f"Top 10 Bestselling Food Items (Filter: {selected_month if selected_month else 'All Months'})"
+    chart = chart_output(chart_format, chart_spec("bar", chart_title, "Food Item", "Total Amount ($)", df_top_10["itemname"], {"Amount": df_top_10["amount"]}),
+                         figsize=(12, 6), palette="viridis", grid="y")
     
     return jsonify({
-        "image": img_b64,
+        **chart,
         "note": f"Top 10 bestsellers generated for {selected_month if selected_month else 'All Months'}.",
         "ingredient_table": ingredient_data,
         "frequency_table": frequency_table_data # <-- NEW DATA FIELD
@@ -0,0 +1,82 @@
+# Compares the "exact" per-item refit of /predict_cost_loocv with the "fast" mode
+# (loocv_stepwise), on the loaded cost data and on a larger synthetic menu, and checks
+# that both give the same held-out predictions and averaged coefficients.
+#
+#   python benchmarks/bench_cost_loocv.py [synthetic_items]
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from sklearn.preprocessing import StandardScaler
+from app import TARGETS_INGREDIENTS, current_dataset, loocv_stepwise, stepwise_aic
+
+
+def refit_per_fold(X, y, candidates):
+    """The exact mode: scaler, stepwise search and final OLS on every training fold."""
+    predictions = np.empty(len(X))
+    coefficients = pd.DataFrame(0.0, index=X.index, columns=candidates)
+    for i in range(len(X)):
+        train = np.arange(len(X)) != i
+        X_train, y_train = X[train], y[train]
+        stable = [c for c in candidates if X_train[c].nunique() > 1]
+        if not stable:
+            predictions[i] = y_train.mean()
+            continue
+        scaler = StandardScaler().fit(X_train[stable])
+        X_train_scaled = pd.DataFrame(scaler.transform(X_train[stable]), columns=stable, index=X_train.index)
+        X_test_scaled = pd.DataFrame(scaler.transform(X[~train][stable]), columns=stable, index=X.index[~train])
+        selected, _ = stepwise_aic(X_train_scaled, y_train, stable)
+        if not selected:
+            predictions[i] = y_train.mean()
+            continue
+        model = sm.OLS(y_train, sm.add_constant(X_train_scaled[selected], has_constant="add")).fit()
+        X_test = sm.add_constant(X_test_scaled[selected], has_constant="add")
+        predictions[i] = model.predict(X_test).iloc[0]
+        coefficients.loc[X.index[i], selected] = model.params[selected].to_numpy()
+    return predictions, coefficients
+
+
+def cost_design(dataset):
+    base = dataset.item_norm
+    cols = [c for c in TARGETS_INGREDIENTS if c in base.columns]
+    base = base[base[cols].sum(axis=1) > 0]
+    agg = base.groupby("itemname")[["cost"] + cols].mean().reset_index()
+    return agg[cols].fillna(agg[cols].mean()), agg["cost"], cols
+
+
+def synthetic_design(items, seed=0):
+    rng = np.random.default_rng(seed)
+    cols = [f"ing{j:02d}" for j in range(18)]
+    X = pd.DataFrame(rng.integers(0, 4, size=(items, 18)) * rng.uniform(10, 150, size=18), columns=cols)
+    y = pd.Series(X.to_numpy() @ (rng.uniform(0, 0.02, size=18) * (rng.random(18) < 0.5)) + 8 + rng.normal(0, 0.5, items))
+    return X, y, cols
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore")
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    designs = [("synthetic", *synthetic_design(items))]
+    dataset = current_dataset()
+    if dataset is not None:
+        designs.insert(0, ("loaded data", *cost_design(dataset)))
+
+    for label, X, y, cols in designs:
+        exact_time, (exact_pred, exact_coef) = timed(refit_per_fold, X, y, cols)
+        fast_time, (fast_pred, fast_coef, _) = timed(loocv_stepwise, X, y, cols)
+        assert np.allclose(exact_pred, fast_pred, rtol=1e-9, atol=1e-9), label
+        assert np.allclose(exact_coef.mean(), fast_coef.mean(), rtol=1e-7, atol=1e-9), label
+        print(f"{label}: {len(X)} items x {len(cols)} ingredients")
+        print(f"  exact (refit per item): {exact_time * 1000:9.1f} ms")
+        print(f"  fast (loocv_stepwise):  {fast_time * 1000:9.1f} ms   ({exact_time / fast_time:.0f}x)")
@@ -0,0 +1,83 @@
+# Times the seaborn path /plot used to take (the whole table handed to scatterplot,
+# barplot or lineplot, with seaborn's bootstrapped interval) against the aggregated chart
+# specs it builds now plus render_chart(), on a synthetic table, and checks that the
+# aggregated means and LTTB thinning agree with a plain pandas groupby.
+#
+#   python benchmarks/bench_plot.py [rows]
+import io
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from app import PLOT_MAX_POINTS, lttb, mean_spec, scatter_spec
+from charts import render_chart
+
+PLOTS = {"scatter": sns.scatterplot, "bar": sns.barplot, "line": sns.lineplot}
+
+
+def synthetic_table(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    day = rng.integers(0, 5000, rows)
+    return pd.DataFrame({
+        "day": day,
+        "category": rng.choice([f"cat{j:02d}" for j in range(12)], rows),
+        "amount": 100 + 0.02 * day + rng.normal(0, 15, rows),
+    })
+
+
+def seaborn_png(kind, df, x, y):
+    """The original rendering: seaborn over every row."""
+    plt.figure(figsize=(8, 6))
+    PLOTS[kind](data=df, x=x, y=y)
+    plt.xticks(rotation=90)
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format="png")
+    plt.close()
+    return buffer.getvalue()
+
+
+def spec_png(kind, df, x, y):
+    spec = scatter_spec(df, x, y, kind) if kind == "scatter" else mean_spec(kind, df, x, y, kind)
+    return render_chart(spec, figsize=(8, 6), title_size=None, label_size=None, tick_rotation=90)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore")
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    df = synthetic_table(rows)
+
+    expected = df.groupby("category")["amount"].mean()
+    spec = mean_spec("bar", df, "category", "amount", "bar")
+    got = pd.Series(spec["series"][0]["values"], index=spec["categories"])
+    assert np.allclose(got[expected.index], expected)
+
+    spec = mean_spec("line", df, "day", "amount", "line")
+    assert len(spec["x_values"]) <= PLOT_MAX_POINTS
+    means = df.groupby("day")["amount"].mean()
+    keep = lttb(means.index.to_numpy(dtype=np.float64), means.to_numpy(), PLOT_MAX_POINTS)
+    assert np.all(np.diff(keep) > 0) and keep[0] == 0 and keep[-1] == len(means) - 1
+    assert np.allclose(spec["series"][0]["values"], means.iloc[keep])
+
+    spec = scatter_spec(df, "day", "amount", "scatter")
+    assert sum(spec["counts"]) == rows
+
+    print(f"{rows} rows")
+    for kind, x in (("scatter", "day"), ("bar", "category"), ("line", "day")):
+        old = timed(seaborn_png, kind, df, x, "amount")
+        new = timed(spec_png, kind, df, x, "amount")
+        print(f"  {kind:8s} seaborn {old * 1000:9.1f} ms   spec + render {new * 1000:7.1f} ms   ({old / new:.0f}x)")
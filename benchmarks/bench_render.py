@@ -0,0 +1,64 @@
+# Renders every chart the dashboard draws from concurrent request threads, once with
+# RENDER_EXECUTOR=serial (inline, one chart at a time as pyplot required) and once on the
+# render process pool, and checks that both give identical PNG bytes.
+#
+#   python benchmarks/bench_render.py [threads]
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import app
+from app import current_dataset, render_pool, render_png
+from charts import render_chart
+
+REQUESTS = [
+    ("/predict_next_month_usage", {"month": "Oct"}),
+    ("/predict_cost_loocv", {}),
+    ("/predict_revenue_stepwise", {"plot_type": "bar"}),
+    ("/predict_revenue_stepwise", {"plot_type": "line"}),
+    ("/shipment_vs_usage_plot", {"month": "October"}),
+    ("/used_shipped_timeline_plot", {"ingredient": "Beef"}),
+    ("/bestsellers_plot", {"month": "October"}),
+]
+
+
+def chart_jobs():
+    """(spec, style) for each chart in REQUESTS, captured from the routes' render calls."""
+    jobs = []
+    app.render_png = lambda spec, **style: jobs.append((spec, style)) or b""
+    try:
+        client = app.app.test_client()
+        for url, body in REQUESTS:
+            client.post(url, json=body)
+    finally:
+        app.render_png = render_png
+    return jobs
+
+
+def run(jobs, threads, render):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        images = list(pool.map(lambda job: render(job[0], **job[1]), jobs))
+    return time.perf_counter() - start, images
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore")
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    if current_dataset() is None:
+        sys.exit("No processed snapshot found (POST /upload once, then run from the repo root).")
+
+    jobs = chart_jobs() * 4
+    render_pool()
+    run(jobs[:1], 1, render_png)  # make sure the pool is up
+
+    serial_time, expected = min((run(jobs, 1, render_chart) for _ in range(2)), key=lambda r: r[0])
+    pool_time, images = min((run(jobs, threads, render_png) for _ in range(2)), key=lambda r: r[0])
+    assert images == expected
+    print(f"{len(jobs)} charts, {os.cpu_count()} CPUs, {threads} request threads")
+    print(f"one at a time on the request thread: {serial_time * 1000:8.1f} ms")
+    print(f"render pool:                         {pool_time * 1000:8.1f} ms   ({serial_time / pool_time:.1f}x)")
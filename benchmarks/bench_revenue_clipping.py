@@ -0,0 +1,69 @@
+# Compares the per-row clipping and error loops /predict_revenue_stepwise used to run with
+# clip_revenue_history(), on multi-year daily revenue series (one row per day in place of
+# one row per month), and checks that both give the same predictions and errors.
+#
+#   python benchmarks/bench_revenue_clipping.py [years]
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+from app import clip_revenue_history
+
+
+def loop_clipping(data, second_month_num, last_observed_month_num):
+    """The original loops: a boolean-mask lookup per row, then iterrows() for the errors."""
+    data = data.copy()
+    for i in range(len(data)):
+        month_n = data.loc[i, "month_num"]
+        if month_n > second_month_num and month_n <= last_observed_month_num:
+            prev_month_amount = data.loc[data["month_num"] == month_n - 1, "amount"].iloc[0]
+            if not np.isnan(prev_month_amount):
+                pred_val = data.loc[i, "predicted"]
+                data.loc[i, "predicted"] = np.clip(pred_val, prev_month_amount * 0.95, prev_month_amount * 1.05)
+    mse_list = []
+    for _, row in data.iterrows():
+        if not np.isnan(row["predicted"]) and not np.isnan(row["amount"]) and row["month_num"] > second_month_num:
+            mse_list.append((row["predicted"] - row["amount"]) ** 2)
+        else:
+            mse_list.append(np.nan)
+    return data["predicted"].to_numpy(), np.array(mse_list)
+
+
+def daily_series(days, seed=0):
+    """Days 1..days of noisy revenue with predictions, plus a forecast row for the next day."""
+    rng = np.random.default_rng(seed)
+    day = np.arange(1, days + 2, dtype=np.float64)
+    amount = 2000 + 300 * np.sin(day * 2 * np.pi / 365) + rng.normal(0, 150, len(day))
+    amount[-1] = np.nan
+    predicted = amount + rng.normal(0, 120, len(day))
+    predicted[:2] = np.nan
+    predicted[-1] = 2000.0
+    return pd.DataFrame({"month_num": day, "amount": amount, "predicted": predicted})
+
+
+def timed(fn, *args, repeats=1):
+    times, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(*args)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore")
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    for days in (365, 365 * years):
+        data = daily_series(days)
+        old_time, (old_pred, old_err) = timed(loop_clipping, data, 2, days)
+        new_time, (new_pred, new_err) = timed(clip_revenue_history, data, 2, days, repeats=5)
+        np.testing.assert_array_equal(old_pred, new_pred)
+        np.testing.assert_array_equal(old_err, new_err)
+        print(f"{days} days")
+        print(f"  per-row loops:          {old_time * 1000:9.1f} ms")
+        print(f"  clip_revenue_history:   {new_time * 1000:9.3f} ms   ({old_time / new_time:.0f}x)")
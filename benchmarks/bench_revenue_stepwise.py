@@ -0,0 +1,101 @@
+# Compares the formula-based stepwise search that /predict_revenue_stepwise used to run
+# (sm.OLS.from_formula per candidate) with fit_all_subsets() + revenue_stepwise(), on
+# random monthly revenue series, and checks that both select the same terms. Then times
+# forecast_revenue_batch() (/predict_revenue_batch) on thousands of series sharing one
+# month range against one fit_all_subsets() + revenue_stepwise() per series.
+#
+#   python benchmarks/bench_revenue_stepwise.py [series] [batch_series]
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from app import REVENUE_TERMS, fit_all_subsets, forecast_revenue_batch, revenue_design, revenue_stepwise
+
+
+def formula_stepwise(data, response):
+    """The original search, with predictors in REVENUE_TERMS order."""
+    included = []
+    predictors = list(REVENUE_TERMS)
+    changed = True
+    while changed:
+        changed = False
+        excluded = [p for p in predictors if p not in included]
+        aic_scores = pd.Series(dtype=float)
+        for new_col in excluded:
+            formula = f"{response} ~ {' + '.join(included + [new_col])}"
+            aic_scores.loc[new_col] = sm.OLS.from_formula(formula, data).fit().aic
+        if not aic_scores.empty:
+            best_candidate = aic_scores.idxmin()
+            current_aic = sm.OLS.from_formula(f"{response} ~ {' + '.join(included)}", data).fit().aic if included else float("inf")
+            if aic_scores.min() + 1e-4 < current_aic:
+                included.append(best_candidate)
+                changed = True
+        if included:
+            aics = pd.Series(dtype=float)
+            for col in included:
+                subset = [c for c in included if c != col]
+                aics.loc[col] = sm.OLS.from_formula(f"{response} ~ {' + '.join(subset)}", data).fit().aic if subset else float("inf")
+            current_aic = sm.OLS.from_formula(f"{response} ~ {' + '.join(included)}", data).fit().aic
+            if aics.min() + 1e-4 < current_aic:
+                included.remove(aics.idxmin())
+                changed = True
+    return included
+
+
+def random_series(count, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        months = np.arange(5, 5 + rng.integers(5, 12))
+        trend = rng.normal(20000, 5000) + rng.normal(0, 1500) * (months - 5) + rng.normal(0, 200) * (months - 5) ** 2
+        data = revenue_design(months)
+        data["amount"] = trend + rng.normal(0, 2000, len(months))
+        yield data
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore")
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    series = list(random_series(count))
+
+    start = time.perf_counter()
+    expected = [formula_stepwise(data, "amount") for data in series]
+    old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    got = [revenue_stepwise(fit_all_subsets(data[REVENUE_TERMS], data["amount"])) for data in series]
+    new = time.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(expected, got))
+    print(f"{count} series, {mismatches} selection mismatches")
+    print(f"sm.OLS.from_formula per candidate: {old * 1000:9.1f} ms")
+    print(f"fit_all_subsets + revenue_stepwise: {new * 1000:8.1f} ms   ({old / new:.0f}x)")
+    assert mismatches == 0
+
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    rng = np.random.default_rng(1)
+    months = np.arange(5, 17)
+    steps = months - 5
+    Y = (rng.normal(20000, 5000, batch) + np.outer(steps, rng.normal(0, 1500, batch))
+         + np.outer(steps ** 2, rng.normal(0, 200, batch)) + rng.normal(0, 2000, (len(months), batch)))
+    design = revenue_design(months)[REVENUE_TERMS]
+
+    start = time.perf_counter()
+    expected = [revenue_stepwise(fit_all_subsets(design, Y[:, s])) for s in range(batch)]
+    old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = forecast_revenue_batch(months, Y)
+    new = time.perf_counter() - start
+
+    got = [{t for j, t in enumerate(REVENUE_TERMS) if mask >> j & 1} for mask in result["masks"]]
+    mismatches = sum(set(a) != b for a, b in zip(expected, got))
+    print(f"{batch} series x {len(months)} months, {mismatches} selection mismatches")
+    print(f"revenue_stepwise per series: {old * 1000:9.1f} ms")
+    print(f"forecast_revenue_batch:      {new * 1000:9.1f} ms   ({old / new:.0f}x)")
+    assert mismatches == 0
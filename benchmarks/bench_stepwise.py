@@ -0,0 +1,205 @@
+# Parity check and timing for stepwise_aic() against the statsmodels refit-per-candidate
+# search it replaced in /predict_next_month_usage and /predict_cost_loocv, and for the
+# shared-design stepwise_aic_multi() against one stepwise_aic() per target.
+#
+# A batch of random designs (including collinear columns) is replayed with both
+# implementations, plus every stepwise search those two routes run on the loaded dataset
+# when a processed snapshot exists. Each pair of results must select the same features
+# with the same AIC (to 1e-6), or, where collinear columns make several feature sets tie,
+# give the same fitted values. Constant targets (such as greenonion, 20 in every row)
+# must keep the intercept-only model with a finite AIC, as statsmodels does, where an
+# all-zero target scores -inf with statsmodels and stepwise_aic() alike. The script needs
+# no prior /upload and exits non-zero on any mismatch.
+#
+#   python benchmarks/bench_stepwise.py [random_cases]
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from sklearn.preprocessing import StandardScaler
+from app import TARGETS_INGREDIENTS, current_dataset, stepwise_aic, stepwise_aic_multi
+
+
+def statsmodels_stepwise(X, y, candidates):
+    """The original search: one sm.OLS fit per candidate move."""
+    selected_features = []
+    remaining = list(candidates)
+    best_score = float("inf")
+    while True:
+        scores_to_add = []
+        scores_to_remove = []
+        for candidate in remaining:
+            try:
+                features = selected_features + [candidate]
+                model_try = sm.OLS(y, sm.add_constant(X[features], has_constant="add")).fit()
+                scores_to_add.append((model_try.aic, candidate))
+            except (np.linalg.LinAlgError, Exception):
+                continue
+        for candidate in selected_features:
+            try:
+                features = [f for f in selected_features if f != candidate]
+                if not features:
+                    model_try = sm.OLS(y, sm.add_constant(pd.DataFrame(index=X.index), has_constant="add")).fit()
+                else:
+                    model_try = sm.OLS(y, sm.add_constant(X[features], has_constant="add")).fit()
+                scores_to_remove.append((model_try.aic, candidate))
+            except (np.linalg.LinAlgError, Exception):
+                continue
+        best_forward = min(scores_to_add) if scores_to_add else (float("inf"), None)
+        best_backward = min(scores_to_remove) if scores_to_remove else (float("inf"), None)
+        current_best_score = min(best_forward[0], best_backward[0])
+        if current_best_score < best_score:
+            if current_best_score == best_forward[0]:
+                selected_features.append(best_forward[1])
+                remaining.remove(best_forward[1])
+            else:
+                selected_features.remove(best_backward[1])
+                remaining.append(best_backward[1])
+            best_score = current_best_score
+        else:
+            break
+    return selected_features, best_score
+
+
+def usage_cases(dataset):
+    """(X, y, candidates) for every month/target searched by /predict_next_month_usage."""
+    month_map = {"may": 5, "june": 6, "july": 7, "aug": 8, "sept": 9, "oct": 10, "nov": 11}
+    base = dataset.item_norm
+    base = base.assign(month_num=base["month"].astype(str).str.lower().map(month_map))
+    predictors = [c for c in base.select_dtypes(include="number").columns if c not in set(TARGETS_INGREDIENTS + ["month_num"])]
+    for month_num in sorted(set(month_map.values()))[1:]:
+        train = base[base["month_num"] < month_num]
+        if train.empty:
+            continue
+        X = train[predictors].fillna(train[predictors].mean())
+        candidates = [c for c in X.columns if X[c].nunique() > 1]
+        for target in TARGETS_INGREDIENTS:
+            yield f"usage m{month_num} {target}", X, train[target], candidates
+
+
+def cost_cases(dataset):
+    """(X, y, candidates) for every fold searched by /predict_cost_loocv."""
+    base = dataset.item_norm
+    cols = [c for c in TARGETS_INGREDIENTS if c in base.columns]
+    base = base[base[cols].sum(axis=1) > 0]
+    agg = base.groupby("itemname")[["cost"] + cols].mean().reset_index()
+    X_full = agg[cols].fillna(agg[cols].mean())
+    for item in agg["itemname"].unique():
+        mask = agg["itemname"] == item
+        X_train = X_full[~mask]
+        stable = [c for c in cols if X_train[c].nunique() > 1]
+        scaled = pd.DataFrame(StandardScaler().fit_transform(X_train[stable]), columns=stable, index=X_train.index)
+        yield f"cost {item}", scaled, agg.loc[~mask, "cost"], stable
+
+
+def random_cases(count, seed=0):
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        n, p = rng.integers(15, 200), rng.integers(2, 12)
+        X = pd.DataFrame(rng.normal(size=(n, p)), columns=[f"x{j}" for j in range(p)])
+        if i % 3 == 0:
+            X["dup"] = X["x0"] * 2.0 + X["x1"]
+        beta = rng.normal(size=X.shape[1]) * (rng.random(X.shape[1]) < 0.5)
+        y = pd.Series(X.to_numpy() @ beta + rng.normal(size=n) * rng.uniform(0.1, 3))
+        yield f"random {i}", X, y, list(X.columns)
+
+
+def constant_cases(seed=0):
+    """Designs with a constant target: all zero, and nonzero values of several magnitudes."""
+    rng = np.random.default_rng(seed)
+    for i, value in enumerate([0.0, 20.0, 1e-3, 7.5e4]):
+        n, p = rng.integers(13, 60), rng.integers(2, 8)
+        X = pd.DataFrame(rng.normal(size=(n, p)) * rng.uniform(1, 100, size=p), columns=[f"x{j}" for j in range(p)])
+        yield f"constant {value:g}", X, pd.Series(np.full(n, value)), list(X.columns)
+
+
+def multi_target_cases(dataset, seed=0):
+    """(X, Y, candidates): each usage month's training window (if loaded), plus a larger synthetic one."""
+    seen = set()
+    for label, X, y, candidates in usage_cases(dataset) if dataset is not None else []:
+        key = label.split()[1]
+        if key not in seen:
+            seen.add(key)
+            yield f"usage {key}", X, dataset.item_norm.loc[X.index, TARGETS_INGREDIENTS], candidates
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(2000, 30)), columns=[f"x{j:02d}" for j in range(30)])
+    Y = pd.DataFrame(X.to_numpy() @ (rng.normal(size=(30, 18)) * (rng.random((30, 18)) < 0.3)) + rng.normal(size=(2000, 18)))
+    yield "synthetic 2000x30, 18 targets", X, Y, list(X.columns)
+
+
+def fitted(X, y, features):
+    design = np.column_stack([np.ones(len(X)), X[features].to_numpy(dtype=np.float64)])
+    return design @ np.linalg.lstsq(design, y.to_numpy(dtype=np.float64), rcond=None)[0]
+
+
+def compare(X, y, ref, new):
+    """'same', 'tie' (different but equivalent feature sets) or 'mismatch'."""
+    (ref_features, ref_aic), (features, aic) = ref, new
+    if features == ref_features and np.isclose(aic, ref_aic, rtol=0, atol=1e-6):
+        return "same"
+    scale = 1e-8 * (1 + np.abs(y).max())
+    if np.abs(fitted(X, y, ref_features) - fitted(X, y, features)).max() <= scale:
+        return "tie"
+    return "mismatch"
+
+
+def best_of(fn, cases, repeats=3):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _, X, y, candidates in cases:
+            fn(X, y, candidates)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore")
+    n_random = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    dataset = current_dataset()
+    cases = list(random_cases(n_random)) + list(constant_cases())
+    if dataset is not None:
+        cases = list(usage_cases(dataset)) + list(cost_cases(dataset)) + cases
+    else:
+        print("No processed snapshot found; checking random designs only.")
+    outcomes = {"same": 0, "tie": 0, "mismatch": 0}
+    for label, X, y, candidates in cases:
+        ref = statsmodels_stepwise(X, y, candidates)
+        new = stepwise_aic(X, y, candidates)
+        outcome = compare(X, y, ref, new)
+        outcomes[outcome] += 1
+        if outcome == "mismatch":
+            print(f"MISMATCH {label}: {ref[0]} {ref[1]:.6f} vs {new[0]} {new[1]:.6f}")
+
+    old = best_of(statsmodels_stepwise, cases, repeats=1)
+    new = best_of(stepwise_aic, cases)
+    print(f"{len(cases)} stepwise searches: {outcomes['same']} identical, "
+          f"{outcomes['tie']} equivalent under collinearity, {outcomes['mismatch']} mismatches")
+    print(f"statsmodels refit per candidate: {old * 1000:9.1f} ms")
+    print(f"stepwise_aic (sweep):            {new * 1000:9.1f} ms")
+    print(f"speedup:                         {old / new:9.1f}x")
+    assert outcomes["mismatch"] == 0
+
+    for label, X, y, candidates in cases:
+        if y.nunique() == 1 and y.iloc[0] != 0:
+            features, aic = stepwise_aic(X, y, candidates)
+            assert features == [] and np.isfinite(aic), f"{label}: {features} {aic}"
+
+    for label, X, Y, candidates in multi_target_cases(dataset):
+        single = [stepwise_aic(X, Y.iloc[:, t], candidates) for t in range(Y.shape[1])]
+        for (features, aic), (ref_features, ref_aic) in zip(stepwise_aic_multi(X, Y, candidates), single):
+            assert features == ref_features and np.isclose(aic, ref_aic, rtol=0, atol=1e-6), label
+        start = time.perf_counter()
+        for t in range(Y.shape[1]):
+            stepwise_aic(X, Y.iloc[:, t], candidates)
+        one_by_one = time.perf_counter() - start
+        start = time.perf_counter()
+        stepwise_aic_multi(X, Y, candidates)
+        shared = time.perf_counter() - start
+        print(f"{label}: per target {one_by_one * 1000:7.2f} ms, shared design {shared * 1000:7.2f} ms")
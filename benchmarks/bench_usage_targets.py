@@ -0,0 +1,59 @@
+# Times the per-target fitting of /predict_next_month_usage under each PREDICT_EXECUTOR
+# mode and checks that every mode returns identical predictions, in target order.
+#
+#   python benchmarks/bench_usage_targets.py [workers]
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pandas as pd
+from app import TARGETS_INGREDIENTS, current_dataset, map_targets, predict_usage_target, stepwise_aic_multi
+
+MONTH_MAP = {"may": 5, "june": 6, "july": 7, "aug": 8, "sept": 9, "oct": 10, "nov": 11}
+
+
+def month_jobs(dataset):
+    """The jobs /predict_next_month_usage submits for each month it can predict."""
+    base = dataset.item_norm
+    base = base.assign(month_num=base["month"].astype(str).str.lower().map(MONTH_MAP))
+    predictors = [c for c in base.select_dtypes(include="number").columns if c not in set(TARGETS_INGREDIENTS + ["month_num"])]
+    for label, month_num in list(MONTH_MAP.items())[1:]:
+        train = base[base["month_num"] < month_num]
+        test = base[base["month_num"] == month_num]
+        X_train = train[predictors].fillna(train[predictors].mean())
+        candidates = [c for c in X_train.columns if X_train[c].nunique() > 1]
+        train_means = X_train.mean().to_dict()
+        selections = stepwise_aic_multi(X_train, train[TARGETS_INGREDIENTS], candidates)
+        yield [
+            (t, train[t], X_train, selected, test[predictors], train_means, label)
+            for t, (selected, _) in zip(TARGETS_INGREDIENTS, selections)
+        ]
+
+
+def run(all_jobs, mode, workers):
+    start = time.perf_counter()
+    results = [map_targets(predict_usage_target, jobs, mode=mode, workers=workers) for jobs in all_jobs]
+    return time.perf_counter() - start, results
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore")
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    dataset = current_dataset()
+    if dataset is None:
+        sys.exit("No processed snapshot found (POST /upload once, then run from the repo root).")
+
+    all_jobs = list(month_jobs(dataset))
+    baseline = None
+    for mode in ("serial", "thread", "process"):
+        run(all_jobs, mode, workers)  # warm the pool
+        elapsed, results = min((run(all_jobs, mode, workers) for _ in range(3)), key=lambda r: r[0])
+        if baseline is None:
+            baseline = results
+        for expected, got in zip(baseline, results):
+            for a, b in zip(expected, got):
+                pd.testing.assert_series_equal(a, b)
+        print(f"{mode:8s} {elapsed * 1000:8.1f} ms for {len(all_jobs)} months x {len(TARGETS_INGREDIENTS)} targets")
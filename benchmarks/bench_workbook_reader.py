@@ -0,0 +1,41 @@
+# Compares the single-pass read_data_matrix() loader against the old
+# "pd.read_excel once per sheet" loop on the monthly data matrices.
+#
+#   python benchmarks/bench_workbook_reader.py [repeats]
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pandas as pd
+from app import read_data_matrix
+
+
+def per_sheet_read(fpath):
+    return [pd.read_excel(fpath, sheet_name=i) for i in range(3)]
+
+
+def best_of(fn, files, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for fpath in files:
+            fn(fpath)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    files = sorted(glob.glob("data/*_Data_Matrix*.xlsx"))
+    if not files:
+        sys.exit("No data/*_Data_Matrix*.xlsx files found (run from the repo root).")
+
+    old = best_of(per_sheet_read, files, repeats)
+    new = best_of(read_data_matrix, files, repeats)
+    print(f"{len(files)} workbooks, best of {repeats}")
+    print(f"pd.read_excel x3 per workbook: {old * 1000:8.1f} ms")
+    print(f"read_data_matrix:              {new * 1000:8.1f} ms")
+    print(f"speedup:                       {old / new:8.2f}x")
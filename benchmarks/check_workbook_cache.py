@@ -0,0 +1,43 @@
+# Regression check for the parsed workbook cache: a data matrix whose Amount column mixes
+# numeric cells with "$5,045.65" strings (which parquet cannot store in one column) must
+# still load through read_workbooks_cached(), cold and warm, exactly as read_data_matrix()
+# parses it.
+#
+#   python benchmarks/check_workbook_cache.py
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import openpyxl
+import pandas as pd
+import app
+
+
+def write_workbook(path):
+    wb = openpyxl.Workbook()
+    sheets = {"Group": ["Lunch Menu", "Drinks"], "Category": ["Ramen", "Tea"], "Item": ["Beef Ramen", "Milk Tea"]}
+    for i, (kind, names) in enumerate(sheets.items()):
+        ws = wb.active if i == 0 else wb.create_sheet()
+        ws.append([kind, "Count", "Amount"])
+        ws.append([names[0], 12, "$5,045.65"])
+        ws.append([names[1], 3, 41.5])
+    wb.save(path)
+
+
+if __name__ == "__main__":
+    work = tempfile.mkdtemp()
+    app.WORKBOOK_CACHE_DIR = os.path.join(work, "cache")
+    path = os.path.join(work, "May_Data_Matrix.xlsx")
+    write_workbook(path)
+    expected = app.read_data_matrix(path)
+
+    cold = app.read_workbooks_cached([path])[0]
+    app._workbook_memo.clear()
+    warm = app.read_workbooks_cached([path])[0]
+    for kind in app.SHEET_KINDS:
+        pd.testing.assert_frame_equal(cold[kind], expected[kind])
+        pd.testing.assert_frame_equal(warm[kind], expected[kind])
+    assert not os.path.exists(os.path.join(app.WORKBOOK_CACHE_DIR, f"{app.workbook_digests([path])[0]}-item.parquet"))
+    print("mixed-type workbook loads cold and warm")
@@ -0,0 +1,101 @@
+# charts.py
+#
+# Draws the chart specs built in app.py to PNG with matplotlib's object-oriented API
+# (Figure + FigureCanvasAgg, no pyplot state). This module imports only numpy and
+# matplotlib, so the render worker processes that run it stay small: they never import
+# app.py, its models or the processed snapshot.
+import io
+import warnings
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+def palette_colors(name, n):
+    """n colours sampled evenly from a matplotlib colormap, as seaborn.color_palette(name, n) does."""
+    return [tuple(rgba[:3]) for rgba in matplotlib.colormaps[name](np.linspace(0, 1, n + 2)[1:-1])]
+
+
+def render_chart(spec, figsize=(10, 6), title_size=14, label_size=12, tick_size=None,
+                 tick_rotation=45, grid=None, legend_title=None, palette=None, line_styles=None):
+    """PNG bytes for a chart spec.
+
+    "bar" and "line" specs are drawn as grouped bars or one line per series over the
+    categories (a line over "x_values" when the spec has them), with error bars or a band
+    where a series has "low"/"high"; "pie" is drawn from its first series and "scatter"
+    from "x_values" and its first series, coloured by "counts" once points are binned.
+    grid is None, "y" or "both"; palette colours a single bar series bar by bar;
+    line_styles are per-series ax.plot() keyword arguments.
+    """
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    kind = spec["kind"]
+
+    if kind == "pie":
+        ax.pie(spec["series"][0]["values"], labels=spec["categories"], autopct="%1.1f%%")
+    elif kind == "scatter":
+        xs = np.array(spec["x_values"], dtype=np.float64)
+        ys = np.array(spec["series"][0]["values"], dtype=np.float64)
+        counts = np.array(spec["counts"])
+        if len(counts) and counts.max() > 1:
+            points = ax.scatter(xs, ys, s=6 + 40 * counts / counts.max(), c=counts, cmap="viridis")
+            fig.colorbar(points, ax=ax, label="rows")
+        else:
+            ax.scatter(xs, ys, s=20)
+        for set_ticks, labels in ((ax.set_xticks, spec["x_categories"]), (ax.set_yticks, spec["y_categories"])):
+            if labels is not None:
+                set_ticks(np.arange(len(labels)), labels)
+        ax.tick_params(axis="x", labelrotation=tick_rotation)
+    else:
+        categories = spec["categories"]
+        scaled = "x_values" in spec
+        positions = np.array(spec["x_values"], dtype=np.float64) if scaled else np.arange(len(categories))
+        series = [(s["name"], np.array(s["values"], dtype=np.float64), s) for s in spec["series"]]
+        if kind == "bar":
+            width = 0.8 / len(series)
+            for k, (name, values, s) in enumerate(series):
+                color = palette_colors(palette, len(values)) if palette and len(series) == 1 else None
+                error = None
+                if "low" in s:
+                    error = [values - np.array(s["low"], dtype=np.float64), np.array(s["high"], dtype=np.float64) - values]
+                ax.bar(positions - 0.4 + width * (k + 0.5), values, width, yerr=error, label=name, color=color)
+        else:
+            markers = ["o", "s", "x", "^", "D"]
+            for k, (name, values, s) in enumerate(series):
+                style = line_styles[k] if line_styles else {"marker": markers[k % len(markers)] if len(values) <= 100 else None}
+                shown = ~np.isnan(values)
+                line, = ax.plot(positions[shown], values[shown], label=name, **style)
+                if "low" in s:
+                    low, high = np.array(s["low"], dtype=np.float64), np.array(s["high"], dtype=np.float64)
+                    ax.fill_between(positions[shown], low[shown], high[shown], color=line.get_color(), alpha=0.2)
+        if scaled:
+            ax.tick_params(axis="x", labelrotation=tick_rotation)
+        else:
+            ax.set_xticks(positions, categories, rotation=tick_rotation, ha="right" if tick_rotation else "center", fontsize=tick_size)
+        if len(series) > 1 or legend_title:
+            ax.legend(title=legend_title)
+
+    # A size of None keeps matplotlib's default for that text
+    ax.set_title(spec["title"], **({} if title_size is None else {"fontsize": title_size}))
+    if kind != "pie":
+        label_font = {} if label_size is None else {"fontsize": label_size}
+        ax.set_xlabel(spec["x_label"], **label_font)
+        ax.set_ylabel(spec["y_label"], **label_font)
+    if grid:
+        ax.grid(True, axis="y" if grid == "y" else "both", linestyle="--", alpha=0.6)
+    fig.tight_layout()
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
+
+
+def init_worker():
+    """Load fonts and draw once, so a worker's first real chart renders at full speed."""
+    warnings.simplefilter("ignore")
+    render_chart({"kind": "bar", "title": "warmup", "x_label": "x", "y_label": "y",
+                  "categories": ["a"], "series": [{"name": "a", "values": [1.0]}]})
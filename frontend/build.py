@@ -0,0 +1,56 @@
+# Builds the bundle the page loads: src/app.jsx transpiled by esbuild (JSX to
+# React.createElement calls) and minified by rjsmin, appended to the vendored production
+# React builds in vendor/, and written to ../static/dist/app-<content hash>.js together
+# with ../static/dist/manifest.json, which app.py reads to find it. The output depends only
+# on those files and the tool versions pinned in requirements.txt, so an unchanged app.jsx
+# always rebuilds to the same name.
+#
+#   pip install -r frontend/requirements.txt
+#   python frontend/build.py
+import hashlib
+import json
+import os
+import shutil
+
+import rjsmin
+from esbuild_py import transform
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCE = os.path.join(HERE, "src", "app.jsx")
+VENDOR = [
+    os.path.join(HERE, "vendor", "react-18.3.1.production.min.js"),
+    os.path.join(HERE, "vendor", "react-dom-18.3.1.production.min.js"),
+]
+DIST = os.path.join(HERE, "..", "static", "dist")
+
+
+def build():
+    with open(SOURCE, "rb") as f:
+        source = f.read()
+    compiled = transform(source.decode("utf-8"))
+    if not compiled:
+        # esbuild_py returns nothing rather than raising when app.jsx does not parse
+        raise SystemExit(f"esbuild could not transform {SOURCE}")
+
+    parts = []
+    for path in VENDOR:
+        with open(path) as f:
+            parts.append(f.read().strip())
+    parts.append(rjsmin.jsmin(compiled))
+    bundle = ";\n".join(parts).encode("utf-8") + b"\n"
+
+    name = f"app-{hashlib.sha256(bundle).hexdigest()[:16]}.js"
+    shutil.rmtree(DIST, ignore_errors=True)
+    os.makedirs(DIST)
+    with open(os.path.join(DIST, name), "wb") as f:
+        f.write(bundle)
+    with open(os.path.join(DIST, "manifest.json"), "w") as f:
+        # source_sha1 lets the server notice an app.jsx edited since this build
+        json.dump({"app.js": name, "source_sha1": hashlib.sha1(source).hexdigest()}, f, indent=1)
+        f.write("\n")
+    return name, len(bundle)
+
+
+if __name__ == "__main__":
+    name, size = build()
+    print(f"built static/dist/{name} ({size} bytes)")
@@ -0,0 +1,1481 @@
+const { useState, useEffect, useRef } = React;
+
+function usePersistentState(key, defaultValue) {
+    const [state, setState] = useState(() => {
+        try {
+        const stored = localStorage.getItem(key);
+        return stored ? JSON.parse(stored) : defaultValue;
+        } catch {
+        return defaultValue;
+        }
+    });
+
+    useEffect(() => {
+        try {
+        localStorage.setItem(key, JSON.stringify(state));
+        } catch (e) {
+        console.error("Failed to save state:", e);
+        }
+    }, [key, state]);
+
+    return [state, setState];
+}
+
+// The browser does not cache POST responses, so keep each chart's ETag and body here
+// and revalidate with If-None-Match; the server answers 304 when nothing changed.
+const chartCache = new Map();
+const CHART_CACHE_SIZE = 50;
+
+async function fetchChart(url, payload) {
+    const key = url + " " + JSON.stringify(payload);
+    const cached = chartCache.get(key);
+    const headers = { "Content-Type": "application/json" };
+    if (cached) headers["If-None-Match"] = cached.etag;
+
+    const response = await fetch(url, { method: "POST", headers, body: JSON.stringify(payload) });
+    if (response.status === 304 && cached) {
+        return new Response(cached.body, { status: 200, headers: { "Content-Type": cached.type } });
+    }
+
+    const etag = response.headers.get("ETag");
+    if (response.ok && etag) {
+        chartCache.delete(key);
+        chartCache.set(key, { etag, body: await response.clone().blob(), type: response.headers.get("Content-Type") });
+        if (chartCache.size > CHART_CACHE_SIZE) chartCache.delete(chartCache.keys().next().value);
+    }
+    return response;
+}
+
+// Draws a chart spec returned with {"format": "spec"}: grouped bars or lines over
+// categories (lines to scale when the spec has x_values), binned or raw scatter
+// points, or a pie. "Export PNG" asks the server to render the same request as an image.
+const CHART_COLORS = ["#4c72b0", "#dd8452", "#55a868", "#c44e52", "#8172b3", "#937860"];
+
+function chartTicks(min, max, count) {
+    if (min === max) max = min + 1;
+    const rough = (max - min) / count;
+    const magnitude = Math.pow(10, Math.floor(Math.log10(rough)));
+    const step = [1, 2, 2.5, 5, 10].map((m) => m * magnitude).find((m) => m >= rough);
+    const ticks = [];
+    for (let t = Math.floor(min / step) * step; t < max + step; t += step) {
+        ticks.push(Number(t.toPrecision(12)));
+        if (t >= max) break;
+    }
+    return ticks;
+}
+
+// Maps values onto [start, end]: to scale through nice ticks, or one band per category
+function chartScale(values, categories, start, end, includeZero) {
+    if (categories) {
+        const band = (end - start) / Math.max(categories.length, 1);
+        const every = Math.ceil(categories.length / 40);
+        return {
+            at: (v) => start + band * (v + 0.5),
+            band,
+            ticks: categories.map((c, i) => ({ value: i, text: c })).filter((t) => t.value % every === 0),
+        };
+    }
+    const shown = values.filter((v) => v !== null);
+    const ticks = chartTicks(Math.min(...shown, ...(includeZero ? [0] : [])), Math.max(...shown, ...(includeZero ? [0] : [])), 5);
+    const low = ticks[0], high = ticks[ticks.length - 1];
+    return {
+        at: (v) => start + (end - start) * (v - low) / (high - low),
+        band: 0,
+        ticks: ticks.map((t) => ({ value: t, text: t.toLocaleString() })),
+    };
+}
+
+const PieChart = ({ spec, width, height }) => {
+    const values = spec.series[0].values.map((v) => v || 0);
+    const total = values.reduce((a, b) => a + b, 0) || 1;
+    const cx = width / 2, cy = height / 2 + 15, r = Math.min(width, height) / 2 - 60;
+    let angle = 0;
+    return values.map((v, i) => {
+        const start = angle, end = angle + (2 * Math.PI * v) / total;
+        angle = end;
+        const mid = (start + end) / 2;
+        const point = (a, radius) => [cx + radius * Math.cos(a), cy + radius * Math.sin(a)];
+        const [x1, y1] = point(start, r), [x2, y2] = point(end, r), [lx, ly] = point(mid, r + 18), [px, py] = point(mid, r * 0.6);
+        return (
+            <g key={i}>
+                <path d={`M ${cx} ${cy} L ${x1} ${y1} A ${r} ${r} 0 ${end - start > Math.PI ? 1 : 0} 1 ${x2} ${y2} Z`}
+                      fill={CHART_COLORS[i % CHART_COLORS.length]} stroke="white">
+                    <title>{`${spec.categories[i]}: ${v.toLocaleString()}`}</title>
+                </path>
+                <text x={lx} y={ly} fontSize="12" textAnchor={Math.cos(mid) >= 0 ? "start" : "end"}>{spec.categories[i]}</text>
+                <text x={px} y={py} fontSize="11" textAnchor="middle">{((100 * v) / total).toFixed(1)}%</text>
+            </g>
+        );
+    });
+};
+
+const Chart = ({ spec, exportUrl, exportPayload }) => {
+    const width = 960, height = 500;
+    const margin = { top: 50, right: 20, bottom: 140, left: 90 };
+    const plotBottom = height - margin.bottom, plotRight = width - margin.right;
+    const color = (k) => CHART_COLORS[k % CHART_COLORS.length];
+
+    const exportPng = async () => {
+        const response = await fetchChart(exportUrl, { ...exportPayload, format: "png" });
+        let href;
+        if ((response.headers.get("Content-Type") || "").startsWith("image/")) {
+            href = URL.createObjectURL(await response.blob());
+        } else {
+            const data = await response.json();
+            if (!data.image) {
+                alert("Export failed: " + (data.error || response.status));
+                return;
+            }
+            href = "data:image/png;base64," + data.image;
+        }
+        const link = document.createElement("a");
+        link.href = href;
+        link.download = spec.title + ".png";
+        link.click();
+    };
+
+    let body;
+    if (spec.kind === "pie") {
+        body = <PieChart spec={spec} width={width} height={height} />;
+    } else {
+        const scatter = spec.kind === "scatter";
+        const yValues = spec.series.flatMap((s) => [...s.values, ...(s.low || []), ...(s.high || [])]);
+        const xScale = scatter || spec.x_values
+            ? chartScale(spec.x_values, spec.x_categories || null, margin.left, plotRight, false)
+            : chartScale(null, spec.categories, margin.left, plotRight, false);
+        const yScale = chartScale(yValues, (scatter && spec.y_categories) || null, plotBottom, margin.top, spec.kind === "bar");
+        const xAt = (i) => xScale.at(spec.x_values ? spec.x_values[i] : i);
+        const y = yScale.at;
+        const xLabel = (i) => (spec.categories ? spec.categories[i] : spec.x_values[i]);
+        const label = (s, i, v) => `${s.name} (${xLabel(i)}): ${v.toLocaleString()}`;
+        const barWidth = (xScale.band * 0.8) / Math.max(spec.series.length, 1);
+        const maxCount = scatter ? Math.max(...spec.counts) : 1;
+
+        body = (
+            <>
+                {yScale.ticks.map((t) => (
+                    <g key={t.value}>
+                        <line x1={margin.left} x2={plotRight} y1={y(t.value)} y2={y(t.value)} stroke="#ddd" strokeDasharray="4 3" />
+                        <text x={margin.left - 8} y={y(t.value) + 4} textAnchor="end" fontSize="11">{t.text}</text>
+                    </g>
+                ))}
+                {spec.kind === "bar" && spec.series.map((s, k) => s.values.map((v, i) => v === null ? null : (
+                    <g key={k + "-" + i}>
+                        <rect x={xAt(i) - xScale.band * 0.4 + k * barWidth} width={barWidth}
+                              y={Math.min(y(v), y(0))} height={Math.abs(y(0) - y(v))} fill={color(k)}>
+                            <title>{label(s, i, v)}</title>
+                        </rect>
+                        {s.low && s.low[i] !== null && (
+                            <line x1={xAt(i) - xScale.band * 0.4 + (k + 0.5) * barWidth} x2={xAt(i) - xScale.band * 0.4 + (k + 0.5) * barWidth}
+                                  y1={y(s.low[i])} y2={y(s.high[i])} stroke="#333" />
+                        )}
+                    </g>
+                )))}
+                {spec.kind === "line" && spec.series.map((s, k) => {
+                    const points = s.values.map((v, i) => ({ i, v })).filter((p) => p.v !== null);
+                    const band = s.low && points.filter((p) => s.low[p.i] !== null);
+                    return (
+                        <g key={k}>
+                            {band && (
+                                <polygon fill={color(k)} opacity="0.2" points={[
+                                    ...band.map((p) => xAt(p.i) + "," + y(s.high[p.i])),
+                                    ...band.slice().reverse().map((p) => xAt(p.i) + "," + y(s.low[p.i])),
+                                ].join(" ")} />
+                            )}
+                            <polyline points={points.map((p) => xAt(p.i) + "," + y(p.v)).join(" ")} fill="none"
+                                      stroke={color(k)} strokeWidth="2" strokeDasharray={k > 0 ? "6 4" : undefined} />
+                            {points.length <= 100 && points.map((p) => (
+                                <circle key={p.i} cx={xAt(p.i)} cy={y(p.v)} r="4" fill={color(k)}>
+                                    <title>{label(s, p.i, p.v)}</title>
+                                </circle>
+                            ))}
+                        </g>
+                    );
+                })}
+                {scatter && spec.series[0].values.map((v, i) => (
+                    <circle key={i} cx={xAt(i)} cy={y(v)} r={maxCount > 1 ? 2 + (6 * spec.counts[i]) / maxCount : 3}
+                            fill={color(0)} opacity={maxCount > 1 ? 0.25 + (0.75 * spec.counts[i]) / maxCount : 0.7}>
+                        <title>{maxCount > 1 ? `${spec.counts[i].toLocaleString()} rows` : `${xLabel(i)}, ${v}`}</title>
+                    </circle>
+                ))}
+                <line x1={margin.left} x2={plotRight} y1={plotBottom} y2={plotBottom} stroke="#333" />
+                <line x1={margin.left} x2={margin.left} y1={margin.top} y2={plotBottom} stroke="#333" />
+                {xScale.ticks.map((t) => (
+                    <text key={t.value} fontSize="11" textAnchor="end"
+                          transform={`translate(${xScale.at(t.value)},${plotBottom + 14}) rotate(-45)`}>{t.text}</text>
+                ))}
+                <text x={(margin.left + plotRight) / 2} y={height - 8} textAnchor="middle" fontSize="13">{spec.x_label}</text>
+                <text transform={`translate(18,${(margin.top + plotBottom) / 2}) rotate(-90)`} textAnchor="middle" fontSize="13">{spec.y_label}</text>
+                {spec.series.length > 1 && spec.series.map((s, k) => (
+                    <g key={k} transform={`translate(${plotRight - 150},${margin.top + k * 18})`}>
+                        <rect width="12" height="12" fill={color(k)} />
+                        <text x="18" y="10" fontSize="12">{s.name}</text>
+                    </g>
+                ))}
+            </>
+        );
+    }
+
+    return (
+        <div style={{ marginTop: 20 }}>
+            <svg viewBox={`0 0 ${width} ${height}`} style={{ width: "100%", maxWidth: width, fontFamily: "sans-serif" }}>
+                <text x={width / 2} y={24} textAnchor="middle" fontSize="16">{spec.title}</text>
+                {body}
+            </svg>
+            {exportUrl && <button onClick={exportPng}>Export PNG</button>}
+        </div>
+    );
+};
+
+// File Upload Tab (now auto-loads default data)
+const FileUpload = ({ setColumnNames, setTargetVariable }) => {
+    const [loading, setLoading] = React.useState(false);
+    const [status, setStatus] = React.useState("Loading default data...");
+
+    React.useEffect(() => {
+        const fetchDefaultData = async () => {
+        setLoading(true);
+        try {
+            const response = await fetch("/upload", { method: "POST" }); // no file, triggers default
+            const data = await response.json();
+
+            if (data.columns) {
+            setColumnNames(data.columns);
+            setTargetVariable(data.columns[0]);
+            setStatus(data.note || "Default data loaded successfully.");
+            } else {
+            setStatus(data.error || "Failed to load default data.");
+            }
+        } catch (error) {
+            console.error("Error loading default data:", error);
+            setStatus("An error occurred while loading default data.");
+        } finally {
+            setLoading(false);
+        }
+        };
+
+        fetchDefaultData();
+    }, [setColumnNames, setTargetVariable]);
+
+    return (
+        <div>
+        <h2>Data Load Status</h2>
+        <p>{loading ? "Loading default data..." : status}</p>
+        </div>
+    );
+};
+
+
+
+
+
+// Graphing Tab
+const Graphing = ({ modelBuilt, modelTargets }) => {
+    const [x, setX] = React.useState("");
+    const [y, setY] = React.useState("");
+    const [groupBy, setGroupBy] = React.useState("");
+    const [plotType, setPlotType] = React.useState("scatterplot");
+    const [note, setNote] = React.useState("");
+    const [columnOptions, setColumnOptions] = React.useState([]);
+    const [chart, setChart] = React.useState(null);
+    const [mse, setMse] = React.useState(null);
+    const [varVal, setVar] = React.useState(null);
+    const [loadingPlot, setLoadingPlot] = React.useState(false);
+    const [loadingResults, setLoadingResults] = React.useState(false);
+
+    // Fetch columns when "Group By" changes
+    React.useEffect(() => {
+        // FIX: Clear previous selections when the grouping category changes
+        setX("");
+        setY("");
+
+        if (!groupBy) {
+        setColumnOptions([]);
+        return;
+        }
+
+        fetch("/get_dataframe_columns", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ groupBy }),
+        })
+        .then((r) => r.json())
+        .then((data) => {
+            setColumnOptions(data.columns || []);
+        })
+        .catch((e) => console.error(e));
+    }, [groupBy]);
+
+    const handlePlot = async () => {
+        setNote(""); // clear old warnings
+
+        if (!x && !y) {
+        alert("Please select at least one variable.");
+        return;
+        }
+
+        // Validation rules
+        if (plotType === "pie chart" && x && y) {
+        setNote("Pie chart can only have one variable (choose either X or Y, not both).");
+        return;
+        }
+
+        if (plotType !== "pie chart" && !x && !y) {
+        setNote("Please select at least one variable for this plot type.");
+        return;
+        }
+
+        setLoadingPlot(true);
+        try {
+        const request = { x, y, groupBy, plotType };
+        const response = await fetchChart("/plot", { ...request, format: "spec" });
+
+        if (!response.ok) {
+            const txt = await response.text();
+            alert("Plot error: " + txt);
+            return;
+        }
+
+        const data = await response.json();
+        setChart({ spec: data.chart, request });
+        } catch (e) {
+        console.error(e);
+        } finally {
+        setLoadingPlot(false);
+        }
+    };
+
+    // Results panel (unchanged)
+    const [showResultsPanel, setShowResultsPanel] = React.useState(false);
+    const [selectedDate, setSelectedDate] = React.useState("");
+    const [selectedModelTarget, setSelectedModelTarget] = React.useState("");
+    const [resultsImgUrl, setResultsImgUrl] = React.useState("");
+    const [explainedVar, setExplainedVar] = React.useState(null);
+
+    const handleDisplayResultsClick = () => setShowResultsPanel(true);
+
+    const handleShowResults = async () => {
+        if (!selectedDate || !selectedModelTarget) {
+        alert("Please choose a date and target.");
+        return;
+        }
+
+        setLoadingResults(true);
+        try {
+        const response = await fetch("/plot_results", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ date: selectedDate, target: selectedModelTarget }),
+        });
+
+        if (!response.ok) {
+            const txt = await response.text();
+            alert("Error: " + txt);
+            return;
+        }
+
+        const data = await response.json();
+        if (!data.image) {
+            alert("No image returned from server.");
+            return;
+        }
+
+        setResultsImgUrl("data:image/png;base64," + data.image);
+        setMse(typeof data.mse === "number" ? data.mse.toFixed(4) : "N/A");
+        setVar(typeof data.variance === "number" ? data.variance.toFixed(4) : "N/A");
+        setExplainedVar(
+            typeof data.explained_variance === "number"
+            ? data.explained_variance.toFixed(4)
+            : "N/A"
+        );
+        } catch (e) {
+        console.error(e);
+        } finally {
+        setLoadingResults(false);
+        }
+    };
+
+    return (
+        <div>
+        <h2>Graphing</h2>
+
+        {!modelBuilt && (
+            <>
+            <div>
+                <label>Group By: </label>
+                <select value={groupBy} onChange={(e) => setGroupBy(e.target.value)}>
+                <option value="">--Select--</option>
+                <option value="Group">Group</option>
+                <option value="Category">Category</option>
+                <option value="Item">Item</option>
+                <option value="Shipment">Shipment</option>
+                </select>
+            </div>
+
+            {groupBy && (
+                <>
+                <div style={{ marginTop: 10 }}>
+                    <label>Plot Type: </label>
+                    <select value={plotType} onChange={(e) => setPlotType(e.target.value)}>
+                    <option value="barplot">Barplot</option>
+                    <option value="scatterplot">Scatterplot</option>
+                    <option value="line plot">Line Plot</option>
+                    <option value="pie chart">Pie Chart</option>
+                    </select>
+                </div>
+
+                <div style={{ marginTop: 10 }}>
+                    <label>X: </label>
+                    <select value={x} onChange={(e) => setX(e.target.value)}>
+                    <option value="">--Select--</option>
+                    {columnOptions.map((col) => (
+                        <option key={col} value={col}>
+                        {col}
+                        </option>
+                    ))}
+                    </select>
+
+                    <label> Y: </label>
+                    <select value={y} onChange={(e) => setY(e.target.value)}>
+                    <option value="">--Select--</option>
+                    {columnOptions.map((col) => (
+                        <option key={col} value={col}>
+                        {col}
+                        </option>
+                    ))}
+                    </select>
+                </div>
+                </>
+            )}
+
+            {note && (
+                <div style={{ marginTop: "8px", color: "darkorange", fontWeight: "bold" }}>
+                {note}
+                </div>
+            )}
+
+            <div style={{ marginTop: "10px" }}>
+                <button onClick={handlePlot} disabled={loadingPlot || !groupBy}>
+                {loadingPlot ? "Plotting..." : "Generate Plot"}
+                </button>
+            </div>
+
+            {chart && <Chart spec={chart.spec} exportUrl="/plot" exportPayload={chart.request} />}
+            </>
+        )}
+
+        {modelBuilt && (
+            <div style={{ marginTop: 10 }}>
+            <button onClick={handleDisplayResultsClick}>Display Results</button>
+            </div>
+        )}
+
+        {modelBuilt && showResultsPanel && (
+            <div style={{ marginTop: 12 }}>
+            <div>
+                <label>Date: </label>
+                <input
+                type="date"
+                value={selectedDate}
+                onChange={(e) => setSelectedDate(e.target.value)}
+                />
+                <label> Target: </label>
+                <select
+                value={selectedModelTarget}
+                onChange={(e) => setSelectedModelTarget(e.target.value)}
+                >
+                <option value="">--Select--</option>
+                {modelTargets.map((t, i) => (
+                    <option key={i} value={t}>
+                    {t}
+                    </option>
+                ))}
+                </select>
+                <button
+                onClick={handleShowResults}
+                disabled={loadingResults}
+                style={{ marginLeft: 10 }}
+                >
+                {loadingResults ? "Plotting..." : "Show Results"}
+                </button>
+            </div>
+
+            {resultsImgUrl && (
+                <div
+                style={{
+                    display: "flex",
+                    alignItems: "flex-start",
+                    marginTop: 16,
+                    gap: "2rem",
+                }}
+                >
+                <img src={resultsImgUrl} alt="Results" style={{ maxWidth: "65%" }} />
+                <div style={{ fontSize: "1rem", lineHeight: "1.6" }}>
+                    <strong>MSE:</strong> {mse}
+                    <br />
+                    <strong>Variance:</strong> {varVal}
+                    <br />
+                    <strong>Explained Variance:</strong> {explainedVar}
+                </div>
+                </div>
+            )}
+            </div>
+        )}
+        </div>
+    );
+};
+
+
+// Next Month Usage Tab
+const NextMonthUsage = () => {
+    const [monthToPredict, setMonthToPredict] = usePersistentState("nextMonthUsage_monthToPredict", "");
+    const [predictionResults, setPredictionResults] = usePersistentState("nextMonthUsage_results", null);
+    const [loading, setLoading] = React.useState(false); // no need to persist this
+    const [chart, setChart] = usePersistentState("nextMonthUsage_chart", null);
+    const [note, setNote] = usePersistentState("nextMonthUsage_note", "");
+
+    const MONTH_OPTIONS = ["June", "July", "Aug", "Sept", "Oct", "Nov"];
+
+    const handlePredict = async () => {
+        if (!monthToPredict) {
+            alert("Please select a month to predict.");
+            return;
+        }
+
+        setLoading(true);
+        setPredictionResults(null);
+        setChart(null);
+        setNote("");
+
+        try {
+            const request = { month: monthToPredict };
+            const response = await fetchChart("/predict_next_month_usage", { ...request, format: "spec" });
+
+            if (!response.ok) {
+                const txt = await response.text();
+                setNote("Prediction Error: " + txt);
+                return;
+            }
+
+            const data = await response.json();
+            
+            if (data.error) {
+                setNote(data.error);
+                return;
+            }
+            
+            // Handle chart data separately if available
+            if (data.chart) {
+                setChart({ spec: data.chart, request });
+                delete data.chart; // Clean up the JSON data for display
+            }
+            
+            setPredictionResults(data);
+            setNote(data.note || "Prediction successful!");
+
+        } catch (e) {
+            console.error("Prediction error:", e);
+            setNote("An unexpected error occurred during prediction.");
+        } finally {
+            setLoading(false);
+        }
+    };
+
+    return (
+        <div>
+            <h2>Next Month Usage Prediction</h2>
+
+            <div style={{ marginBottom: 15 }}>
+                <label>Month to Predict: </label>
+                <select 
+                    value={monthToPredict} 
+                    onChange={(e) => setMonthToPredict(e.target.value)}
+                >
+                    <option value="">--Select--</option>
+                    {MONTH_OPTIONS.map((month) => (
+                        <option key={month} value={month}>
+                            {month}
+                        </option>
+                    ))}
+                </select>
+
+                <button 
+                    onClick={handlePredict} 
+                    disabled={loading || !monthToPredict}
+                    style={{ marginLeft: 10 }}
+                >
+                    {loading ? "Predicting..." : "Run Prediction"}
+                </button>
+            </div>
+
+            {note && (
+                <div style={{ color: predictionResults?.error ? "red" : "black", marginBottom: 15 }}>
+                    <strong>{note}</strong>
+                </div>
+            )}
+
+            {predictionResults && (
+                <div style={{ marginTop: 20 }}>
+                    <h3>Prediction Results</h3>
+                    <p>
+                        <strong>Mean Squared Error (MSE):</strong> {typeof predictionResults.mse === "number" ? predictionResults.mse.toFixed(4) : predictionResults.mse || 'N/A'}
+                    </p>
+                    <p>
+                        <strong>Variance:</strong> {typeof predictionResults.variance === "number" ? predictionResults.variance.toFixed(4) : predictionResults.variance || 'N/A'}
+                    </p>
+                    <p>
+                        <strong>Explained Variance:</strong> {typeof predictionResults.explained_variance === "number" ? predictionResults.explained_variance.toFixed(4) : predictionResults.explained_variance || 'N/A'}
+                    </p>
+                    
+                    {chart && <Chart spec={chart.spec} exportUrl="/predict_next_month_usage" exportPayload={chart.request} />}
+                </div>
+            )}
+        </div>
+    );
+};
+
+
+// Cost Prediction Tab
+const CostPrediction = () => {
+    const [predictionResults, setPredictionResults] = usePersistentState("costPrediction_results", null);
+    const [chart, setChart] = usePersistentState("costPrediction_chart", null);
+    const [note, setNote] = usePersistentState("costPrediction_note", "");
+    const [coefficientTable, setCoefficientTable] = usePersistentState("costPrediction_coefficientTable", []);
+    const [loading, setLoading] = React.useState(false);
+
+    const handleRunPrediction = async () => {
+        setLoading(true);
+        setPredictionResults(null);
+        setChart(null);
+        setNote("");
+        setCoefficientTable([]); // Reset table data
+
+        try {
+            const request = {};
+            const response = await fetchChart("/predict_cost_loocv", { ...request, format: "spec" });
+
+            if (!response.ok) {
+                const txt = await response.text();
+                setNote("Prediction Error: " + txt);
+                return;
+            }
+
+            const data = await response.json();
+            
+            if (data.error) {
+                setNote("Error: " + data.error);
+                return;
+            }
+            
+            if (data.chart) {
+                setChart({ spec: data.chart, request });
+            }
+            
+            setPredictionResults(data);
+            setNote(data.note || "Cost prediction completed successfully!");
+            setCoefficientTable(data.coefficient_table || []); // SAVE NEW COEFFICIENT DATA
+
+        } catch (e) {
+            console.error("Cost prediction error:", e);
+            setNote("An unexpected error occurred during prediction.");
+        } finally {
+            setLoading(false);
+        }
+    };
+
+    return (
+        <div>
+            <h2>Cost Prediction</h2>
+            <p>
+                Predicts cost of food items based on ingredients used. Calculates the effect of ingredients on cost of food item.
+            </p>
+
+            <button 
+                onClick={handleRunPrediction} 
+                disabled={loading}
+                style={{ marginTop: 15, marginBottom: 25 }}
+            >
+                {loading ? "Training and Predicting..." : "Run Cost Prediction"}
+            </button>
+
+            {note && (
+                <div style={{ color: predictionResults?.error ? "red" : "black", marginBottom: 15 }}>
+                    <strong>{note}</strong>
+                </div>
+            )}
+
+            {predictionResults && (
+                <div style={{ marginTop: 20 }}>
+                    <h3>Aggregate Prediction Metrics</h3>
+                    {/* ... (Metrics Display remains the same) ... */}
+                    <p>
+                        <strong>Total Mean Squared Error (MSE):</strong> {typeof predictionResults.mse === "number" ? predictionResults.mse.toFixed(4) : predictionResults.mse || 'N/A'}
+                    </p>
+                    <p>
+                        <strong>Total Variance of Actual Cost:</strong> {typeof predictionResults.variance === "number" ? predictionResults.variance.toFixed(4) : predictionResults.variance || 'N/A'}
+                    </p>
+                    <p>
+                        <strong>Explained Variance (R²):</strong> {typeof predictionResults.explained_variance === "number" ? predictionResults.explained_variance.toFixed(4) : predictionResults.explained_variance || 'N/A'}
+                    </p>
+                    
+                    {chart && <Chart spec={chart.spec} exportUrl="/predict_cost_loocv" exportPayload={chart.request} />}
+                </div>
+            )}
+
+            {/* NEW COEFFICIENT TABLE DISPLAY */}
+            {coefficientTable.length > 0 && (
+                <div style={{ marginTop: 40 }}>
+                    <h3>Ingredients Ranked by Cost Influence</h3>
+                    <table style={{ borderCollapse: 'collapse', width: '45%', minWidth: '300px', border: '1px solid #ddd' }}>
+                        <thead>
+                            <tr style={{ backgroundColor: '#e6f7ff' }}>
+                                <th style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'left' }}>Ingredient</th>
+                                <th style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'right' }}>Coefficient</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {coefficientTable.map((row, index) => (
+                                <tr key={index}>
+                                    <td style={{ border: '1px solid #ddd', padding: '8px' }}>{row.Ingredient}</td>
+                                    <td 
+                                        style={{ 
+                                            border: '1px solid #ddd', 
+                                            padding: '8px', 
+                                            textAlign: 'right',
+                                            // Optional: Color code based on sign
+                                            color: row.Coefficient > 0 ? 'green' : (row.Coefficient < 0 ? 'red' : 'inherit')
+                                        }}
+                                    >
+                                        {row.Coefficient.toFixed(4)}
+                                    </td>
+                                </tr>
+                            ))}
+                        </tbody>
+                    </table>
+                </div>
+            )}
+        </div>
+    );
+};
+
+
+// Revenue Prediction Tab
+const RevenuePrediction = () => {
+    const [plotType, setPlotType] = usePersistentState("plotType", "bar");
+    const [predictionResults, setPredictionResults] = usePersistentState("predictionResults", null);
+    const [loading, setLoading] = useState(false);
+    const [note, setNote] = useState("");
+
+    const handleRunPrediction = async () => {
+        setLoading(true);
+        setPredictionResults(null);
+        setNote("");
+
+        try {
+            const request = { plot_type: plotType };
+            const response = await fetchChart("/predict_revenue_stepwise", { ...request, format: "spec" });
+
+            const data = await response.json();
+            if (!response.ok || data.error) {
+                setNote("Error: " + (data.error || "Unknown error"));
+                return;
+            }
+
+            setPredictionResults({ ...data, request });
+            setNote(data.note || "Revenue prediction completed successfully!");
+        } catch (e) {
+            console.error("Prediction error:", e);
+            setNote("An unexpected error occurred during prediction.");
+        } finally {
+            setLoading(false);
+        }
+    };
+
+    return (
+        <div>
+            <h2>Revenue Prediction</h2>
+            <p>Forecasts expected revenue for the future months.</p>
+
+            <div style={{ marginBottom: 15, display: "flex", gap: "20px", alignItems: "center" }}>
+                <div>
+                    <label>Plot Type: </label>
+                    <select value={plotType} onChange={(e) => setPlotType(e.target.value)}>
+                        <option value="bar">Bar Plot</option>
+                        <option value="line">Line Plot</option>
+                    </select>
+                </div>
+
+                <button onClick={handleRunPrediction} disabled={loading}>
+                    {loading ? "Running..." : "Run Prediction"}
+                </button>
+            </div>
+
+            {note && (
+                <div style={{ color: predictionResults?.error ? "red" : "black", marginBottom: 15 }}>
+                    <strong>{note}</strong>
+                </div>
+            )}
+
+            {predictionResults && (
+                <div style={{ marginTop: 20 }}>
+                    <h3>Prediction Metrics</h3>
+                    <div style={{ display: "flex", gap: "40px", marginBottom: "20px" }}>
+                        <div>
+                            <strong>MSE:</strong>{" "}
+                            {predictionResults.mse !== "N/A"
+                                ? predictionResults.mse.toFixed(4)
+                                : "N/A"}
+                        </div>
+                        <div>
+                            <strong>Variance:</strong>{" "}
+                            {predictionResults.variance !== "N/A"
+                                ? predictionResults.variance.toFixed(4)
+                                : "N/A"}
+                        </div>
+                        <div>
+                            <strong>Explained Variance (R²):</strong>{" "}
+                            {predictionResults.explained_variance !== "N/A"
+                                ? predictionResults.explained_variance.toFixed(4)
+                                : "N/A"}
+                        </div>
+                    </div>
+
+                    {/* Results Table */}
+                    {predictionResults.table && predictionResults.table.length > 0 && (
+                        <div style={{ marginTop: 20 }}>
+                            <h3>Predicted vs Actual Values</h3>
+                            <table
+                                style={{
+                                    borderCollapse: "collapse",
+                                    width: "100%",
+                                    textAlign: "center",
+                                    marginBottom: 20,
+                                }}
+                            >
+                                <thead>
+                                    <tr>
+                                        <th>Month</th>
+                                        <th>Predicted</th>
+                                        <th>Actual</th>
+                                        <th>MSE</th>
+                                    </tr>
+                                </thead>
+                                <tbody>
+                                    {predictionResults.table.map((row, idx) => (
+                                        <tr key={idx}>
+                                            <td>{row.Month}</td>
+                                            <td>{row.Predicted ? row.Predicted.toFixed(2) : ""}</td>
+                                            <td>{row.Actual ? row.Actual.toFixed(2) : ""}</td>
+                                            <td>
+                                                {row.MSE && !isNaN(row.MSE)
+                                                    ? row.MSE.toFixed(2)
+                                                    : ""}
+                                            </td>
+                                        </tr>
+                                    ))}
+                                </tbody>
+                            </table>
+                        </div>
+                    )}
+
+                    {predictionResults.chart && (
+                        <Chart spec={predictionResults.chart} exportUrl="/predict_revenue_stepwise" exportPayload={predictionResults.request} />
+                    )}
+                </div>
+            )}
+        </div>
+    );
+};
+
+
+// Shipment vs. Usage Tab
+const ShipmentVsUsage = () => {
+    const [selectedMonth, setSelectedMonth] = usePersistentState("shipmentVsUsage_selectedMonth", "");
+    const [chart, setChart] = usePersistentState("shipmentVsUsage_chart", null);
+    const [note, setNote] = usePersistentState("shipmentVsUsage_note", "");
+    const [tableData, setTableData] = usePersistentState("shipmentVsUsage_tableData", []);
+    const [actionTableData, setActionTableData] = usePersistentState("shipmentVsUsage_actionTableData", []);
+    const [monthOptions, setMonthOptions] = React.useState([]);
+    const [loading, setLoading] = React.useState(false);
+
+    // Fetch unique months for the dropdown on component load (unchanged)
+    React.useEffect(() => {
+        fetch("/get_unique_months")
+            .then((r) => r.json())
+            .then((data) => {
+                setMonthOptions(data.months || []);
+            })
+            .catch((e) => console.error("Error fetching months:", e));
+    }, []);
+
+    const handleGenerateChart = async () => {
+        if (!selectedMonth) {
+            setNote("Please select a month.");
+            return;
+        }
+        setLoading(true);
+        setChart(null);
+        setNote("");
+        setTableData([]); // Reset table data
+        setActionTableData([]); // Make sure to reset this as well
+
+        try {
+            const request = { month: selectedMonth };
+            const response = await fetchChart("/shipment_vs_usage_plot", { ...request, format: "spec" });
+
+            if (!response.ok) {
+                const txt = await response.text();
+                setNote("Chart Error: " + txt);
+                return;
+            }
+
+            const data = await response.json();
+
+            if (data.error) {
+                setNote("Error: " + data.error);
+                return;
+            }
+
+            if (data.chart) {
+                setChart({ spec: data.chart, request });
+                setNote(data.note || "Chart generated successfully.");
+                setTableData(data.table_data || []); 
+                setActionTableData(data.action_table_data || []); // <--- THIS LINE WAS MISSING AND IS THE FIX
+            }
+
+        } catch (e) {
+            console.error("Plotting error:", e);
+            setNote("An unexpected error occurred during plotting.");
+        } finally {
+            setLoading(false);
+        }
+    };
+
+    return (
+        <div>
+            <h2>Shipment vs. Usage Analysis</h2>
+            <p>There is a large difference between the "Used" and "Shipped" values due to lack of ingredient data for most menu items.</p>
+
+            {/* ... (Month selection and button: unchanged) ... */}
+
+            <div style={{ marginBottom: 15 }}>
+                <label>Month: </label>
+                <select 
+                    value={selectedMonth} 
+                    onChange={(e) => setSelectedMonth(e.target.value)}
+                >
+                    <option value="">--Select Month--</option>
+                    {monthOptions.map((month) => (
+                        <option key={month} value={month}>
+                            {month}
+                        </option>
+                    ))}
+                </select>
+
+                <button 
+                    onClick={handleGenerateChart} 
+                    disabled={loading || !selectedMonth}
+                    style={{ marginLeft: 10 }}
+                >
+                    {loading ? "Generating..." : "Generate Chart"}
+                </button>
+            </div>
+
+            {note && (
+                <div style={{ color: "darkblue", marginBottom: 15 }}>
+                    <strong>{note}</strong>
+                </div>
+            )}
+
+            {chart && <Chart spec={chart.spec} exportUrl="/shipment_vs_usage_plot" exportPayload={chart.request} />}
+
+            {/* NEW TABLE DISPLAY */}
+            {tableData.length > 0 && (
+                <div style={{ marginTop: 30 }}>
+                    <h3>Data Table ({selectedMonth})</h3>
+                    <table style={{ borderCollapse: 'collapse', width: '100%', border: '1px solid #ddd' }}>
+                        <thead>
+                            <tr style={{ backgroundColor: '#f2f2f2' }}>
+                                <th style={{ border: '1px solid #ddd', padding: '8px' }}>Ingredient</th>
+                                <th style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'center' }}>Units</th>
+                                <th style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'right' }}>Used</th>
+                                <th style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'right' }}>Shipped</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {tableData.map((row, index) => (
+                                <tr key={index}>
+                                    <td style={{ border: '1px solid #ddd', padding: '8px' }}>{row.Ingredient}</td>
+                                    <td style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'center' }}>{row.Units}</td>
+                                    <td style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'right' }}>{row.Used}</td>
+                                    <td style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'right' }}>{row.Shipped}</td>
+                                </tr>
+                            ))}
+                        </tbody>
+                    </table>
+                </div>
+            )}
+            {actionTableData.length > 0 && (
+                <div style={{ marginTop: 40, width: '100%' }}>
+                    <h3>Inventory Action Recommendations </h3>
+                    <table style={{ borderCollapse: 'collapse', width: '100%', border: '1px solid #ddd' }}>
+                        <thead>
+                            <tr style={{ backgroundColor: '#fff8e1' }}>
+                                <th style={{ border: '1px solid #ddd', padding: '8px', width: '50%' }}>Order Less</th>
+                                <th style={{ border: '1px solid #ddd', padding: '8px', width: '50%' }}>Order More</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {actionTableData.map((row, index) => (
+                                <tr key={index}>
+                                    <td style={{ border: '1px solid #ddd', padding: '8px', color: row['Order Less'] ? 'black' : 'inherit' }}>{row['Order Less']}</td>
+                                    <td style={{ border: '1px solid #ddd', padding: '8px', color: row['Order More'] ? 'black' : 'inherit' }}>{row['Order More']}</td>
+                                </tr>
+                            ))}
+                        </tbody>
+                    </table>
+                </div>
+            )}
+        </div>
+    );
+};
+
+
+
+// Used/Shipped Timeline Tab
+const UsedShippedTimeline = () => {
+    const [selectedIngredient, setSelectedIngredient] = usePersistentState("usedShippedTimeline_selectedIngredient", "");
+    const [chart, setChart] = usePersistentState("usedShippedTimeline_chart", null);
+    const [note, setNote] = usePersistentState("usedShippedTimeline_note", "");
+    const [tableData, setTableData] = usePersistentState("usedShippedTimeline_tableData", []);
+    const [ingredientOptions, setIngredientOptions] = React.useState([]);
+    const [loading, setLoading] = React.useState(false);
+
+    // Fetch ingredients on mount
+    React.useEffect(() => {
+        fetch("/get_ingredient_list")
+            .then((r) => r.json())
+            .then((data) => setIngredientOptions(data.ingredients || []))
+            .catch((e) => console.error("Error fetching ingredients:", e));
+    }, []);
+
+    const handleGenerateChart = async () => {
+        if (!selectedIngredient) {
+            setNote("Please select an ingredient.");
+            return;
+        }
+
+        setLoading(true);
+        setChart(null);
+        setNote("");
+        setTableData([]);
+
+        try {
+            const request = { ingredient: selectedIngredient };
+            const response = await fetchChart("/used_shipped_timeline_plot", { ...request, format: "spec" });
+
+            const data = await response.json();
+
+            if (!response.ok || data.error) {
+                setNote("Error: " + (data.error || "Failed to generate chart."));
+                return;
+            }
+
+            if (data.chart) {
+                setChart({ spec: data.chart, request });
+                setNote(data.note || "Timeline generated successfully.");
+                setTableData(data.table_data || []);
+            }
+        } catch (e) {
+            console.error("Plotting error:", e);
+            setNote("An unexpected error occurred.");
+        } finally {
+            setLoading(false);
+        }
+    };
+
+    return (
+        <div>
+            <h2>Used/Shipped Timeline</h2>
+            <p>View how usage and shipment quantities change over time for each ingredient.</p>
+
+            <div style={{ marginBottom: 15 }}>
+                <label>Ingredient: </label>
+                <select
+                    value={selectedIngredient}
+                    onChange={(e) => setSelectedIngredient(e.target.value)}
+                >
+                    <option value="">--Select Ingredient--</option>
+                    {ingredientOptions.map((ing, i) => (
+                        <option key={i} value={ing}>
+                            {ing}
+                        </option>
+                    ))}
+                </select>
+
+                <button
+                    onClick={handleGenerateChart}
+                    disabled={loading || !selectedIngredient}
+                    style={{ marginLeft: 10 }}
+                >
+                    {loading ? "Generating..." : "Generate Timeline"}
+                </button>
+            </div>
+
+            {note && (
+                <div style={{ color: "darkblue", marginBottom: 15 }}>
+                    <strong>{note}</strong>
+                </div>
+            )}
+
+            {chart && <Chart spec={chart.spec} exportUrl="/used_shipped_timeline_plot" exportPayload={chart.request} />}
+
+            {tableData.length > 0 && (
+                <div style={{ marginTop: 30 }}>
+                    <h3>Data Table ({selectedIngredient})</h3>
+                    <table style={{ borderCollapse: "collapse", width: "100%", border: "1px solid #ddd" }}>
+                        <thead>
+                            <tr style={{ backgroundColor: "#f2f2f2" }}>
+                                <th style={{ border: "1px solid #ddd", padding: "8px" }}>Month</th>
+                                <th style={{ border: "1px solid #ddd", padding: "8px", textAlign: "right" }}>Used</th>
+                                <th style={{ border: "1px solid #ddd", padding: "8px", textAlign: "right" }}>Shipped</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {tableData.map((row, index) => (
+                                <tr key={index}>
+                                    <td style={{ border: "1px solid #ddd", padding: "8px" }}>{row.month}</td>
+                                    <td style={{ border: "1px solid #ddd", padding: "8px", textAlign: "right" }}>{row.Used}</td>
+                                    <td style={{ border: "1px solid #ddd", padding: "8px", textAlign: "right" }}>{row.Shipped}</td>
+                                </tr>
+                            ))}
+                        </tbody>
+                    </table>
+                </div>
+            )}
+        </div>
+    );
+};
+
+// Bestsellers Tab
+const Bestsellers = () => {
+    const [selectedMonth, setSelectedMonth] = usePersistentState("bestsellers_selectedMonth", "");
+    const [chart, setChart] = usePersistentState("bestsellers_chart", null);
+    const [note, setNote] = usePersistentState("bestsellers_note", "");
+    const [ingredientTable, setIngredientTable] = usePersistentState("bestsellers_ingredientTable", []);
+    const [frequencyTable, setFrequencyTable] = usePersistentState("bestsellers_frequencyTable", []);
+    const [monthOptions, setMonthOptions] = React.useState([]);
+    const [loading, setLoading] = React.useState(false);
+
+    // --- Fetch unique months on load (unchanged) ---
+    React.useEffect(() => {
+        fetch("/get_unique_months")
+            .then((r) => r.json())
+            .then((data) => {
+                setMonthOptions(data.months || []);
+            })
+            .catch((e) => console.error("Error fetching months:", e));
+    }, []);
+
+    const handleGenerateChart = async () => {
+        setLoading(true);
+        setChart(null);
+        setNote("");
+        setIngredientTable([]);
+        setFrequencyTable([]); // <-- Reset frequency table
+
+        try {
+            const request = { month: selectedMonth };
+            const response = await fetchChart("/bestsellers_plot", { ...request, format: "spec" });
+
+            if (!response.ok) {
+                const txt = await response.text();
+                setNote("Chart Error: " + txt);
+                return;
+            }
+
+            const data = await response.json();
+
+            if (data.error) {
+                setNote("Error: " + data.error);
+                return;
+            }
+            
+            if (data.chart) {
+                setChart({ spec: data.chart, request });
+                setNote(data.note || "Chart generated successfully.");
+                setIngredientTable(data.ingredient_table || []); 
+                setFrequencyTable(data.frequency_table || []); // <-- SAVE NEW FREQUENCY DATA
+            }
+
+        } catch (e) {
+            console.error("Plotting error:", e);
+            setNote("An unexpected error occurred during plotting.");
+        } finally {
+            setLoading(false);
+        }
+    };
+
+    return (
+        <div>
+            <h2>Bestsellers Analysis</h2>
+            
+            {/* ... (Month selection and chart display remain the same) ... */}
+
+            <div style={{ marginBottom: 15 }}>
+                <label>Month: </label>
+                <select 
+                    value={selectedMonth} 
+                    onChange={(e) => setSelectedMonth(e.target.value)}
+                >
+                    <option value="">--All Months--</option> {/* Optional value */}
+                    {monthOptions.map((month) => (
+                        <option key={month} value={month}>
+                            {month}
+                        </option>
+                    ))}
+                </select>
+
+                <button 
+                    onClick={handleGenerateChart} 
+                    disabled={loading}
+                    style={{ marginLeft: 10 }}
+                >
+                    {loading ? "Generating..." : "Generate Chart"}
+                </button>
+            </div>
+
+            {note && (
+                <div style={{ color: "darkblue", marginBottom: 15 }}>
+                    <strong>{note}</strong>
+                </div>
+            )}
+
+            {chart && <Chart spec={chart.spec} exportUrl="/bestsellers_plot" exportPayload={chart.request} />}
+
+            {/* Existing Ingredient Breakdown Table */}
+            {ingredientTable.length > 0 && (
+                <div style={{ marginTop: 40, width: '100%' }}>
+                    <h3>Ingredient Breakdown for Top Sellers</h3>
+                    <table style={{ borderCollapse: 'collapse', width: '100%', border: '1px solid #ddd' }}>
+                        <thead>
+                            <tr style={{ backgroundColor: '#f2f2f2' }}>
+                                <th style={{ border: '1px solid #ddd', padding: '8px', width: '30%' }}>Food Item</th>
+                                <th style={{ border: '1px solid #ddd', padding: '8px', width: '70%' }}>Ingredients Used</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {ingredientTable.map((row, index) => (
+                                <tr key={index}>
+                                    <td style={{ border: '1px solid #ddd', padding: '8px' }}>{row['Food Item']}</td>
+                                    <td style={{ border: '1px solid #ddd', padding: '8px' }}>
+                                        {row.Ingredients.join(', ')}
+                                    </td>
+                                </tr>
+                            ))}
+                        </tbody>
+                    </table>
+                </div>
+            )}
+            
+            {/* NEW: Ingredient Frequency Table */}
+            {frequencyTable.length > 0 && (
+                <div style={{ marginTop: 40, width: '100%' }}>
+                    <h3>Ingredient Frequency in Top Sellers</h3>
+                    <table style={{ borderCollapse: 'collapse', width: '35%', border: '1px solid #ddd' }}>
+                        <thead>
+                            <tr style={{ backgroundColor: '#e6e6fa' }}>
+                                <th style={{ border: '1px solid #ddd', padding: '8px' }}>Ingredient</th>
+                                <th style={{ border: '1px solid #ddd', padding: '8px' }}>Frequency</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {frequencyTable.map((row, index) => (
+                                <tr key={index}>
+                                    <td style={{ border: '1px solid #ddd', padding: '8px' }}>{row.Ingredient}</td>
+                                    <td style={{ border: '1px solid #ddd', padding: '8px', textAlign: 'center' }}>{row.Frequency}</td>
+                                </tr>
+                            ))}
+                        </tbody>
+                    </table>
+                </div>
+            )}
+        </div>
+    );
+};
+
+
+const HelpModal = ({ show, onClose }) => {
+    const [conversation, setConversation] = useState([]);
+    const [input, setInput] = useState("");
+    const [loading, setLoading] = useState(false);
+    const chatEndRef = useRef(null);
+
+    useEffect(() => {
+        chatEndRef.current?.scrollIntoView({ behavior: "smooth" });
+    }, [conversation]);
+
+    const handleSend = async () => {
+        if (!input.trim() || loading) return;
+
+        const userMessage = { role: 'user', text: input };
+        // Use the optimistic update state where we add the user message
+        const historyPayload = [...conversation, userMessage]; 
+        
+        setConversation(prev => [...prev, userMessage]);
+        setInput("");
+        setLoading(true);
+
+        try {
+            const pageContent = document.body.innerText;
+            const response = await fetch('/ask_gemini', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    content: pageContent,
+                    history: historyPayload
+                }),
+            });
+            
+            // --- FIX IS HERE ---
+            // Always parse the JSON body, regardless of the HTTP status
+            const data = await response.json();
+            
+            if (response.ok) {
+                // SUCCESS: HTTP Status 200-299. We expect the 'response' key.
+                const botMessage = { role: 'bot', text: data.response };
+                setConversation(prev => [...prev, botMessage]);
+            } else {
+                // ERROR: HTTP Status 4xx or 5xx. We expect the 'error' key from Flask.
+                console.error("Server Error:", data.error);
+                const errorMessage = { 
+                    role: 'bot', 
+                    text: data.error || "An unknown server error occurred." // Fallback text
+                };
+                setConversation(prev => [...prev, errorMessage]);
+            }
+            // --- END OF FIX ---
+            
+        } catch (error) {
+            console.error("Error contacting Gemini API:", error);
+            // This catch block handles network errors or complete JSON parsing failures
+            const errorMessage = { role: 'bot', text: "Sorry, I'm having trouble connecting. Please try again later." };
+            setConversation(prev => [...prev, errorMessage]);
+        } finally {
+            setLoading(false);
+        }
+    };
+
+    if (!show) return null;
+
+    return (
+        <div className="help-modal-overlay" onClick={onClose}>
+            <div className="help-modal-content" onClick={e => e.stopPropagation()}>
+                <div className="help-modal-chat">
+                    {conversation.map((msg, index) => (
+                        <div key={index} style={{ textAlign: msg.role === 'user' ? 'right' : 'left', margin: '5px 0' }}>
+                            <p style={{ background: msg.role === 'user' ? '#dcf8c6' : '#f1f0f0', padding: '10px', borderRadius: '10px', display: 'inline-block' }}>
+                                {msg.text}
+                            </p>
+                        </div>
+                    ))}
+                    {loading && (
+                        <div style={{ textAlign: 'left', margin: '5px 0' }}>
+                            <p style={{ background: '#f1f0f0', padding: '10px', borderRadius: '10px', display: 'inline-block' }}>
+                                Thinking...
+                            </p>
+                        </div>
+                    )}
+                    <div ref={chatEndRef} />
+                </div>
+                <div className="help-modal-input">
+                    <input
+                        type="text"
+                        value={input}
+                        onChange={e => setInput(e.target.value)}
+                        onKeyPress={e => e.key === 'Enter' && handleSend()}
+                        placeholder="Ask about the results on the page..."
+                        disabled={loading}
+                    />
+                    <button onClick={handleSend} disabled={loading || !input.trim()}>
+                        {loading ? '...' : 'Send'}
+                    </button>
+                </div>
+            </div>
+        </div>
+    );
+};
+
+// Application
+const App = () => {
+  const [activeTab, setActiveTab] = React.useState("File Upload");
+  const [columnNames, setColumnNames] = React.useState([]);
+  const [targetVariable, setTargetVariable] = React.useState("");
+  const [modelBuilt, setModelBuilt] = React.useState(false);
+  const [modelTargets, setModelTargets] = React.useState([]);
+  const [showHelp, setShowHelp] = React.useState(false);
+
+
+  const handleModelBuilt = (targets) => {
+    setModelBuilt(true);
+    setModelTargets(targets || []);
+
+
+    setActiveTab("Graphing");
+  };
+
+
+  return (
+    <div>
+      <div className="top-bar">
+        <div>
+          <button onClick={() => setActiveTab("File Upload")}>File Upload</button>
+          <button onClick={() => setActiveTab("Graphing")}>Graphing</button>
+          <button onClick={() => setActiveTab("NextMonthUsage")}>Next Month Usage</button>
+          <button onClick={() => setActiveTab("CostPrediction")}>Cost Prediction</button>
+          <button onClick={() => setActiveTab("RevenuePrediction")}>Revenue Prediction</button>
+          <button onClick={() => setActiveTab("ShipmentVsUsage")}>Shipment vs. Usage</button>
+          <button onClick={() => setActiveTab("UsedShippedTimeline")}>Used/Shipped Timeline</button>
+          <button onClick={() => setActiveTab("Bestsellers")}>Bestsellers</button>
+        </div>
+        <div>
+          {/* could show modelBuilt indicator */}
+          {modelBuilt ? <strong>Model built</strong> : null}
+        </div>
+      </div>
+      <button className="help-button" onClick={() => setShowHelp(true)}>HELP</button>
+      <HelpModal show={showHelp} onClose={() => setShowHelp(false)} />
+
+
+      <div style={{ padding: 12 }}>
+        {activeTab === "File Upload" && (
+          <FileUpload setColumnNames={setColumnNames} setTargetVariable={setTargetVariable} />
+        )}
+        {activeTab === "Graphing" && (
+          <Graphing columnNames={columnNames} modelBuilt={modelBuilt} modelTargets={modelTargets} />
+        )}
+        {activeTab === "NextMonthUsage" && (
+          <NextMonthUsage columnNames={columnNames} modelBuilt={modelBuilt} modelTargets={modelTargets} />
+        )}
+        {activeTab === "CostPrediction" && (
+          <CostPrediction columnNames={columnNames} modelBuilt={modelBuilt} modelTargets={modelTargets} />
+        )}
+        {activeTab === "RevenuePrediction" && (
+          <RevenuePrediction columnNames={columnNames} modelBuilt={modelBuilt} modelTargets={modelTargets} />
+        )}
+        {activeTab === "ShipmentVsUsage" && (
+            <ShipmentVsUsage columnNames={columnNames} modelBuilt={modelBuilt} modelTargets={modelTargets} />
+        )}
+        {activeTab === "UsedShippedTimeline" && (
+            <UsedShippedTimeline columnNames={columnNames} modelBuilt={modelBuilt} modelTargets={modelTargets} />
+        )}
+        {activeTab === "Bestsellers" && (
+            <Bestsellers columnNames={columnNames} modelBuilt={modelBuilt} modelTargets={modelTargets} />
+        )}
+      </div>
+    </div>
+  );
+};
+
+
+ReactDOM.render(<App />, document.getElementById('root'));